@@ -1,20 +1,310 @@
 import flet as ft
 import boto3
 import os
+import io
+import csv
 import configparser
 import subprocess
 import sys
 import json
 import threading
+import multiprocessing
+import sqlite3
+import queue
 import time
+import tempfile
+import zlib
+import hashlib
 import ctypes
 import pyperclip
 import pandas as pd
 import random
+import re
+import ipaddress
+import numpy as np
 from datetime import datetime, timezone, timedelta
 from pathlib import Path
-from botocore.exceptions import ClientError, NoCredentialsError, ProfileNotFound
-from concurrent.futures import ThreadPoolExecutor, as_completed
+from collections import OrderedDict
+from botocore.exceptions import ClientError, NoCredentialsError, ProfileNotFound, HTTPClientError
+from botocore.exceptions import ConnectionError as BotoConnectionError
+from botocore.config import Config as BotoConfig
+from boto3.s3.transfer import TransferConfig
+from concurrent.futures import ThreadPoolExecutor, ProcessPoolExecutor, as_completed
+
+# Dependências opcionais do cache compacto (sem elas o cache usa JSON + zlib)
+try:
+    import msgpack
+except ImportError:
+    msgpack = None
+
+try:
+    import zstandard
+except ImportError:
+    zstandard = None
+
+# Dependência opcional da conversão CSV/JSON → Parquet no sync
+try:
+    import pyarrow as pa
+    import pyarrow.parquet as pq
+except ImportError:
+    pa = None
+    pq = None
+
+
+# Nomes aceitos nos campos de mês e dia da semana das expressões cron do EventBridge
+CRON_MONTH_NAMES = {
+    "JAN": 1, "FEB": 2, "MAR": 3, "APR": 4, "MAY": 5, "JUN": 6,
+    "JUL": 7, "AUG": 8, "SEP": 9, "OCT": 10, "NOV": 11, "DEC": 12
+}
+CRON_WEEKDAY_NAMES = {"SUN": 1, "MON": 2, "TUE": 3, "WED": 4, "THU": 5, "FRI": 6, "SAT": 7}
+
+# Tempo máximo que o pré-carregamento espera as atualizações do usuário antes de seguir
+CACHE_WARMUP_MAX_WAIT_SECONDS = 120
+
+# Versão do formato do catálogo de preços salvo em disco
+PRICING_CATALOG_SCHEMA_VERSION = 1
+
+
+# Status dos jobs da fila de transferências S3
+TRANSFER_JOB_ACTIVE_STATUSES = ("queued", "listing", "running")
+TRANSFER_JOB_STATUS_ICONS = {
+    "queued": "⏳", "listing": "🔍", "running": "🔄", "done": "✅", "error": "❌", "cancelled": "⏹️"
+}
+TRANSFER_JOB_STATUS_COLORS = {
+    "queued": ft.Colors.GREY, "listing": ft.Colors.BLUE, "running": ft.Colors.BLUE,
+    "done": ft.Colors.GREEN, "error": ft.Colors.RED, "cancelled": ft.Colors.ORANGE
+}
+
+
+# Máximo de linhas exibidas na lista da prévia de sincronização
+S3_PREVIEW_MAX_ROWS = 500
+
+# Tentativas por arquivo em erros transitórios (rede, proxy, SlowDown) durante o sync
+TRANSFER_MAX_ATTEMPTS = 4
+TRANSIENT_S3_ERROR_CODES = {"SlowDown", "ServiceUnavailable", "InternalError", "RequestTimeout", "Throttling"}
+TRANSIENT_TRANSFER_ERROR_WORDS = ("slowdown", "timeout", "timed out", "proxy", "connection", "reset by peer",
+                                  "throttl", "503", "502", "504")
+
+# Conversão CSV/JSON → Parquet: extensões aceitas e tipos do esquema inferido
+PARQUET_SOURCE_EXTENSIONS = (".csv", ".json", ".jsonl")
+PARQUET_PANDAS_DTYPES = {"int64": "Int64", "float64": "float64", "bool": "boolean", "string": "string"}
+PARQUET_ARROW_TYPES = {
+    "int64": lambda: pa.int64(), "float64": lambda: pa.float64(), "bool": lambda: pa.bool_(), "string": lambda: pa.string()
+}
+PARQUET_WIDER_TYPES = {"bool": "string", "int64": "float64", "float64": "string"}
+PARQUET_STAGING_INDEX_VERSION = 3
+# Caracteres que o Hive escapa como %XX em nomes de partição (coluna=valor/), além dos de controle
+PARQUET_HIVE_ESCAPED_CHARS = set('"#%\'*/:=?\\{[]^')
+PARQUET_HIVE_DEFAULT_PARTITION = "__HIVE_DEFAULT_PARTITION__"
+
+# Cobrança do Athena: mínimo de 10 MB escaneados por query; batch_get_query_execution aceita 50 IDs
+# e list_query_executions só devolve ~45 dias de histórico
+ATHENA_MIN_BILLED_BYTES = 10 * 1024 * 1024
+ATHENA_BATCH_GET_LIMIT = 50
+ATHENA_QUERY_HISTORY_DAYS = 45
+
+# Limites de multipart do S3 (mesmos usados pelo s3transfer para ajustar o tamanho das partes)
+S3_MIN_PART_SIZE = 5 * 1024 * 1024
+S3_MAX_PARTS = 10000
+
+# Prévia de objetos S3 (navegador): formato pela extensão e largura das colunas da grade
+S3_OBJECT_PREVIEW_FORMATS = {
+    ".csv": "csv", ".txt": "csv", ".json": "json", ".jsonl": "json", ".ndjson": "json", ".parquet": "parquet"
+}
+S3_OBJECT_PREVIEW_COLUMN_WIDTH = 140
+S3_OBJECT_PREVIEW_CSV_DELIMITERS = ",;\t|"
+
+
+class SyncCancelledError(Exception):
+    """Levantada dentro dos callbacks de transferência para interromper a sincronização"""
+
+
+class ParquetSchemaWidened(Exception):
+    """Levantada quando um bloco não cabe no esquema já usado no arquivo; carrega o esquema alargado"""
+
+    def __init__(self, schema_spec):
+        super().__init__("esquema alargado")
+        self.schema_spec = schema_spec
+
+
+class TokenBucket:
+    """Limitador de banda em bytes/s compartilhado entre threads (taxa 0 = ilimitado).
+
+    Quem consome além dos tokens disponíveis fica devendo e dorme o tempo da dívida, então
+    a taxa média respeita o limite mesmo com blocos grandes (partes multipart).
+    """
+
+    def __init__(self, rate):
+        self.rate = rate
+        self.tokens = rate
+        self.updated_at = time.monotonic()
+        self.lock = threading.Lock()
+
+    def set_rate(self, rate):
+        with self.lock:
+            self.rate = rate
+            self.tokens = min(self.tokens, rate)
+
+    def consume(self, amount):
+        with self.lock:
+            if self.rate <= 0:
+                return
+            now = time.monotonic()
+            self.tokens = min(self.rate, self.tokens + (now - self.updated_at) * self.rate)
+            self.updated_at = now
+            self.tokens -= amount
+            wait = -self.tokens / self.rate if self.tokens < 0 else 0
+        if wait > 0:
+            time.sleep(wait)
+
+
+class AdaptiveConcurrencyLimiter:
+    """Limite de transferências simultâneas com AIMD: cresce 1/limite a cada sucesso e cai pela
+    metade quando o proxy/S3 começa a devolver erros."""
+
+    def __init__(self, max_limit):
+        self.max_limit = max(1, max_limit)
+        self.limit = float(self.max_limit)
+        self.active = 0
+        self.condition = threading.Condition()
+
+    def acquire(self):
+        with self.condition:
+            while self.active >= int(self.limit):
+                self.condition.wait()
+            self.active += 1
+
+    def release(self, success=True):
+        with self.condition:
+            self.active -= 1
+            if success:
+                self.limit = min(self.max_limit, self.limit + 1 / self.limit)
+            self.condition.notify_all()
+
+    def on_congestion(self):
+        with self.condition:
+            new_limit = max(1.0, self.limit / 2)
+            if int(new_limit) < int(self.limit):
+                print(f"🐢 Erros de rede/proxy: reduzindo transferências simultâneas para {int(new_limit)}")
+            self.limit = new_limit
+
+
+class PreviewByteLimitError(Exception):
+    """Levantada quando a prévia precisaria baixar mais bytes que o limite configurado"""
+
+
+class S3RangeReader(io.RawIOBase):
+    """Arquivo somente leitura sobre um objeto S3 em que cada leitura vira um GET com Range.
+
+    Conta os bytes baixados e recusa passar de max_bytes; assim o pyarrow lê o rodapé e o
+    primeiro row group de um Parquet sem baixar o objeto inteiro.
+    """
+
+    def __init__(self, s3_client, bucket, key, size, max_bytes, read_ahead=64 * 1024):
+        super().__init__()
+        self.s3_client = s3_client
+        self.bucket = bucket
+        self.key = key
+        self.size = size
+        self.max_bytes = max_bytes
+        self.read_ahead = read_ahead
+        self.position = 0
+        self.bytes_read = 0
+        self.buffer = b''
+        self.buffer_start = 0
+
+    def readable(self):
+        return True
+
+    def seekable(self):
+        return True
+
+    def tell(self):
+        return self.position
+
+    def seek(self, offset, whence=io.SEEK_SET):
+        if whence == io.SEEK_SET:
+            self.position = offset
+        elif whence == io.SEEK_CUR:
+            self.position += offset
+        else:
+            self.position = self.size + offset
+        return self.position
+
+    def read(self, size=-1):
+        if size is None or size < 0:
+            size = self.size - self.position
+        end = min(self.position + size, self.size)
+        if end <= self.position:
+            return b''
+        if not (self.buffer_start <= self.position and end <= self.buffer_start + len(self.buffer)):
+            budget = self.max_bytes - self.bytes_read
+            if end - self.position > budget:
+                raise PreviewByteLimitError(
+                    f"leitura de {end - self.position} bytes passaria do limite de {self.max_bytes} bytes da prévia")
+            fetch_end = min(self.size, max(end, self.position + min(self.read_ahead, budget)))
+            response = self.s3_client.get_object(
+                Bucket=self.bucket, Key=self.key, Range=f"bytes={self.position}-{fetch_end - 1}")
+            self.buffer = response['Body'].read()
+            self.buffer_start = self.position
+            self.bytes_read += len(self.buffer)
+        offset = self.position - self.buffer_start
+        data = self.buffer[offset:offset + end - self.position]
+        self.position += len(data)
+        return data
+
+    def readinto(self, buffer):
+        data = self.read(len(buffer))
+        buffer[:len(data)] = data
+        return len(data)
+
+
+def s3_multipart_part_size(size, chunksize):
+    """Tamanho de parte que o s3transfer usa: no mínimo 5 MB, dobrando até caber em 10.000 partes"""
+    part_size = max(chunksize, S3_MIN_PART_SIZE)
+    while -(-size // part_size) > S3_MAX_PARTS:
+        part_size *= 2
+    return part_size
+
+
+def compute_s3_etag(path, multipart_threshold, multipart_chunksize, read_size=1024 * 1024):
+    """Calcula o ETag que o S3 atribuiria ao arquivo enviado com o TransferConfig informado.
+
+    Abaixo do threshold é o MD5 do conteúdo; acima, o MD5 da concatenação dos MD5 de cada
+    parte seguido de '-<número de partes>' (mesmo ajuste de tamanho de parte do s3transfer).
+    Fica no nível do módulo para poder rodar em ProcessPoolExecutor.
+    """
+    size = os.path.getsize(path)
+    if size < multipart_threshold:
+        digest = hashlib.md5()
+        with open(path, 'rb') as f:
+            for block in iter(lambda: f.read(read_size), b''):
+                digest.update(block)
+        return digest.hexdigest()
+
+    part_size = s3_multipart_part_size(size, multipart_chunksize)
+    part_digests = []
+    with open(path, 'rb') as f:
+        while True:
+            part_digest = hashlib.md5()
+            remaining = part_size
+            while remaining:
+                block = f.read(min(read_size, remaining))
+                if not block:
+                    break
+                part_digest.update(block)
+                remaining -= len(block)
+            if remaining == part_size:
+                break
+            part_digests.append(part_digest.digest())
+    return f"{hashlib.md5(b''.join(part_digests)).hexdigest()}-{len(part_digests)}"
+
+
+def hive_escape_path_name(value):
+    """Escapa um nome/valor de partição como o FileUtils.escapePathName do Hive: '/', '=', '%', ':',
+    caracteres de controle etc. viram %XX, então o valor nunca cria subpastas nem '..'"""
+    return "".join(f"%{ord(char):02X}" if char in PARQUET_HIVE_ESCAPED_CHARS or ord(char) < 0x20 or ord(char) == 0x7F
+                   else char for char in str(value))
 
 
 class AWSApp:
@@ -27,10 +317,20 @@ class AWSApp:
         # Carregar configurações
         self.config = self.load_config()
 
+        # Conjuntos de dados com cache local
+        self.setup_cache_datasets()
+
+        # Fila de transferências S3 em background
+        self.setup_transfer_queue()
+
+        # Navegador S3 (cache de listagens por prefixo)
+        self.setup_s3_browser()
+
         # Variáveis globais para status AWS
         self.current_profile = None
         self.current_account_id = None
         self.current_user_arn = None
+        self.current_region = None
 
         # Estado da navegação sidebar
         self.current_section = "Login"  # Seção atual selecionada
@@ -328,6 +628,7 @@ class AWSApp:
             self.current_profile = env_profile
             self.current_account_id = identity.get('Account', 'N/A')
             self.current_user_arn = identity.get('Arn', 'N/A')
+            self.current_region = boto3.session.Session().region_name
 
             # Atualizar interface
             self.status_profile_text.value = f"Profile: {self.current_profile}"
@@ -355,6 +656,7 @@ class AWSApp:
             self.current_profile = None
             self.current_account_id = None
             self.current_user_arn = None
+            self.current_region = None
 
             # Atualizar interface
             self.status_profile_text.value = "Profile: Não logado"
@@ -715,6 +1017,14 @@ class AWSApp:
             color=ft.Colors.BLUE_400
         )
 
+        # Pré-carregamento opcional dos caches após login
+        self.warmup_checkbox = ft.Checkbox(
+            label="Pré-carregar Glue, Step Functions, EventBridge e Tabelas após login",
+            value=self.config.get("cache", {}).get("warmup_after_login", False),
+            on_change=self.on_warmup_toggle,
+            tooltip="Busca os dados em segundo plano logo após o login para que as abas abram instantaneamente"
+        )
+
         return ft.Container(
             content=ft.Column([
                 # Container para status principal
@@ -766,6 +1076,8 @@ class AWSApp:
                     ], alignment=ft.MainAxisAlignment.CENTER, spacing=15),
                     padding=ft.padding.symmetric(vertical=15),
                 ),
+
+                ft.Row([self.warmup_checkbox], alignment=ft.MainAxisAlignment.CENTER),
             ],
             spacing=15,
             horizontal_alignment=ft.CrossAxisAlignment.STRETCH
@@ -875,6 +1187,212 @@ class AWSApp:
             tooltip="Sincronizar arquivos do bucket S3 para a pasta local"
         )
 
+        # Botões de prévia (dry-run)
+        self.preview_to_s3_button = ft.OutlinedButton(
+            "👁️ Prévia Local → S3",
+            on_click=lambda e: self.preview_s3_sync('upload'),
+            tooltip="Mostra o que seria enviado, sem transferir nada"
+        )
+        self.preview_from_s3_button = ft.OutlinedButton(
+            "👁️ Prévia S3 → Local",
+            on_click=lambda e: self.preview_s3_sync('download'),
+            tooltip="Mostra o que seria baixado e removido (--delete), sem transferir nada"
+        )
+
+        # Sync em lote: RT/squads x ambientes marcados
+        self.s3_batch_button = ft.OutlinedButton(
+            "🧺 Sync em lote",
+            on_click=self.toggle_s3_batch,
+            tooltip="Sincroniza várias combinações RT/squad/ambiente em um único job"
+        )
+        rt_squad_hierarchy = s3_config.get("rt_squad_hierarchy", {})
+        self.s3_batch_target_checkboxes = [
+            ft.Checkbox(label=f"{rt}/{squad}" if squad else rt, data=(rt, squad), on_change=self.update_s3_batch_count)
+            for rt in rt_options
+            for squad in rt_squad_hierarchy.get(rt, []) or [None]
+        ]
+        self.s3_batch_env_checkboxes = [
+            ft.Checkbox(label=env, data=env, on_change=self.update_s3_batch_count) for env in env_options
+        ]
+        self.s3_batch_count = ft.Text("", size=12, color=ft.Colors.GREY_400)
+        self.s3_batch_upload_button = ft.ElevatedButton(
+            "⬆️ Lote Local → S3",
+            on_click=lambda e: self.run_s3_batch_sync('upload'),
+            disabled=True
+        )
+        self.s3_batch_download_button = ft.ElevatedButton(
+            "⬇️ Lote S3 → Local",
+            on_click=lambda e: self.run_s3_batch_sync('download'),
+            disabled=True
+        )
+        self.s3_batch_container = ft.Container(
+            content=ft.Column([
+                ft.Text("RT / squads:", size=13, weight=ft.FontWeight.W_500, color=ft.Colors.WHITE),
+                ft.Row(self.s3_batch_target_checkboxes, wrap=True, spacing=5),
+                ft.Text("Ambientes:", size=13, weight=ft.FontWeight.W_500, color=ft.Colors.WHITE),
+                ft.Row(self.s3_batch_env_checkboxes, wrap=True, spacing=5),
+                self.s3_batch_count,
+                ft.Row([self.s3_batch_upload_button, self.s3_batch_download_button], spacing=10),
+            ], spacing=8),
+            padding=ft.padding.all(15),
+            bgcolor=ft.Colors.GREY_900,
+            border_radius=8,
+            visible=False
+        )
+
+        # Painel da prévia
+        self.s3_preview_plan = None
+        self.s3_preview_summary = ft.Text("", size=13, weight=ft.FontWeight.W_500)
+        self.s3_preview_filter = ft.TextField(
+            label="Filtrar arquivos",
+            prefix_icon=ft.Icons.SEARCH,
+            on_change=self.render_s3_preview_list,
+            expand=True,
+            height=45
+        )
+        self.s3_preview_kind = ft.Dropdown(
+            options=[
+                ft.dropdown.Option("all", "Tudo"),
+                ft.dropdown.Option("transfer", "Transferências"),
+                ft.dropdown.Option("delete", "Remoções"),
+            ],
+            value="all",
+            width=170,
+            on_change=self.render_s3_preview_list
+        )
+        self.s3_preview_list = ft.ListView(height=250, spacing=2)
+        self.s3_preview_execute_button = ft.ElevatedButton(
+            "▶️ Executar plano",
+            on_click=self.execute_s3_preview_plan,
+            disabled=True,
+            tooltip="Executa exatamente o plano da prévia, sem listar de novo"
+        )
+        self.s3_preview_container = ft.Container(
+            content=ft.Column([
+                self.s3_preview_summary,
+                ft.Row([self.s3_preview_filter, self.s3_preview_kind], spacing=10),
+                self.s3_preview_list,
+                ft.Row([
+                    self.s3_preview_execute_button,
+                    ft.TextButton("✖️ Descartar", on_click=self.discard_s3_preview),
+                ], spacing=10, alignment=ft.MainAxisAlignment.END),
+            ], spacing=10),
+            padding=ft.padding.all(15),
+            bgcolor=ft.Colors.GREY_900,
+            border_radius=8,
+            visible=False
+        )
+
+        # Ajustes de transferência por ambiente
+        self.transfer_settings_title = ft.Text("⚙️ Transferência:", size=14, weight=ft.FontWeight.BOLD, color=ft.Colors.WHITE)
+        self.transfer_parallel_files_field = ft.TextField(
+            label="Arquivos simultâneos", width=150, height=45, keyboard_type=ft.KeyboardType.NUMBER,
+            tooltip="Máximo de arquivos transferidos ao mesmo tempo (reduz sozinho se o proxy der erro)"
+        )
+        self.transfer_concurrency_field = ft.TextField(
+            label="Requisições/arquivo", width=150, height=45, keyboard_type=ft.KeyboardType.NUMBER,
+            tooltip="Partes multipart enviadas em paralelo por arquivo"
+        )
+        self.transfer_bandwidth_field = ft.TextField(
+            label="Banda máx (MB/s)", width=150, height=45, keyboard_type=ft.KeyboardType.NUMBER,
+            tooltip="0 = ilimitada. Compartilhada por todas as transferências"
+        )
+        self.transfer_chunksize_field = ft.TextField(
+            label="Parte (MB)", width=120, height=45, keyboard_type=ft.KeyboardType.NUMBER,
+            tooltip="Tamanho das partes multipart (mínimo 5 MB)"
+        )
+        self.save_transfer_settings_button = ft.IconButton(
+            icon=ft.Icons.SAVE,
+            tooltip="Salvar ajustes para o ambiente selecionado",
+            on_click=self.save_transfer_settings
+        )
+
+        # Navegador S3
+        self.s3_browser_button = ft.OutlinedButton(
+            "🗂️ Navegar no S3",
+            on_click=self.toggle_s3_browser,
+            tooltip="Explora o bucket da squad pasta a pasta"
+        )
+        self.s3_browser_breadcrumb = ft.Row(spacing=0, wrap=True)
+        self.s3_browser_filter = ft.TextField(
+            label="Filtrar nesta pasta",
+            prefix_icon=ft.Icons.SEARCH,
+            on_change=lambda e: (self.render_s3_browser_entries(), self.page.update()),
+            expand=True,
+            height=45
+        )
+        self.s3_browser_status = ft.Text("", size=12, color=ft.Colors.GREY_400)
+        self.s3_browser_list = ft.ListView(height=320, item_extent=32, spacing=0)
+
+        # Prévia de objetos (Range GET / S3 Select)
+        self.s3_object_preview_title = ft.Text("", size=13, weight=ft.FontWeight.BOLD, color=ft.Colors.WHITE,
+                                               expand=True, no_wrap=True)
+        self.s3_object_preview_where = ft.TextField(
+            label="Filtro S3 Select (ex.: s.status = 'ERRO')",
+            on_submit=self.apply_s3_object_preview_filter,
+            expand=True,
+            height=45
+        )
+        self.s3_object_preview_status = ft.Text("", size=12, color=ft.Colors.GREY_400)
+        self.s3_object_preview_grid = ft.Container()
+        self.s3_object_preview_container = ft.Container(
+            content=ft.Column([
+                ft.Row([
+                    self.s3_object_preview_title,
+                    ft.IconButton(icon=ft.Icons.COPY, tooltip="Copiar caminho S3",
+                                  on_click=self.copy_s3_object_preview_uri),
+                    ft.IconButton(icon=ft.Icons.CLOSE, tooltip="Fechar prévia", on_click=self.close_s3_object_preview),
+                ], spacing=5),
+                ft.Row([
+                    self.s3_object_preview_where,
+                    ft.IconButton(icon=ft.Icons.FILTER_ALT, tooltip="Filtrar no S3 (S3 Select)",
+                                  on_click=self.apply_s3_object_preview_filter),
+                ], spacing=10),
+                self.s3_object_preview_status,
+                self.s3_object_preview_grid,
+            ], spacing=8),
+            padding=ft.padding.all(10),
+            bgcolor=ft.Colors.GREY_800,
+            border_radius=8,
+            visible=False
+        )
+        self.s3_browser_container = ft.Container(
+            content=ft.Column([
+                self.s3_browser_breadcrumb,
+                ft.Row([
+                    self.s3_browser_filter,
+                    ft.IconButton(
+                        icon=ft.Icons.REFRESH,
+                        tooltip="Listar novamente (ignora o cache)",
+                        on_click=lambda e: self.navigate_s3_browser(self.s3_browser_prefix, force=True)
+                    ),
+                ], spacing=10),
+                self.s3_browser_status,
+                self.s3_browser_list,
+                self.s3_object_preview_container,
+            ], spacing=8),
+            padding=ft.padding.all(15),
+            bgcolor=ft.Colors.GREY_900,
+            border_radius=8,
+            visible=False
+        )
+
+        # Conversão CSV/JSON → Parquet no envio
+        self.parquet_checkbox = ft.Checkbox(
+            label="🗜️ Converter CSV/JSON para Parquet no envio (Local → S3)",
+            value=False,
+            tooltip="Envia Parquet comprimido no lugar dos CSV/JSON (menos dados escaneados no Athena)"
+        )
+
+        # Auto-sync da pasta local
+        self.s3_watch_checkbox = ft.Checkbox(
+            label="👀 Auto-sync: enviar alterações da pasta local para o S3",
+            value=False,
+            on_change=self.on_s3_watch_toggle,
+            tooltip="Observa a pasta local selecionada e envia arquivos novos/alterados em lotes"
+        )
+        self.s3_watch_status = ft.Text("", size=12, color=ft.Colors.GREY_400)
+
         # Checkbox para --delete no S3 → Local
         self.delete_checkbox = ft.Checkbox(
             label="Usar --delete (S3 → Local)",
@@ -886,6 +1404,15 @@ class AWSApp:
         self.s3_progress = ft.ProgressRing(
             visible=False
         )
+
+        # Lista de jobs da fila de transferências
+        self.transfer_jobs_list = ft.Column(spacing=8)
+        self.clear_transfer_jobs_button = ft.TextButton(
+            "🧹 Limpar concluídos",
+            on_click=self.clear_finished_transfer_jobs,
+            tooltip="Remove da lista os jobs já encerrados"
+        )
+        self.render_transfer_jobs()
         self.s3_status = ft.Text(
             "",
             size=14,
@@ -931,6 +1458,9 @@ class AWSApp:
                         ], spacing=10, alignment=ft.MainAxisAlignment.SPACE_BETWEEN),
                         ft.Container(height=8),
                         self.s3_path_text,
+                        ft.Container(height=8),
+                        self.s3_browser_button,
+                        self.s3_browser_container,
                     ]),
                     padding=ft.padding.all(20),
                     bgcolor=ft.Colors.GREY_800,
@@ -956,10 +1486,36 @@ class AWSApp:
                             self.sync_from_s3_button,
                             self.s3_progress
                         ], spacing=20, alignment=ft.MainAxisAlignment.CENTER),
+                        ft.Container(height=10),
+                        ft.Row([
+                            self.preview_to_s3_button,
+                            self.preview_from_s3_button,
+                            self.s3_batch_button
+                        ], spacing=20, alignment=ft.MainAxisAlignment.CENTER, wrap=True),
+                        self.s3_batch_container,
                         ft.Container(height=15),
+                        self.transfer_settings_title,
+                        ft.Row([
+                            self.transfer_parallel_files_field,
+                            self.transfer_concurrency_field,
+                            self.transfer_bandwidth_field,
+                            self.transfer_chunksize_field,
+                            self.save_transfer_settings_button
+                        ], spacing=10, wrap=True),
+                        ft.Container(height=10),
                         self.delete_checkbox,
+                        self.parquet_checkbox,
+                        self.s3_watch_checkbox,
+                        self.s3_watch_status,
                         ft.Container(height=10),
+                        self.s3_preview_container,
                         self.s3_status,
+                        ft.Container(height=10),
+                        ft.Row([
+                            ft.Text("Transferências:", size=14, weight=ft.FontWeight.BOLD, color=ft.Colors.WHITE),
+                            self.clear_transfer_jobs_button
+                        ], alignment=ft.MainAxisAlignment.SPACE_BETWEEN),
+                        self.transfer_jobs_list,
                     ]),
                     padding=ft.padding.all(20),
                     bgcolor=ft.Colors.GREY_800,
@@ -1553,6 +2109,10 @@ class AWSApp:
             self.sync_to_s3_button.disabled = True
             self.sync_from_s3_button.disabled = True
 
+        # Ajustes de transferência acompanham o ambiente selecionado
+        if hasattr(self, 'transfer_parallel_files_field'):
+            self.load_transfer_settings_fields()
+
         # Salvar seleções automaticamente (somente se não estamos carregando)
         if not hasattr(self, '_loading_selections') or not self._loading_selections:
             self.save_selections()
@@ -1729,6 +2289,11 @@ class AWSApp:
                         job_name = future_to_job[future]
                         print(f"❌ Erro ao buscar detalhes do job {job_name}: {e}")
 
+            # 3. Triggers do Glue (uma listagem só, para o grafo de gatilhos)
+            triggers_by_job = self.fetch_glue_triggers_by_job(glue_client)
+            for job in jobs:
+                job['triggers'] = triggers_by_job.get(job['name'], [])
+
             total_time = time.time() - start_time
             print(f"✅ Carregamento concluído! {len(jobs)} jobs processados em {total_time:.1f}s")
             return jobs
@@ -1745,10 +2310,10 @@ class AWSApp:
             self.page.update()
             return
 
-        # Verificar se cache é recente (menos de 15 minutos)
-        if self.is_cache_fresh("glue", 15):
-            self.monitoring_status.value = "⏰ Cache recente (menos de 15 min) - Use o cache existente para evitar custos adicionais"
-            self.monitoring_status.color = ft.Colors.BLUE
+        # Evitar duas varreduras simultâneas do mesmo conjunto de dados
+        if not self.begin_dataset_refresh("glue"):
+            self.monitoring_status.value = "⏳ Atualização já em andamento, aguarde o resultado"
+            self.monitoring_status.color = ft.Colors.ORANGE
             self.page.update()
             return
 
@@ -1761,25 +2326,42 @@ class AWSApp:
         try:
             # Buscar jobs em thread separada para não bloquear UI
             def fetch_in_background():
-                jobs = self.fetch_glue_jobs()
+                try:
+                    jobs = self.fetch_glue_jobs()
+                except Exception as e:
+                    def update_error():
+                        self.monitoring_status.value = f"❌ Erro ao carregar jobs: {str(e)}"
+                        self.monitoring_status.color = ft.Colors.RED
+                        self.monitoring_progress.visible = False
+                        self.refresh_button.disabled = False
+                        self.end_dataset_refresh("glue")
+                        self.page.update()
+
+                    self.page.run_thread(update_error)
+                    return
 
                 # Atualizar UI na thread principal
                 def update_ui():
-                    self.all_jobs = jobs
-                    self.filter_jobs()  # Aplicar filtro atual
-
-                    # Salvar cache após carregar dados
-                    if jobs:
-                        self.save_glue_cache(jobs)
+                    try:
+                        self.all_jobs = jobs
+                        self.filter_jobs()  # Aplicar filtro atual
 
-                    self.last_update_text.value = f"Última atualização: {datetime.now().strftime('%H:%M:%S')}"
+                        # Salvar cache após carregar dados
+                        if jobs:
+                            self.save_cache("glue", jobs)
 
-                    self.monitoring_status.value = f"✅ {len(jobs)} jobs encontrados"
+                        self.last_update_text.value = f"Última atualização: {datetime.now().strftime('%H:%M:%S')}"
 
-                    self.monitoring_status.color = ft.Colors.GREEN
+                        self.monitoring_status.value = f"✅ {len(jobs)} jobs encontrados"
 
-                    self.monitoring_progress.visible = False
-                    self.refresh_button.disabled = False
+                        self.monitoring_status.color = ft.Colors.GREEN
+                    except Exception as e:
+                        self.monitoring_status.value = f"❌ Erro ao atualizar jobs: {str(e)}"
+                        self.monitoring_status.color = ft.Colors.RED
+                    finally:
+                        self.monitoring_progress.visible = False
+                        self.refresh_button.disabled = False
+                        self.end_dataset_refresh("glue")
                     self.page.update()
 
                 # Executar atualização da UI na thread principal
@@ -1789,6 +2371,7 @@ class AWSApp:
             threading.Thread(target=fetch_in_background, daemon=True).start()
 
         except Exception as e:
+            self.end_dataset_refresh("glue")
             self.monitoring_status.value = f"❌ Erro: {str(e)}"
             self.monitoring_status.color = ft.Colors.RED
             self.monitoring_progress.visible = False
@@ -1896,7 +2479,10 @@ class AWSApp:
 
             row = ft.DataRow(
                 cells=[
-                    ft.DataCell(ft.Text(job['name'], size=12)),
+                    ft.DataCell(
+                        ft.Text(job['name'], size=12),
+                        on_tap=lambda e, job_name=job['name']: self.show_trigger_graph_dialog(f"glue:job:{job_name}")
+                    ),
                     ft.DataCell(ft.Text(job['status'], size=12, color=status_color, weight=ft.FontWeight.BOLD)),
                     ft.DataCell(ft.Text(job['last_execution'], size=12)),
                     ft.DataCell(ft.Text(job['duration'], size=12)),
@@ -2020,10 +2606,10 @@ class AWSApp:
             self.page.update()
             return
 
-        # Verificar se cache é recente (menos de 15 minutos)
-        if self.is_cache_fresh("stpf", 15):
-            self.monitoring_status_sptf.value = "⏰ Cache recente (menos de 15 min) - Use o cache existente para evitar custos adicionais"
-            self.monitoring_status_sptf.color = ft.Colors.BLUE
+        # Evitar duas varreduras simultâneas do mesmo conjunto de dados
+        if not self.begin_dataset_refresh("stpf"):
+            self.monitoring_status_sptf.value = "⏳ Atualização já em andamento, aguarde o resultado"
+            self.monitoring_status_sptf.color = ft.Colors.ORANGE
             self.page.update()
             return
 
@@ -2036,23 +2622,40 @@ class AWSApp:
         try:
             # Buscar jobs em thread separada para não bloquear UI
             def fetch_in_background():
-                jobs = self.fetch_step_functions()
+                try:
+                    jobs = self.fetch_step_functions()
+                except Exception as e:
+                    def update_error():
+                        self.monitoring_status_sptf.value = f"❌ Erro ao carregar Step Functions: {str(e)}"
+                        self.monitoring_status_sptf.color = ft.Colors.RED
+                        self.monitoring_progress_stpf.visible = False
+                        self.refresh_button_stpf.disabled = False
+                        self.end_dataset_refresh("stpf")
+                        self.page.update()
+
+                    self.page.run_thread(update_error)
+                    return
 
                 # Atualizar UI na thread principal
                 def update_ui():
-                    self.all_stpf = jobs
-                    self.filter_stpf_jobs()  # Aplicar filtro atual
-
-                    # Salvar cache após carregar dados
-                    if jobs:
-                        self.save_stpf_cache(jobs)
+                    try:
+                        self.all_stpf = jobs
+                        self.filter_stpf_jobs()  # Aplicar filtro atual
 
-                    self.last_update_text_stpf.value = f"Última atualização: {datetime.now().strftime('%H:%M:%S')}"
-                    self.monitoring_status_sptf.value = f"✅ {len(jobs)} Step Functions encontradas"
-                    self.monitoring_status_sptf.color = ft.Colors.GREEN
+                        # Salvar cache após carregar dados
+                        if jobs:
+                            self.save_cache("stpf", jobs)
 
-                    self.monitoring_progress_stpf.visible = False
-                    self.refresh_button_stpf.disabled = False
+                        self.last_update_text_stpf.value = f"Última atualização: {datetime.now().strftime('%H:%M:%S')}"
+                        self.monitoring_status_sptf.value = f"✅ {len(jobs)} Step Functions encontradas"
+                        self.monitoring_status_sptf.color = ft.Colors.GREEN
+                    except Exception as e:
+                        self.monitoring_status_sptf.value = f"❌ Erro ao atualizar Step Functions: {str(e)}"
+                        self.monitoring_status_sptf.color = ft.Colors.RED
+                    finally:
+                        self.monitoring_progress_stpf.visible = False
+                        self.refresh_button_stpf.disabled = False
+                        self.end_dataset_refresh("stpf")
                     self.page.update()
 
                 # Executar atualização da UI na thread principal
@@ -2062,6 +2665,7 @@ class AWSApp:
             threading.Thread(target=fetch_in_background, daemon=True).start()
 
         except Exception as e:
+            self.end_dataset_refresh("stpf")
             self.monitoring_status_sptf.value = f"❌ Erro: {str(e)}"
             self.monitoring_status_sptf.color = ft.Colors.RED
             self.monitoring_progress_stpf.visible = False
@@ -2233,12 +2837,27 @@ class AWSApp:
                 duration_str = "N/A"
                 start_time = None
 
+            # Jobs Glue e state machines iniciados pela definição (para o grafo de gatilhos)
+            try:
+                definition = self.retry_with_backoff(
+                    sfn_client.describe_state_machine,
+                    max_retries=3,
+                    base_delay=1.0,
+                    stateMachineArn=sm_arn
+                ).get('definition', '{}')
+                definition_refs = self.extract_state_machine_refs(definition)
+            except Exception as e:
+                print(f"⚠️ Erro ao ler definição da Step Function {sm_name}: {e}")
+                definition_refs = {"glue_jobs": [], "state_machines": []}
+
             return {
                 'name': sm_name,
+                'arn': sm_arn,
                 'status': status,
                 'last_execution': started_on_str,
                 'duration': duration_str,
-                'start_time_obj': start_time  # Para ordenação
+                'start_time_obj': start_time,  # Para ordenação
+                'definition_refs': definition_refs
             }
 
         except Exception as e:
@@ -2286,7 +2905,10 @@ class AWSApp:
 
             row = ft.DataRow(
                 cells=[
-                    ft.DataCell(ft.Text(job['name'], size=12, color=ft.Colors.WHITE)),
+                    ft.DataCell(
+                        ft.Text(job['name'], size=12, color=ft.Colors.WHITE),
+                        on_tap=lambda e, sm_name=job['name']: self.show_trigger_graph_dialog(f"sfn:{sm_name}")
+                    ),
                     ft.DataCell(ft.Text(job['status'], size=12, color=status_color, weight=ft.FontWeight.BOLD)),
                     ft.DataCell(ft.Text(job['last_execution'], size=12, color=ft.Colors.WHITE)),
                     ft.DataCell(ft.Text(job['duration'], size=12, color=ft.Colors.WHITE)),
@@ -2465,434 +3087,570 @@ class AWSApp:
             print(f"❌ Erro ao criar pasta de cache: {e}")
             return False
 
-    def get_glue_cache_filename(self):
-        """Retorna o nome do arquivo de cache do Glue para a conta atual"""
-        if not self.current_account_id:
-            return self.cache_dir / "glue_cache.json"  # Fallback para casos sem account_id
-        return self.cache_dir / f"glue_cache_{self.current_account_id}.json"
-
-    def get_stpf_cache_filename(self):
-        """Retorna o nome do arquivo de cache do Step Functions para a conta atual"""
-        if not self.current_account_id:
-            return self.cache_dir / "stpf_cache.json"  # Fallback para casos sem account_id
-        return self.cache_dir / f"stpf_cache_{self.current_account_id}.json"
-
-    def is_cache_fresh(self, cache_type, minutes_threshold=15):
-        """Verifica se o cache é recente (menos de X minutos)"""
-        try:
-            if cache_type == "glue":
-                cache_file = self.get_glue_cache_filename()
-            elif cache_type == "stpf":
-                cache_file = self.get_stpf_cache_filename()
-            elif cache_type == "tables":
-                cache_file = self.get_tables_cache_filename()
-            else:
-                return False
-
-            if not cache_file.exists():
-                return False
-
-            with open(cache_file, 'r', encoding='utf-8') as f:
-                cache_data = json.load(f)
+    def setup_cache_datasets(self):
+        """Registra os conjuntos de dados com cache local.
 
-            # Verificar se é da conta/profile atual
-            if (cache_data.get("account_id") != self.current_account_id or
-                cache_data.get("profile") != self.current_profile):
-                return False
+        TTLs podem ser sobrescritos em config.json -> cache.soft_ttl_minutes / cache.hard_ttl_minutes.
+        """
+        self.cache_datasets = {}
+        self.refreshing_datasets = set()
+        self.refresh_lock = threading.Lock()
+        self.cache_index_lock = threading.Lock()
+        self.register_cache_dataset("glue", "jobs", "Glue", soft_ttl_minutes=15, hard_ttl_minutes=24 * 60,
+                                    datetime_fields=("start_time_obj",),
+                                    on_load=lambda items: self.update_trigger_graph("glue", items))
+        self.register_cache_dataset("stpf", "step_functions", "STP", soft_ttl_minutes=15, hard_ttl_minutes=24 * 60,
+                                    datetime_fields=("start_time_obj",),
+                                    on_load=lambda items: self.update_trigger_graph("stpf", items))
+        self.register_cache_dataset("tables", "tables", "Tables", soft_ttl_minutes=15, hard_ttl_minutes=24 * 60)
+        self.register_cache_dataset("eventbridge", "rules", "EventBridge", soft_ttl_minutes=15, hard_ttl_minutes=24 * 60,
+                                    on_load=lambda items: self.update_trigger_graph("eventbridge", items))
+
+    def register_cache_dataset(self, name, items_key, label, soft_ttl_minutes, hard_ttl_minutes,
+                               schema_version=1, datetime_fields=(), on_load=None):
+        """Registra um conjunto de dados no cache.
+
+        items_key: chave da lista de itens no arquivo; datetime_fields: campos datetime dos itens
+        (serializados como epoch); on_load: callback chamado com os itens sempre que são salvos/carregados.
+        Até o soft TTL o cache é considerado atual; entre o soft e o hard TTL ele é exibido e revalidado
+        em segundo plano; depois do hard TTL é descartado. Arquivos com schema_version diferente são ignorados.
+        """
+        cache_config = self.config.get("cache", {})
+        self.cache_datasets[name] = {
+            "items_key": items_key,
+            "label": label,
+            "soft_ttl_minutes": cache_config.get("soft_ttl_minutes", {}).get(name, soft_ttl_minutes),
+            "hard_ttl_minutes": cache_config.get("hard_ttl_minutes", {}).get(name, hard_ttl_minutes),
+            "schema_version": schema_version,
+            "datetime_fields": tuple(datetime_fields),
+            "on_load": on_load
+        }
 
-            # Verificar timestamp
-            updated_at = cache_data.get("updated_at")
-            if not updated_at:
+    def begin_dataset_refresh(self, dataset):
+        """Marca o início de uma busca na AWS. Retorna False se já houver uma em andamento"""
+        with self.refresh_lock:
+            if dataset in self.refreshing_datasets:
+                print(f"⏳ Atualização de {dataset} já em andamento, ignorando nova solicitação")
                 return False
+            self.refreshing_datasets.add(dataset)
+            return True
 
-            # Converter timestamp para datetime
-            cache_time = datetime.fromisoformat(updated_at.replace('Z', '+00:00'))
-            current_time = datetime.now(timezone.utc)
-
-            # Calcular diferença em minutos
-            time_diff = (current_time - cache_time).total_seconds() / 60
-
-            is_fresh = time_diff < minutes_threshold
-            print(f"🕐 Cache {cache_type}: {time_diff:.1f} min atrás - {'fresco' if is_fresh else 'expirado'}")
-
-            return is_fresh
+    def end_dataset_refresh(self, dataset):
+        """Marca o fim de uma busca na AWS"""
+        with self.refresh_lock:
+            self.refreshing_datasets.discard(dataset)
 
+    def get_dataset_cache_age(self, dataset):
+        """Retorna a idade do cache em minutos lendo apenas o cabeçalho (None se não houver cache)"""
+        try:
+            header = self._read_cache_header(dataset)
+            return self.get_cache_age_minutes(header) if header else None
         except Exception as e:
-            print(f"❌ Erro ao verificar cache {cache_type}: {e}")
-            return False
+            print(f"❌ Erro ao verificar cache {dataset}: {e}")
+            return None
+
+    def format_cache_age(self, age_minutes):
+        """Formata a idade do cache para exibição (ex: 'há 5 min', 'há 3 h')"""
+        if age_minutes is None:
+            return "idade desconhecida"
+        if age_minutes < 1:
+            return "agora há pouco"
+        if age_minutes < 60:
+            return f"há {age_minutes:.0f} min"
+        if age_minutes < 48 * 60:
+            return f"há {age_minutes / 60:.0f} h"
+        return f"há {age_minutes / 1440:.0f} d"
+
+    def is_cache_stale(self, dataset, age_minutes):
+        """Indica se o cache passou do soft TTL e deve ser revalidado"""
+        return age_minutes is None or age_minutes >= self.cache_datasets[dataset]["soft_ttl_minutes"]
+
+    def get_cache_scope(self):
+        """Retorna (conta, role/usuário, região) que identificam o cache da sessão atual.
+
+        Profiles SSO diferentes que assumem a mesma role na mesma conta compartilham o cache.
+        """
+        account = self.current_account_id or "unknown"
+        arn = self.current_user_arn or ""
+        # arn:aws:sts::123:assumed-role/Role/sessao -> Role | arn:aws:iam::123:user/nome -> user-nome
+        resource = arn.split(":", 5)[-1] if arn.count(":") >= 5 else ""
+        parts = resource.split("/")
+        if parts[0] == "assumed-role" and len(parts) > 1:
+            role = parts[1]
+        elif len(parts) > 1:
+            role = f"{parts[0]}-{parts[-1]}"
+        else:
+            role = self.current_profile or "default"
+        region = getattr(self, "current_region", None) or "global"
+        return account, role, region
+
+    def get_cache_store_dir(self, scope=None):
+        """Retorna a pasta do cache para uma conta/role/região"""
+        account, role, region = scope or self.get_cache_scope()
+        folder = "_".join(re.sub(r"[^A-Za-z0-9.-]", "-", value) for value in (account, role, region))
+        return self.cache_dir / "store" / folder
+
+    def get_cache_filename(self, dataset, scope=None):
+        """Retorna o nome do arquivo de cache do conjunto de dados para a conta/role/região atual"""
+        return self.get_cache_store_dir(scope) / f"{dataset}.bin"
+
+    def get_cache_header_filename(self, dataset, scope=None):
+        """Retorna o arquivo de cabeçalho (metadados) que acompanha o cache do conjunto de dados"""
+        return self.get_cache_store_dir(scope) / f"{dataset}.meta.json"
+
+    def get_legacy_cache_filenames(self, dataset):
+        """Retorna os caches por conta das versões anteriores (lidos apenas para migração)"""
+        base = self.cache_dir / f"{dataset}_cache_{self.current_account_id}"
+        return [base.with_suffix(".bin"), base.with_suffix(".json")]
+
+    def _atomic_write_bytes(self, path, data):
+        """Grava em arquivo temporário na mesma pasta e renomeia (um crash nunca deixa arquivo truncado)"""
+        path.parent.mkdir(parents=True, exist_ok=True)
+        fd, temp_path = tempfile.mkstemp(dir=path.parent, prefix=path.name + ".", suffix=".tmp")
+        try:
+            with os.fdopen(fd, 'wb') as f:
+                f.write(data)
+                f.flush()
+                os.fsync(f.fileno())
+            os.replace(temp_path, path)
+        except Exception:
+            try:
+                os.remove(temp_path)
+            except OSError:
+                pass
+            raise
+
+    def _encode_cache_payload(self, cache_data):
+        """Serializa e comprime o payload. Usa msgpack/zstd quando instalados, senão JSON/zlib"""
+        if msgpack is not None:
+            raw = msgpack.packb(cache_data, use_bin_type=True)
+        else:
+            raw = json.dumps(cache_data, ensure_ascii=False, separators=(',', ':')).encode('utf-8')
 
-    def is_cache_fresh_by_data(self, cache_data, minutes_threshold=15):
-        """Verifica se o cache é recente usando dados já carregados"""
+        if zstandard is not None:
+            compressed = zstandard.ZstdCompressor(level=3).compress(raw)
+        else:
+            compressed = zlib.compress(raw, 6)
+
+        encoding = f"{'msgpack' if msgpack is not None else 'json'}+{'zstd' if zstandard is not None else 'zlib'}"
+        return compressed, encoding
+
+    def _decode_cache_payload(self, data, encoding):
+        """Descomprime e desserializa o payload conforme o encoding registrado no cabeçalho"""
+        serializer, compression = encoding.split('+')
+        if (serializer == "msgpack" and msgpack is None) or (compression == "zstd" and zstandard is None):
+            raise ValueError(f"encoding {encoding} requer pacote não instalado")
+
+        raw = zstandard.ZstdDecompressor().decompress(data) if compression == "zstd" else zlib.decompress(data)
+        if serializer == "msgpack":
+            return msgpack.unpackb(raw, raw=False)
+        return json.loads(raw.decode('utf-8'))
+
+    def _datetimes_to_epoch(self, items, datetime_fields):
+        """Copia os itens trocando campos datetime por int64 (microssegundos desde epoch, UTC)"""
+        serialized_items = []
+        for item in items:
+            item_copy = item.copy()
+            for field in datetime_fields:
+                value = item_copy.get(field)
+                item_copy[field] = round(value.timestamp() * 1_000_000) if value else None
+            serialized_items.append(item_copy)
+        return serialized_items
+
+    def _epoch_to_datetimes(self, items, datetime_fields):
+        """Converte (vetorizado) os campos int64 epoch de volta para datetime UTC"""
+        for field in datetime_fields:
+            positions = [i for i, item in enumerate(items) if item.get(field) is not None]
+            if not positions:
+                continue
+            epochs = np.array([items[i][field] for i in positions], dtype='int64')
+            values = pd.to_datetime(epochs, unit='us', utc=True).to_pydatetime()
+            for i, value in zip(positions, values):
+                items[i][field] = value
+
+    def _parse_cache_timestamp(self, value):
+        """Converte o timestamp salvo para datetime UTC (caches antigos usavam horário local sem timezone)"""
+        cache_time = datetime.fromisoformat(value.replace('Z', '+00:00'))
+        if cache_time.tzinfo is None:
+            cache_time = cache_time.astimezone()  # Interpreta como horário local
+        return cache_time.astimezone(timezone.utc)
+
+    def get_cache_age_minutes(self, cache_data):
+        """Retorna a idade do cache em minutos (None se não houver timestamp válido)"""
         try:
-            # Verificar timestamp
             updated_at = cache_data.get("updated_at")
             if not updated_at:
-                return False
-
-            # Converter timestamp para datetime
-            cache_time = datetime.fromisoformat(updated_at.replace('Z', '+00:00'))
-            current_time = datetime.now(timezone.utc)
-
-            # Calcular diferença em minutos
-            time_diff = (current_time - cache_time).total_seconds() / 60
-
-            is_fresh = time_diff < minutes_threshold
-            print(f"🕐 Cache Tables: {time_diff:.1f} min atrás - {'fresco' if is_fresh else 'expirado'}")
-
-            return is_fresh
-
+                return None
+            return (datetime.now(timezone.utc) - self._parse_cache_timestamp(updated_at)).total_seconds() / 60
         except Exception as e:
             print(f"❌ Erro ao verificar timestamp do cache: {e}")
-            return False
+            return None
 
-    def save_glue_cache(self, jobs_data):
-        """Salva dados dos jobs Glue no cache local"""
+    def migrate_legacy_cache(self, dataset):
+        """Move um cache antigo (arquivo por conta, JSON ou .bin) para a pasta da conta/role/região atual"""
+        spec = self.cache_datasets[dataset]
+        legacy_bin, legacy_json = self.get_legacy_cache_filenames(dataset)
         try:
-            if not self.ensure_cache_directory():
-                return False
-
-            current_time = datetime.now().isoformat()
-            cache_data = {
-                "timestamp": current_time,
-                "updated_at": current_time,
-                "account_id": self.current_account_id,
-                "profile": self.current_profile,
-                "jobs_count": len(jobs_data),
-                "jobs": []
-            }
-
-            # Converter dados para JSON (datetime não é serializável)
-            for job in jobs_data:
-                job_copy = job.copy()
-                if 'start_time_obj' in job_copy and job_copy['start_time_obj']:
-                    job_copy['start_time_obj'] = job_copy['start_time_obj'].isoformat()
-                else:
-                    job_copy['start_time_obj'] = None
-                cache_data["jobs"].append(job_copy)
+            if legacy_bin.exists():
+                legacy_header_file = legacy_bin.with_name(legacy_bin.stem + ".meta.json")
+                with open(legacy_header_file, 'r', encoding='utf-8') as f:
+                    cache_data = json.load(f)
+                with open(legacy_bin, 'rb') as f:
+                    payload = self._decode_cache_payload(f.read(), cache_data.get("encoding", "json+zlib"))
+                items = payload.get(spec["items_key"], [])
+                self._epoch_to_datetimes(items, spec["datetime_fields"])
+                legacy_files = [legacy_bin, legacy_header_file]
+            elif legacy_json.exists():
+                with open(legacy_json, 'r', encoding='utf-8') as f:
+                    cache_data = json.load(f)
+                items = cache_data.get(spec["items_key"], [])
+                for item in items:
+                    for field in spec["datetime_fields"]:
+                        if item.get(field):
+                            try:
+                                item[field] = datetime.fromisoformat(item[field])
+                            except (TypeError, ValueError):
+                                item[field] = None
+                legacy_header_file = legacy_json.with_name(legacy_json.stem + ".meta.json")
+                legacy_files = [legacy_json, legacy_header_file]
+            else:
+                return
 
-            cache_file = self.get_glue_cache_filename()
-            with open(cache_file, 'w', encoding='utf-8') as f:
-                json.dump(cache_data, f, indent=2, ensure_ascii=False)
+            # Só migra caches da própria conta/profile; os demais são descartados
+            if (cache_data.get("account_id") == self.current_account_id and
+                    cache_data.get("profile") == self.current_profile):
+                updated_at = cache_data.get("updated_at")
+                updated_at = self._parse_cache_timestamp(updated_at).isoformat() if updated_at else None
+                self._write_cache(dataset, items, updated_at=updated_at)
+                print(f"🔁 Cache {spec['label']} migrado para {self.get_cache_store_dir().name}")
 
-            print(f"💾 Cache Glue salvo: {len(jobs_data)} jobs em {cache_file}")
-            return True
+            for legacy_file in legacy_files:
+                if legacy_file.exists():
+                    legacy_file.unlink()
 
         except Exception as e:
-            print(f"❌ Erro ao salvar cache Glue: {e}")
-            return False
+            print(f"⚠️ Erro ao migrar cache {spec['label']}: {e}")
+
+    def _find_cache_scope(self, dataset):
+        """Escolhe de onde ler o cache: o da role atual ou, só com cache.share_across_roles ligado,
+        o mais recente de outra role da mesma conta e região (roles podem ter permissões diferentes,
+        por isso fica desligado por padrão). Retorna o escopo (conta, role, região) ou None"""
+        scope = self.get_cache_scope()
+        if self.get_cache_filename(dataset, scope).exists():
+            return scope
+
+        if any(path.exists() for path in self.get_legacy_cache_filenames(dataset)):
+            self.migrate_legacy_cache(dataset)
+            if self.get_cache_filename(dataset, scope).exists():
+                return scope
+
+        if not self.config.get("cache", {}).get("share_across_roles", False):
+            return None
 
-    def load_glue_cache(self):
-        """Carrega dados dos jobs Glue do cache local"""
-        try:
-            cache_file = self.get_glue_cache_filename()
-            if not cache_file.exists():
-                return None
+        account, _, region = scope
+        store_dir = self.cache_dir / "store"
+        if not store_dir.exists():
+            return None
 
-            with open(cache_file, 'r', encoding='utf-8') as f:
-                cache_data = json.load(f)
+        best_scope = None
+        best_updated_at = ""
+        for header_file in store_dir.glob(f"*/{dataset}.meta.json"):
+            try:
+                with open(header_file, 'r', encoding='utf-8') as f:
+                    header = json.load(f)
+            except (OSError, ValueError):
+                continue
+            if header.get("account_id") == account and header.get("region") == region:
+                if header.get("updated_at", "") > best_updated_at:
+                    best_updated_at = header.get("updated_at", "")
+                    best_scope = (account, header.get("role"), region)
+
+        if best_scope:
+            print(f"🔀 Cache {dataset} reaproveitado da role {best_scope[1]} (mesma conta e região)")
+        return best_scope
+
+    def _read_cache_header(self, dataset):
+        """Lê só o cabeçalho do cache e valida conta/região e versão do schema.
+
+        Retorna o dict (com a chave interna '_scope' indicando de onde ler o payload) ou None.
+        """
+        spec = self.cache_datasets[dataset]
+        scope = self._find_cache_scope(dataset)
+        if not scope:
+            return None
 
-            # Verificar se o cache é para a conta/profile atual
-            if (cache_data.get("account_id") != self.current_account_id or
-                cache_data.get("profile") != self.current_profile):
-                print("🔄 Cache Glue é de outra conta/profile, ignorando...")
-                return None
+        cache_file = self.get_cache_filename(dataset, scope)
+        header_file = self.get_cache_header_filename(dataset, scope)
+        if not cache_file.exists() or not header_file.exists():
+            return None
+        with open(header_file, 'r', encoding='utf-8') as f:
+            header = json.load(f)
 
-            # Converter datetime strings de volta
-            jobs = []
-            for job in cache_data.get("jobs", []):
-                if job.get('start_time_obj'):
-                    try:
-                        job['start_time_obj'] = datetime.fromisoformat(job['start_time_obj'])
-                    except:
-                        job['start_time_obj'] = None
-                jobs.append(job)
+        # Cabeçalho de outro payload (ex: crash entre as duas gravações): cache inválido
+        if header.get("payload_size") != cache_file.stat().st_size:
+            print(f"⚠️ Cabeçalho do cache {spec['label']} não corresponde ao payload, ignorando...")
+            return None
 
-            cache_timestamp = cache_data.get("timestamp", "")
-            print(f"📁 Cache Glue carregado: {len(jobs)} jobs (salvo em {cache_timestamp})")
-            return jobs
+        # Verificar se o cache é para a conta/região atual
+        account, _, region = self.get_cache_scope()
+        if header.get("account_id") != account or header.get("region") != region:
+            print(f"🔄 Cache {spec['label']} é de outra conta/região, ignorando...")
+            return None
 
-        except Exception as e:
-            print(f"❌ Erro ao carregar cache Glue: {e}")
+        if header.get("schema_version") != spec["schema_version"]:
+            print(f"🔄 Cache {spec['label']} com schema antigo, ignorando...")
             return None
 
-    def save_stpf_cache(self, stpf_data):
-        """Salva dados das Step Functions no cache local"""
+        header["_scope"] = scope
+        return header
+
+    def is_cache_fresh(self, cache_type, minutes_threshold=None):
+        """Verifica se o cache é recente (menos de X minutos; padrão: soft TTL do conjunto de dados)"""
         try:
-            if not self.ensure_cache_directory():
+            if cache_type not in self.cache_datasets:
                 return False
+            if minutes_threshold is None:
+                minutes_threshold = self.cache_datasets[cache_type]["soft_ttl_minutes"]
 
-            current_time = datetime.now().isoformat()
-            cache_data = {
-                "timestamp": current_time,
-                "updated_at": current_time,
-                "account_id": self.current_account_id,
-                "profile": self.current_profile,
-                "stpf_count": len(stpf_data),
-                "step_functions": []
-            }
+            header = self._read_cache_header(cache_type)
+            if not header:
+                return False
 
-            # Converter dados para JSON
-            for stpf in stpf_data:
-                stpf_copy = stpf.copy()
-                if 'start_time_obj' in stpf_copy and stpf_copy['start_time_obj']:
-                    stpf_copy['start_time_obj'] = stpf_copy['start_time_obj'].isoformat()
-                else:
-                    stpf_copy['start_time_obj'] = None
-                cache_data["step_functions"].append(stpf_copy)
+            age_minutes = self.get_cache_age_minutes(header)
+            if age_minutes is None:
+                return False
 
-            cache_file = self.get_stpf_cache_filename()
-            with open(cache_file, 'w', encoding='utf-8') as f:
-                json.dump(cache_data, f, indent=2, ensure_ascii=False)
+            is_fresh = age_minutes < minutes_threshold
+            print(f"🕐 Cache {cache_type}: {age_minutes:.1f} min atrás - {'fresco' if is_fresh else 'expirado'}")
 
-            print(f"💾 Cache STP salvo: {len(stpf_data)} Step Functions em {cache_file}")
-            return True
+            return is_fresh
 
         except Exception as e:
-            print(f"❌ Erro ao salvar cache STP: {e}")
+            print(f"❌ Erro ao verificar cache {cache_type}: {e}")
             return False
 
-    def load_stpf_cache(self):
-        """Carrega dados das Step Functions do cache local"""
-        try:
-            cache_file = self.get_stpf_cache_filename()
-            if not cache_file.exists():
-                return None
+    def _write_cache(self, dataset, items, updated_at=None):
+        """Grava payload compacto e cabeçalho de um conjunto de dados na pasta da conta/role/região atual"""
+        spec = self.cache_datasets[dataset]
+        if not self.ensure_cache_directory():
+            return False
 
-            with open(cache_file, 'r', encoding='utf-8') as f:
-                cache_data = json.load(f)
+        account, role, region = self.get_cache_scope()
+        updated_at = updated_at or datetime.now(timezone.utc).isoformat()
+        cache_data = {
+            "dataset": dataset,
+            "schema_version": spec["schema_version"],
+            "timestamp": updated_at,
+            "updated_at": updated_at,
+            "account_id": account,
+            "role": role,
+            "region": region,
+            "profile": self.current_profile,
+            "count": len(items),
+            spec["items_key"]: self._datetimes_to_epoch(items, spec["datetime_fields"])
+        }
 
-            # Verificar se o cache é para a conta/profile atual
-            if (cache_data.get("account_id") != self.current_account_id or
-                cache_data.get("profile") != self.current_profile):
-                print("🔄 Cache STP é de outra conta/profile, ignorando...")
-                return None
+        # Payload primeiro, cabeçalho depois: o cabeçalho nunca aponta para um payload incompleto
+        cache_file = self.get_cache_filename(dataset)
+        payload, encoding = self._encode_cache_payload(cache_data)
+        self._atomic_write_bytes(cache_file, payload)
 
-            # Converter datetime strings de volta
-            stpf_list = []
-            for stpf in cache_data.get("step_functions", []):
-                if stpf.get('start_time_obj'):
-                    try:
-                        stpf['start_time_obj'] = datetime.fromisoformat(stpf['start_time_obj'])
-                    except:
-                        stpf['start_time_obj'] = None
-                stpf_list.append(stpf)
+        header = {key: value for key, value in cache_data.items() if key != spec["items_key"]}
+        header["encoding"] = encoding
+        header["payload_size"] = len(payload)
+        header_bytes = json.dumps(header, ensure_ascii=False).encode('utf-8')
+        self._atomic_write_bytes(self.get_cache_header_filename(dataset), header_bytes)
 
-            cache_timestamp = cache_data.get("timestamp", "")
-            print(f"📁 Cache STP carregado: {len(stpf_list)} Step Functions (salvo em {cache_timestamp})")
-            return stpf_list
+        self.touch_cache_index(cache_file, len(payload) + len(header_bytes))
+        self.enforce_cache_disk_budget(keep=cache_file)
+        return True
 
-        except Exception as e:
-            print(f"❌ Erro ao carregar cache STP: {e}")
-            return None
+    # Índice LRU do cache: caminho relativo do payload -> tamanho e último acesso
 
-    def get_tables_cache_filename(self):
-        """Retorna o nome do arquivo de cache das Tabelas para a conta atual"""
-        if not self.current_account_id:
-            return self.cache_dir / "tables_cache.json"  # Fallback para casos sem account_id
-        return self.cache_dir / f"tables_cache_{self.current_account_id}.json"
+    def get_cache_index_filename(self):
+        """Retorna o arquivo de índice (LRU) da pasta de cache"""
+        return self.cache_dir / "store" / "index.json"
 
-    def save_tables_cache(self, tables_data):
-        """Salva dados das Tabelas no cache local"""
+    def _read_cache_index(self):
+        """Lê o índice LRU (vazio se não existir ou estiver corrompido)"""
         try:
-            if not self.ensure_cache_directory():
-                return False
-
-            current_time = datetime.now(timezone.utc).isoformat()
-            cache_data = {
-                "timestamp": current_time,
-                "updated_at": current_time,
-                "account_id": self.current_account_id,
-                "profile": self.current_profile,
-                "tables_count": len(tables_data),
-                "tables": tables_data  # Tables data is already JSON serializable
-            }
-
-            cache_file = self.get_tables_cache_filename()
-            with open(cache_file, 'w', encoding='utf-8') as f:
-                json.dump(cache_data, f, indent=2, ensure_ascii=False)
-
-            print(f"💾 Cache Tables salvo: {len(tables_data)} tabelas em {cache_file}")
-            return True
+            with open(self.get_cache_index_filename(), 'r', encoding='utf-8') as f:
+                return json.load(f)
+        except (OSError, ValueError):
+            return {}
 
+    def touch_cache_index(self, cache_file, size=None):
+        """Registra o acesso (leitura ou gravação) a um cache no índice LRU"""
+        try:
+            with self.cache_index_lock:
+                index = self._read_cache_index()
+                key = cache_file.relative_to(self.cache_dir / "store").as_posix()
+                entry = index.get(key, {})
+                if size is not None:
+                    entry["size"] = size
+                entry["last_access"] = time.time()
+                index[key] = entry
+                self._atomic_write_bytes(self.get_cache_index_filename(), json.dumps(index).encode('utf-8'))
         except Exception as e:
-            print(f"❌ Erro ao salvar cache Tables: {e}")
-            return False
+            print(f"⚠️ Erro ao atualizar índice do cache: {e}")
 
-    def load_tables_cache(self):
-        """Carrega dados das Tabelas do cache local"""
+    def enforce_cache_disk_budget(self, keep=None):
+        """Remove os caches menos usados recentemente até caber no limite cache.max_disk_mb"""
         try:
-            cache_file = self.get_tables_cache_filename()
-            if not cache_file.exists():
-                return None
-
-            with open(cache_file, 'r', encoding='utf-8') as f:
-                cache_data = json.load(f)
-
-            # Verificar se o cache é para a conta/profile atual
-            if (cache_data.get("account_id") != self.current_account_id or
-                cache_data.get("profile") != self.current_profile):
-                print("🔄 Cache Tables é de outra conta/profile, ignorando...")
-                return None
-
-            # Verificar se o cache não está muito antigo (15 minutos)
-            if not self.is_cache_fresh_by_data(cache_data, minutes_threshold=15):
-                print("⏰ Cache Tables está muito antigo (>15 min), ignorando...")
-                return None
-
-            tables_list = cache_data.get("tables", [])
-            cache_timestamp = cache_data.get("timestamp", "")
-            print(f"📁 Cache Tables carregado: {len(tables_list)} tabelas (salvo em {cache_timestamp})")
-            return tables_list
-
+            max_bytes = self.config.get("cache", {}).get("max_disk_mb", 200) * 1024 * 1024
+            store_dir = self.cache_dir / "store"
+            with self.cache_index_lock:
+                index = self._read_cache_index()
+                total = sum(entry.get("size", 0) for entry in index.values())
+                if total <= max_bytes:
+                    return
+
+                keep_key = keep.relative_to(store_dir).as_posix() if keep else None
+                for key, entry in sorted(index.items(), key=lambda item: item[1].get("last_access", 0)):
+                    if total <= max_bytes:
+                        break
+                    if key == keep_key:
+                        continue
+                    payload_file = store_dir / key
+                    for path in (payload_file, payload_file.with_suffix(".meta.json")):
+                        if path.exists():
+                            path.unlink()
+                    total -= entry.get("size", 0)
+                    del index[key]
+                    print(f"🧹 Cache removido por limite de disco (LRU): {key}")
+
+                self._atomic_write_bytes(self.get_cache_index_filename(), json.dumps(index).encode('utf-8'))
         except Exception as e:
-            print(f"❌ Erro ao carregar cache Tables: {e}")
-            return None
-
-    def get_eventbridge_cache_filename(self):
-        """Retorna o nome do arquivo de cache do EventBridge para a conta atual"""
-        if not self.current_account_id:
-            return self.cache_dir / "eventbridge_cache.json"  # Fallback para casos sem account_id
-        return self.cache_dir / f"eventbridge_cache_{self.current_account_id}.json"
+            print(f"⚠️ Erro ao aplicar limite de disco do cache: {e}")
 
-    def save_eventbridge_cache(self, rules_data):
-        """Salva dados das regras EventBridge no cache local"""
+    def save_cache(self, dataset, items):
+        """Salva os itens de um conjunto de dados no cache local"""
+        spec = self.cache_datasets[dataset]
         try:
-            if not self.ensure_cache_directory():
+            if not self._write_cache(dataset, items):
                 return False
 
-            current_time = datetime.now(timezone.utc).isoformat()
-            cache_data = {
-                "timestamp": current_time,
-                "updated_at": current_time,
-                "account_id": self.current_account_id,
-                "profile": self.current_profile,
-                "rules_count": len(rules_data),
-                "rules": rules_data  # Rules data is already JSON serializable
-            }
-
-            cache_file = self.get_eventbridge_cache_filename()
-            with open(cache_file, 'w', encoding='utf-8') as f:
-                json.dump(cache_data, f, indent=2, ensure_ascii=False)
-
-            print(f"💾 Cache EventBridge salvo: {len(rules_data)} regras em {cache_file}")
+            print(f"💾 Cache {spec['label']} salvo: {len(items)} itens em {self.get_cache_filename(dataset)}")
+            if spec["on_load"]:
+                spec["on_load"](items)
             return True
 
         except Exception as e:
-            print(f"❌ Erro ao salvar cache EventBridge: {e}")
+            print(f"❌ Erro ao salvar cache {spec['label']}: {e}")
             return False
 
-    def load_eventbridge_cache(self):
-        """Carrega dados das regras EventBridge do cache local"""
+    def load_cache(self, dataset, ignore_age=False):
+        """Carrega os itens do cache local se estiverem dentro do hard TTL (ignore_age=True aceita qualquer idade)"""
+        spec = self.cache_datasets[dataset]
         try:
-            cache_file = self.get_eventbridge_cache_filename()
-            if not cache_file.exists():
+            header = self._read_cache_header(dataset)
+            if not header:
                 return None
 
-            with open(cache_file, 'r', encoding='utf-8') as f:
-                cache_data = json.load(f)
+            if not ignore_age:
+                age_minutes = self.get_cache_age_minutes(header)
+                if age_minutes is None or age_minutes >= spec["hard_ttl_minutes"]:
+                    print(f"⏰ Cache {spec['label']} está muito antigo (>{spec['hard_ttl_minutes']} min), ignorando...")
+                    return None
 
-            # Verificar se o cache é para a conta/profile atual
-            if (cache_data.get("account_id") != self.current_account_id or
-                cache_data.get("profile") != self.current_profile):
-                print("🔄 Cache EventBridge é de outra conta/profile, ignorando...")
-                return None
+            cache_file = self.get_cache_filename(dataset, header["_scope"])
+            with open(cache_file, 'rb') as f:
+                cache_data = self._decode_cache_payload(f.read(), header.get("encoding", "json+zlib"))
+            self.touch_cache_index(cache_file)
 
-            # Verificar se o cache não está muito antigo (15 minutos)
-            if not self.is_cache_fresh_by_data(cache_data, minutes_threshold=15):
-                print("⏰ Cache EventBridge está muito antigo (>15 min), ignorando...")
-                return None
+            items = cache_data.get(spec["items_key"], [])
+            self._epoch_to_datetimes(items, spec["datetime_fields"])
 
-            rules_list = cache_data.get("rules", [])
-            cache_timestamp = cache_data.get("timestamp", "")
-            print(f"📁 Cache EventBridge carregado: {len(rules_list)} regras (salvo em {cache_timestamp})")
-            return rules_list
+            cache_timestamp = header.get("timestamp", "")
+            print(f"📁 Cache {spec['label']} carregado: {len(items)} itens (salvo em {cache_timestamp})")
+            if spec["on_load"]:
+                spec["on_load"](items)
+            return items
 
         except Exception as e:
-            print(f"❌ Erro ao carregar cache EventBridge: {e}")
+            print(f"❌ Erro ao carregar cache {spec['label']}: {e}")
             return None
 
     def check_and_load_cache_on_tab_open(self, tab_type):
-        """Verifica cache ao abrir aba e carrega conforme regras de atualização automática"""
+        """Ao abrir a aba exibe o cache na hora (com a idade) e revalida em segundo plano se passou do soft TTL"""
         if not self.current_account_id:
             return  # Não fazer nada se não estiver logado
 
         if tab_type == "glue":
-            # Tentar carregar cache do Glue
-            cached_jobs = self.load_glue_cache()
+            cached_jobs = self.load_cache("glue")
             if cached_jobs:
-                # Cache encontrado - carregar sempre
+                age_text = self.format_cache_age(self.get_dataset_cache_age("glue"))
                 self.all_jobs = cached_jobs
                 self.filter_jobs()
-                self.monitoring_status.value = f"📁 {len(cached_jobs)} jobs carregados do cache"
+                self.last_update_text.value = f"Cache de {age_text}"
+                self.monitoring_status.value = f"📁 {len(cached_jobs)} jobs carregados do cache ({age_text})"
                 self.monitoring_status.color = ft.Colors.BLUE
-                self.last_update_text.value = f"Cache carregado: {datetime.now().strftime('%H:%M:%S')}"
                 self.page.update()
-
-                # Verificar se deve atualizar automaticamente
-                if hasattr(self, 'auto_refresh_enabled') and self.auto_refresh_enabled.value:
-                    print("🔄 Auto-refresh ativo - Atualizando dados do Glue...")
-                    self.refresh_jobs()
-                else:
-                    print("📁 Cache carregado - Auto-refresh inativo, use o botão Atualizar se necessário")
-            else:
-                # Não tem cache, carregar dados automaticamente
-                print("🔄 Cache Glue não encontrado, carregando dados...")
-                self.refresh_jobs()
+            self.revalidate_dataset_if_stale("glue", cached_jobs)
 
         elif tab_type == "stpf":
-            # Tentar carregar cache do Step Functions
-            cached_stpf = self.load_stpf_cache()
+            cached_stpf = self.load_cache("stpf")
             if cached_stpf:
-                # Cache encontrado - carregar sempre
+                age_text = self.format_cache_age(self.get_dataset_cache_age("stpf"))
                 self.all_stpf = cached_stpf
                 self.filter_stpf_jobs()
-                self.monitoring_status_sptf.value = f"📁 {len(cached_stpf)} Step Functions carregadas do cache"
+                self.last_update_text_stpf.value = f"Cache de {age_text}"
+                self.monitoring_status_sptf.value = f"📁 {len(cached_stpf)} Step Functions carregadas do cache ({age_text})"
                 self.monitoring_status_sptf.color = ft.Colors.BLUE
-                self.last_update_text_stpf.value = f"Cache carregado: {datetime.now().strftime('%H:%M:%S')}"
                 self.page.update()
-
-                # Verificar se deve atualizar automaticamente
-                if hasattr(self, 'auto_refresh_enabled_stpf') and self.auto_refresh_enabled_stpf.value:
-                    print("🔄 Auto-refresh ativo - Atualizando dados do Step Functions...")
-                    self.refresh_stpf_jobs()
-                else:
-                    print("📁 Cache carregado - Auto-refresh inativo, use o botão Atualizar se necessário")
-            else:
-                # Não tem cache, carregar dados automaticamente
-                print("🔄 Cache Step Functions não encontrado, carregando dados...")
-                self.refresh_stpf_jobs()
+            self.revalidate_dataset_if_stale("stpf", cached_stpf)
 
         elif tab_type == "tables":
-            # Tentar carregar cache das Tabelas
-            cached_tables = self.load_tables_cache()
+            cached_tables = self.load_cache("tables")
             if cached_tables:
-                # Cache encontrado - só carregar cache (Tables não tem auto-refresh)
+                age_text = self.format_cache_age(self.get_dataset_cache_age("tables"))
                 self.all_tables = cached_tables
                 self.filter_tables()
-                self.monitoring_status_tables.value = f"📁 {len(cached_tables)} tabelas carregadas do cache"
+                self.monitoring_status_tables.value = f"📁 {len(cached_tables)} tabelas carregadas do cache ({age_text})"
                 self.monitoring_status_tables.color = ft.Colors.BLUE
                 self.page.update()
-                print("📁 Cache Tables carregado - Use o botão Atualizar para buscar dados atualizados")
-            else:
-                # Não tem cache, carregar dados automaticamente
-                print("🔄 Cache Tables não encontrado, carregando dados...")
-                self.refresh_tables()
+            self.revalidate_dataset_if_stale("tables", cached_tables)
 
         elif tab_type == "eventbridge":
-            # Tentar carregar cache do EventBridge
-            cached_rules = self.load_eventbridge_cache()
+            cached_rules = self.load_cache("eventbridge")
             if cached_rules:
-                # Cache encontrado - só carregar cache (EventBridge não tem auto-refresh)
+                age_text = self.format_cache_age(self.get_dataset_cache_age("eventbridge"))
                 self.all_eventbridge_rules = cached_rules
+                self.update_eventbridge_next_runs()
                 self.filter_eventbridge_rules()
-                self.monitoring_status_eventbridge.value = f"📁 {len(cached_rules)} regras EventBridge carregadas do cache"
+                self.monitoring_status_eventbridge.value = f"📁 {len(cached_rules)} regras EventBridge carregadas do cache ({age_text})"
                 self.monitoring_status_eventbridge.color = ft.Colors.BLUE
                 self.page.update()
-                print("📁 Cache EventBridge carregado - Use o botão Atualizar para buscar dados atualizados")
-            else:
-                # Não tem cache, carregar dados automaticamente
-                print("🔄 Cache EventBridge não encontrado, carregando dados...")
-                self.refresh_eventbridge_rules()
+            self.revalidate_dataset_if_stale("eventbridge", cached_rules)
+
+    def revalidate_dataset_if_stale(self, dataset, cached_items):
+        """Dispara a busca na AWS (em segundo plano) se não há cache ou se ele passou do soft TTL"""
+        refresh_methods = {
+            "glue": (self.refresh_jobs, "monitoring_status"),
+            "stpf": (self.refresh_stpf_jobs, "monitoring_status_sptf"),
+            "tables": (self.refresh_tables, "monitoring_status_tables"),
+            "eventbridge": (self.refresh_eventbridge_rules, "monitoring_status_eventbridge"),
+        }
+        refresh, status_attr = refresh_methods[dataset]
+
+        if not cached_items:
+            print(f"🔄 Cache {dataset} não encontrado, carregando dados...")
+            refresh()
+            return
+
+        age_minutes = self.get_dataset_cache_age(dataset)
+        if not self.is_cache_stale(dataset, age_minutes):
+            print(f"📁 Cache {dataset} dentro do soft TTL - sem revalidação")
+            return
+
+        print(f"🔄 Cache {dataset} passou do soft TTL ({self.format_cache_age(age_minutes)}) - revalidando em segundo plano...")
+        refresh()
+
+        # Os dados do cache continuam na tela enquanto a busca roda
+        status = getattr(self, status_attr)
+        status.value = f"📁 {len(cached_items)} itens do cache ({self.format_cache_age(age_minutes)}) • 🔄 revalidando em segundo plano..."
+        status.color = ft.Colors.BLUE
+        self.page.update()
 
     def copy_jobs_to_clipboard(self, e):
         """Copia a tabela filtrada de jobs Glue para o clipboard"""
@@ -2999,11 +3757,15 @@ class AWSApp:
             self.page.update()
 
     def get_local_path(self):
-        prefix = self.prefix_dropdown.value
-        rt = self.rt_dropdown.value
-        squad = self.squad_dropdown.value
-        env = self.env_dropdown.value
+        return self.get_combination_local_path(self.prefix_dropdown.value, self.rt_dropdown.value,
+                                               self.env_dropdown.value, self.squad_dropdown.value)
+
+    def get_s3_path(self):
+        return self.get_combination_s3_path(self.prefix_dropdown.value, self.rt_dropdown.value,
+                                            self.env_dropdown.value, self.squad_dropdown.value)
 
+    def get_combination_local_path(self, prefix, rt, env, squad=None):
+        """Pasta local de uma combinação prefixo/RT/ambiente/squad"""
         if not prefix or not rt or not env:
             return None
 
@@ -3021,12 +3783,8 @@ class AWSApp:
         else:
             return None
 
-    def get_s3_path(self):
-        prefix = self.prefix_dropdown.value
-        rt = self.rt_dropdown.value
-        squad = self.squad_dropdown.value
-        env = self.env_dropdown.value
-
+    def get_combination_s3_path(self, prefix, rt, env, squad=None):
+        """Caminho S3 de uma combinação prefixo/RT/ambiente/squad no bucket da conta logada"""
         if not prefix or not rt or not env or not self.current_account_id:
             return None
 
@@ -3136,86 +3894,14 @@ class AWSApp:
         self.page.update()
 
     def sync_to_s3(self, e):
-        self.s3_progress.visible = True
-        self.s3_status.value = "🔄 Sincronizando para S3..."
-        self.s3_status.color = ft.Colors.ORANGE
-        self.sync_to_s3_button.disabled = True
-        self.page.update()
+        self.run_s3_sync('upload')
 
-        try:
-            if not self.ensure_local_path_exists():
-                raise Exception("Erro ao criar pasta local")
+    def sync_from_s3(self, e):
+        self.run_s3_sync('download')
 
-            local_path = self.get_local_path()
-            s3_path = self.get_s3_path()
-
-            result = subprocess.run([
-                'aws', 's3', 'sync',
-                str(local_path),
-                s3_path
-            ], capture_output=True, text=True, check=True)
-
-            self.s3_status.value = f"✅ Sincronização concluída: Local → S3"
-            self.s3_status.color = ft.Colors.GREEN
-
-        except subprocess.CalledProcessError as e:
-            self.s3_status.value = f"❌ Erro na sincronização: {e.stderr or e.stdout}"
-            self.s3_status.color = ft.Colors.RED
-
-        except Exception as e:
-            self.s3_status.value = f"❌ Erro: {str(e)}"
-            self.s3_status.color = ft.Colors.RED
-
-        self.s3_progress.visible = False
-        self.sync_to_s3_button.disabled = False
-        self.page.update()
-
-    def sync_from_s3(self, e):
-        self.s3_progress.visible = True
-        self.s3_status.value = "🔄 Sincronizando do S3..."
-        self.s3_status.color = ft.Colors.ORANGE
-        self.sync_from_s3_button.disabled = True
-        self.page.update()
-
-        try:
-            if not self.ensure_local_path_exists():
-                raise Exception("Erro ao criar pasta local")
-
-            local_path = self.get_local_path()
-            s3_path = self.get_s3_path()
-
-            # Construir comando base
-            sync_command = [
-                'aws', 's3', 'sync',
-                s3_path,
-                str(local_path)
-            ]
-
-            # Adicionar --delete se checkbox estiver marcado
-            if self.delete_checkbox.value:
-                sync_command.append('--delete')
-
-            result = subprocess.run(sync_command, capture_output=True, text=True, check=True)
-
-            delete_suffix = " (com --delete)" if self.delete_checkbox.value else ""
-            self.s3_status.value = f"✅ Sincronização concluída: S3 → Local{delete_suffix}"
-            self.s3_status.color = ft.Colors.GREEN
-
-        except subprocess.CalledProcessError as e:
-            self.s3_status.value = f"❌ Erro na sincronização: {e.stderr or e.stdout}"
-            self.s3_status.color = ft.Colors.RED
-
-        except Exception as e:
-            self.s3_status.value = f"❌ Erro: {str(e)}"
-            self.s3_status.color = ft.Colors.RED
-
-        self.s3_progress.visible = False
-        self.sync_from_s3_button.disabled = False
-        self.page.update()
-
-    def check_login_status(self):
-        # Atualizar barra de status primeiro
-        is_logged = self.refresh_aws_status()
+    def check_login_status(self):
+        # Atualizar barra de status primeiro
+        is_logged = self.refresh_aws_status()
 
         if is_logged:
             self.status_text.value = f"✅ Logado como: {self.current_user_arn}"
@@ -3225,6 +3911,10 @@ class AWSApp:
 
             # Limpar lista de profiles quando logado
             self.profile_list.controls.clear()
+
+            # Pré-carregar caches em segundo plano (opcional)
+            if self.config.get("cache", {}).get("warmup_after_login", False):
+                self.start_cache_warmup()
         else:
             self.status_text.value = "❌ Não logado - Selecione um profile SSO"
             self.status_text.color = ft.Colors.RED
@@ -3694,10 +4384,10 @@ class AWSApp:
             self.page.update()
             return
 
-        # Verificar se cache é recente (menos de 15 minutos)
-        if self.is_cache_fresh("tables", 15):
-            self.monitoring_status_tables.value = "⏰ Cache recente (menos de 15 min) - Use o cache existente para evitar custos adicionais"
-            self.monitoring_status_tables.color = ft.Colors.BLUE
+        # Evitar duas varreduras simultâneas do mesmo conjunto de dados
+        if not self.begin_dataset_refresh("tables"):
+            self.monitoring_status_tables.value = "⏳ Atualização já em andamento, aguarde o resultado"
+            self.monitoring_status_tables.color = ft.Colors.ORANGE
             self.page.update()
             return
 
@@ -3713,16 +4403,22 @@ class AWSApp:
                 tables = self.fetch_all_tables(databases=["itau", "teste"])
 
                 def update_ui():
-                    self.all_tables = tables
-                    self.update_tables_table(tables)
+                    try:
+                        self.all_tables = tables
+                        self.update_tables_table(tables)
 
-                    # Salvar no cache
-                    self.save_tables_cache(tables)
+                        # Salvar no cache
+                        self.save_cache("tables", tables)
 
-                    self.monitoring_status_tables.value = f"✅ {len(tables)} tabelas encontradas"
-                    self.monitoring_status_tables.color = ft.Colors.GREEN
-                    self.monitoring_progress_tables.visible = False
-                    self.refresh_button_tables.disabled = False
+                        self.monitoring_status_tables.value = f"✅ {len(tables)} tabelas encontradas"
+                        self.monitoring_status_tables.color = ft.Colors.GREEN
+                    except Exception as e:
+                        self.monitoring_status_tables.value = f"❌ Erro ao atualizar tabelas: {str(e)}"
+                        self.monitoring_status_tables.color = ft.Colors.RED
+                    finally:
+                        self.monitoring_progress_tables.visible = False
+                        self.refresh_button_tables.disabled = False
+                        self.end_dataset_refresh("tables")
                     self.page.update()
 
                 # Executa atualização da UI na thread principal
@@ -3734,6 +4430,7 @@ class AWSApp:
                     self.monitoring_status_tables.color = ft.Colors.RED
                     self.monitoring_progress_tables.visible = False
                     self.refresh_button_tables.disabled = False
+                    self.end_dataset_refresh("tables")
                     self.page.update()
 
                 self.page.run_thread(update_ui_error)
@@ -4059,6 +4756,32 @@ class AWSApp:
             )
         )
 
+        # Botão da agenda de execuções (próximas 24h)
+        self.timeline_eventbridge_button = ft.ElevatedButton(
+            "🗓️ Agenda 24h",
+            on_click=self.toggle_eventbridge_timeline,
+            width=140,
+            height=40,
+            style=ft.ButtonStyle(
+                shape=ft.RoundedRectangleBorder(radius=8),
+                elevation=3,
+            ),
+            tooltip="Mostrar as execuções das próximas 24h e os horários com mais regras simultâneas"
+        )
+
+        # Botão do teste local de eventos contra os EventPatterns
+        self.test_event_eventbridge_button = ft.ElevatedButton(
+            "🧪 Testar Evento",
+            on_click=self.toggle_event_test_panel,
+            width=150,
+            height=40,
+            style=ft.ButtonStyle(
+                shape=ft.RoundedRectangleBorder(radius=8),
+                elevation=3,
+            ),
+            tooltip="Avaliar um evento JSON localmente contra os patterns de todas as regras"
+        )
+
         # Progress e status
         self.monitoring_progress_eventbridge = ft.ProgressRing(visible=False)
         self.monitoring_status_eventbridge = ft.Text(
@@ -4071,9 +4794,11 @@ class AWSApp:
         self.eventbridge_rules_table = ft.DataTable(
             columns=[
                 ft.DataColumn(ft.Text("Name", weight=ft.FontWeight.BOLD)),
+                ft.DataColumn(ft.Text("Bus/Grupo", weight=ft.FontWeight.BOLD)),
                 ft.DataColumn(ft.Text("State", weight=ft.FontWeight.BOLD)),
                 ft.DataColumn(ft.Text("Description", weight=ft.FontWeight.BOLD)),
                 ft.DataColumn(ft.Text("Schedule", weight=ft.FontWeight.BOLD)),
+                ft.DataColumn(ft.Text("Próxima Execução", weight=ft.FontWeight.BOLD)),
                 ft.DataColumn(ft.Text("Targets", weight=ft.FontWeight.BOLD)),
                 ft.DataColumn(ft.Text("Actions", weight=ft.FontWeight.BOLD)),
             ],
@@ -4081,6 +4806,50 @@ class AWSApp:
             expand=True
         )
 
+        # Painel da agenda (timeline das próximas 24h + histograma de concorrência)
+        self.eventbridge_timeline_container = ft.Container(
+            content=ft.Text("", size=12, color=ft.Colors.GREY_400),
+            visible=False,
+            bgcolor=ft.Colors.GREY_800,
+            border=ft.border.all(1, ft.Colors.GREY_700),
+            border_radius=12,
+            padding=15,
+        )
+
+        # Painel de teste de eventos (JSON de exemplo -> regras e targets que disparariam)
+        self.eventbridge_test_input = ft.TextField(
+            label="Evento de exemplo (JSON)",
+            hint_text='{"source": "aws.glue", "detail-type": "Glue Job State Change", "detail": {"state": "FAILED"}}',
+            multiline=True,
+            min_lines=4,
+            max_lines=12,
+            text_size=12,
+            expand=True
+        )
+        self.eventbridge_test_results = ft.Column([], spacing=4)
+        self.eventbridge_test_container = ft.Container(
+            content=ft.Column([
+                ft.Row([
+                    self.eventbridge_test_input,
+                    ft.ElevatedButton(
+                        "▶️ Testar",
+                        on_click=self.run_event_pattern_test,
+                        height=40,
+                        style=ft.ButtonStyle(shape=ft.RoundedRectangleBorder(radius=8)),
+                    ),
+                ], vertical_alignment=ft.CrossAxisAlignment.START),
+                self.eventbridge_test_results,
+            ], spacing=10),
+            visible=False,
+            bgcolor=ft.Colors.GREY_800,
+            border=ft.border.all(1, ft.Colors.GREY_700),
+            border_radius=12,
+            padding=15,
+        )
+
+        # Próximas execuções calculadas localmente (chave da regra -> datetime UTC)
+        self.eventbridge_next_runs = {}
+
         self.eventbridge_container = ft.Container(
             content=self.eventbridge_rules_table,
             expand=True,
@@ -4106,6 +4875,10 @@ class AWSApp:
                         self.refresh_button_eventbridge,
                         self.monitoring_progress_eventbridge,
                         ft.Container(width=15),
+                        self.timeline_eventbridge_button,
+                        ft.Container(width=10),
+                        self.test_event_eventbridge_button,
+                        ft.Container(width=15),
                         self.copy_eventbridge_button,
                         ft.Container(width=5),
                         self.export_eventbridge_button
@@ -4138,6 +4911,12 @@ class AWSApp:
 
                 ft.Container(height=15),
 
+                # Agenda das próximas 24h
+                self.eventbridge_timeline_container,
+
+                # Teste local de eventos
+                self.eventbridge_test_container,
+
                 # Tabela
                 ft.Container(
                     content=ft.Column([
@@ -4445,6 +5224,9 @@ class AWSApp:
 
                         self.athena_status.value = f"✅ Relatório gerado com {len(cost_data)} registros"
                         self.athena_status.color = ft.Colors.GREEN
+                        if getattr(self, 'athena_costs_notice', None):
+                            self.athena_status.value += f"\n{self.athena_costs_notice}"
+                            self.athena_status.color = ft.Colors.ORANGE
                         self.athena_progress.visible = False
                         self.page.update()
 
@@ -4494,13 +5276,56 @@ class AWSApp:
             return []
 
     def fetch_athena_costs(self, period, workgroup, start_date, end_date):
-        """Busca dados de custos do Athena via Cost Explorer"""
+        """Custos do Athena por workgroup a partir do histórico de execuções.
+
+        O Athena só guarda ~45 dias de execuções: o trecho anterior vem do total do serviço no
+        Cost Explorer, e self.athena_costs_notice explica a divisão. Se o histórico não puder ser
+        lido (permissão), o período todo usa o Cost Explorer.
+        """
+        self.athena_costs_notice = None
         try:
             if not self.current_account_id:
                 print("❌ Necessário estar logado para buscar custos")
                 return []
 
-            print(f"💰 Buscando custos do Athena ({period}) de {start_date} a {end_date}...")
+            # Datas YYYY-MM-DD, fim inclusivo, em UTC
+            start_dt = datetime.strptime(start_date, '%Y-%m-%d').replace(tzinfo=timezone.utc)
+            end_dt = datetime.strptime(end_date, '%Y-%m-%d').replace(tzinfo=timezone.utc) + timedelta(days=1)
+            history_start = self.get_athena_history_start()
+
+            cost_data = []
+            if start_dt < history_start:
+                older_end = min(end_dt, history_start)
+                print(f"💰 Athena antes de {history_start:%Y-%m-%d}: total do serviço no Cost Explorer")
+                cost_data.extend(self.fetch_athena_service_costs(period, start_date, older_end.strftime('%Y-%m-%d'),
+                                                                 sample_fallback=False))
+                self.athena_costs_notice = (
+                    f"⚠️ O Athena só guarda ~{ATHENA_QUERY_HISTORY_DAYS} dias de execuções: custo por workgroup a partir "
+                    f"de {history_start:%d/%m/%Y}; antes disso, total do serviço (Cost Explorer, sem workgroup)")
+            if end_dt > history_start:
+                print(f"💰 Buscando custos do Athena por workgroup ({period}) de "
+                      f"{max(start_dt, history_start):%Y-%m-%d} a {end_date}...")
+                cost_data.extend(self.fetch_athena_workgroup_costs(period, workgroup, max(start_dt, history_start),
+                                                                   end_dt))
+            return cost_data
+
+        except Exception as e:
+            print(f"⚠️ Histórico de execuções indisponível ({e}), usando total do serviço no Cost Explorer")
+            self.athena_costs_notice = f"⚠️ Histórico de execuções indisponível ({e}): total do serviço no Cost Explorer"
+            return self.fetch_athena_service_costs(period, start_date, end_date)
+
+    def get_athena_history_start(self):
+        """Primeiro dia completo (UTC) dentro da janela de histórico que o list_query_executions devolve"""
+        cutoff = datetime.now(timezone.utc) - timedelta(days=ATHENA_QUERY_HISTORY_DAYS)
+        return cutoff.replace(hour=0, minute=0, second=0, microsecond=0) + timedelta(days=1)
+
+    def fetch_athena_service_costs(self, period, start_date, end_date, sample_fallback=True):
+        """Total do serviço Athena via Cost Explorer (sem detalhe por workgroup; fim exclusivo).
+
+        sample_fallback: sem dados (ou em erro) devolve dados simulados; desligado quando o resultado
+        complementa o custo real por workgroup.
+        """
+        try:
             ce_client = boto3.client('ce')
 
             # Definir granularidade baseada no período
@@ -4512,40 +5337,29 @@ class AWSApp:
             }
             granularity = granularity_map.get(period, 'MONTHLY')
 
-            def get_cost_data():
-                # Parâmetros básicos
-                params = {
-                    'TimePeriod': {
-                        'Start': start_date,
-                        'End': end_date
-                    },
-                    'Granularity': granularity,
-                    'Metrics': ['BlendedCost', 'UsageQuantity'],
-                    'GroupBy': [
-                        {
-                            'Type': 'DIMENSION',
-                            'Key': 'SERVICE'
-                        }
-                    ],
-                    'Filter': {
-                        'Dimensions': {
-                            'Key': 'SERVICE',
-                            'Values': ['Amazon Athena']
-                        }
+            params = {
+                'TimePeriod': {
+                    'Start': start_date,
+                    'End': end_date
+                },
+                'Granularity': granularity,
+                'Metrics': ['BlendedCost', 'UsageQuantity'],
+                'GroupBy': [
+                    {
+                        'Type': 'DIMENSION',
+                        'Key': 'SERVICE'
+                    }
+                ],
+                'Filter': {
+                    'Dimensions': {
+                        'Key': 'SERVICE',
+                        'Values': ['Amazon Athena']
                     }
                 }
+            }
 
-                # Se workgroup específico foi selecionado, adicionar filtro
-                if workgroup != "all":
-                    # Para workgroup específico, usar filtro de tag ou resource
-                    # Nota: Cost Explorer pode não ter granularidade de workgroup
-                    # Nesse caso, buscaremos dados do CloudWatch
-                    pass
-
-                response = ce_client.get_cost_and_usage(**params)
-                return response
-
-            cost_response = self.retry_with_backoff(get_cost_data, max_retries=3, base_delay=0.5)
+            # Períodos fechados vêm do cache local; só o restante é consultado (Cost Explorer cobra por chamada)
+            cost_response = self.get_cost_and_usage_cached(ce_client, params)
 
             # Processar dados de custo
             cost_data = []
@@ -4557,24 +5371,154 @@ class AWSApp:
                     usage_quantity = float(group['Metrics']['UsageQuantity']['Amount'])
 
                     cost_data.append({
-                        'workgroup': workgroup if workgroup != "all" else "All Workgroups",
+                        'workgroup': "Total do serviço (Cost Explorer)",
                         'period': time_period,
                         'cost': cost_amount,
-                        'queries': int(usage_quantity),
-                        'data_processed_gb': usage_quantity * 0.1  # Estimativa
+                        'queries': 0,  # Cost Explorer não informa número de queries
+                        'data_processed_gb': usage_quantity * 1024  # UsageQuantity do Athena é em TB escaneados
                     })
 
             # Se não houver dados do Cost Explorer, gerar dados simulados para demonstração
-            if not cost_data:
-                cost_data = self.generate_sample_athena_data(period, workgroup, start_date, end_date)
+            if not cost_data and sample_fallback:
+                cost_data = self.generate_sample_athena_data(period, "all", start_date, end_date)
 
             print(f"✅ {len(cost_data)} registros de custo encontrados")
             return cost_data
 
         except Exception as e:
             print(f"❌ Erro ao buscar custos: {e}")
+            if not sample_fallback:
+                raise
             # Retornar dados simulados em caso de erro
-            return self.generate_sample_athena_data(period, workgroup, start_date, end_date)
+            return self.generate_sample_athena_data(period, "all", start_date, end_date)
+
+    def get_athena_cost_settings(self):
+        """Paralelismo do motor de custos (config.json -> athena_costs)"""
+        settings = self.config.get("athena_costs", {})
+        return {
+            "hydrate_workers": settings.get("hydrate_workers", 8),
+            "workgroup_workers": settings.get("workgroup_workers", 4),
+        }
+
+    def fetch_workgroup_query_executions(self, athena_client, workgroup, start_dt, executor):
+        """Pagina list_query_executions do workgroup e detalha cada página de 50 IDs com
+        batch_get_query_execution no executor, enquanto a página seguinte é listada.
+
+        A API devolve as execuções mais recentes primeiro: antes de listar mais uma página, espera o
+        detalhe da anterior e para assim que a execução mais recente dela for anterior a start_dt.
+        """
+        def hydrate(query_ids):
+            response = self.retry_with_backoff(athena_client.batch_get_query_execution, 5, 0.5,
+                                               QueryExecutionIds=query_ids)
+            return response.get('QueryExecutions', [])
+
+        executions = []
+        previous = None
+        next_token = None
+        while True:
+            params = {'WorkGroup': workgroup, 'MaxResults': ATHENA_BATCH_GET_LIMIT}
+            if next_token:
+                params['NextToken'] = next_token
+            page = self.retry_with_backoff(athena_client.list_query_executions, 5, 0.5, **params)
+            query_ids = page.get('QueryExecutionIds', [])
+            current = executor.submit(hydrate, query_ids) if query_ids else None
+
+            if previous is not None:
+                batch = previous.result()
+                executions.extend(batch)
+                submitted = [execution['Status']['SubmissionDateTime'] for execution in batch
+                             if execution.get('Status', {}).get('SubmissionDateTime')]
+                if submitted and max(submitted) < start_dt:
+                    return executions  # A página em andamento também é anterior ao início
+
+            previous = current
+            next_token = page.get('NextToken')
+            if not next_token:
+                break
+
+        if previous is not None:
+            executions.extend(previous.result())
+        return executions
+
+    def get_athena_billed_bytes(self, execution):
+        """Bytes cobrados de uma execução: arredondados para cima ao MB, mínimo de 10 MB por query.
+        DDL e queries com falha não são cobradas; canceladas pagam o que chegaram a escanear."""
+        state = execution.get('Status', {}).get('State')
+        scanned = execution.get('Statistics', {}).get('DataScannedInBytes') or 0
+        if execution.get('StatementType') == 'DDL' or state in ('FAILED', 'QUEUED', 'RUNNING'):
+            return 0
+        if state == 'CANCELLED' and not scanned:
+            return 0
+        billed = -(-scanned // (1024 * 1024)) * 1024 * 1024
+        return max(billed, ATHENA_MIN_BILLED_BYTES)
+
+    def get_athena_cost_period_label(self, submitted, period):
+        """Rótulo do período no mesmo formato dos relatórios (dia, 'Semana <segunda>', mês ou ano)"""
+        submitted = submitted.astimezone(timezone.utc)
+        if period == 'daily':
+            return submitted.strftime('%Y-%m-%d')
+        if period == 'weekly':
+            return f"Semana {(submitted - timedelta(days=submitted.weekday())).strftime('%Y-%m-%d')}"
+        if period == 'annual':
+            return submitted.strftime('%Y')
+        return submitted.strftime('%Y-%m')
+
+    def aggregate_athena_query_costs(self, executions_by_workgroup, period, start_dt, end_dt, price_per_tb):
+        """Soma bytes escaneados/cobrados e custo por workgroup e período"""
+        totals = {}
+        for workgroup, executions in executions_by_workgroup.items():
+            for execution in executions:
+                submitted = execution.get('Status', {}).get('SubmissionDateTime')
+                if not submitted or not (start_dt <= submitted < end_dt):
+                    continue
+                label = self.get_athena_cost_period_label(submitted, period)
+                entry = totals.setdefault((label, workgroup), {'queries': 0, 'scanned': 0, 'billed': 0})
+                entry['queries'] += 1
+                entry['scanned'] += execution.get('Statistics', {}).get('DataScannedInBytes') or 0
+                entry['billed'] += self.get_athena_billed_bytes(execution)
+
+        return [
+            {
+                'workgroup': workgroup,
+                'period': label,
+                'cost': entry['billed'] / 1024 ** 4 * price_per_tb,
+                'queries': entry['queries'],
+                'data_processed_gb': entry['scanned'] / 1024 ** 3,
+            }
+            for (label, workgroup), entry in sorted(totals.items())
+        ]
+
+    def fetch_athena_workgroup_costs(self, period, workgroup, start_dt, end_dt):
+        """Custo real por workgroup a partir do histórico de execuções (DataScannedInBytes x preço/TB
+        do catálogo em cache) entre start_dt (inclusivo) e end_dt (exclusivo)."""
+        if workgroup == "all":
+            workgroups = [wg['Name'] for wg in self.fetch_athena_workgroups()]
+            if not workgroups:
+                raise RuntimeError("nenhum workgroup acessível")
+        else:
+            workgroups = [workgroup]
+
+        settings = self.get_athena_cost_settings()
+        athena_client = boto3.client('athena', config=BotoConfig(
+            max_pool_connections=settings["hydrate_workers"] + settings["workgroup_workers"]))
+        price_per_tb = self.get_athena_price_per_tb()
+
+        executions_by_workgroup = {}
+        with ThreadPoolExecutor(max_workers=settings["hydrate_workers"]) as hydrate_executor, \
+                ThreadPoolExecutor(max_workers=max(1, min(settings["workgroup_workers"], len(workgroups)))) as executor:
+            futures = {
+                executor.submit(self.fetch_workgroup_query_executions, athena_client, name, start_dt,
+                                hydrate_executor): name
+                for name in workgroups
+            }
+            for future in as_completed(futures):
+                executions_by_workgroup[futures[future]] = future.result()
+                print(f"🔎 Workgroup {futures[future]}: {len(executions_by_workgroup[futures[future]])} execuções lidas")
+
+        cost_data = self.aggregate_athena_query_costs(executions_by_workgroup, period, start_dt, end_dt, price_per_tb)
+        print(f"✅ {sum(item['queries'] for item in cost_data)} queries em {len(workgroups)} workgroups "
+              f"(${price_per_tb:.2f}/TB)")
+        return cost_data
 
     def generate_sample_athena_data(self, period, workgroup, start_date, end_date):
         """Gera dados simulados para demonstração"""
@@ -5423,82 +6367,35 @@ POR WORKGROUP:
 
     # Cost Simulator Functions
     def auto_update_simulator_data(self):
-        """Atualiza automaticamente cotação e preços AWS ao abrir a aba"""
+        """Aplica imediatamente o catálogo de preços/cotação em memória e atualiza em background só o que estiver vencido"""
         try:
+            self.load_pricing_catalog()
+            self.apply_pricing_catalog()
+            self.update_simulator_pricing_status()
+            self.page.update()
+
+            catalog_stale = self.is_pricing_catalog_stale()
+            fx_stale = self.is_fx_rate_stale()
+            if not catalog_stale and not fx_stale:
+                print("✅ Simulador: catálogo de preços e cotação em cache ainda válidos")
+                return
+
+            if getattr(self, 'pricing_refresh_in_progress', False):
+                return
+            self.pricing_refresh_in_progress = True
             print("🔄 Iniciando atualizações automáticas do simulador...")
 
             def update_all_data():
                 try:
-                    # Mostrar que está carregando
                     self.simulator_progress.visible = True
-                    self.currency_status.value = "🔄 Atualizando cotação..."
-                    self.aws_pricing_status.value = "🔄 Atualizando preços AWS..."
                     self.page.update()
 
-                    # Atualizar cotação USD/BRL
-                    try:
-                        import requests
-                        response = requests.get("https://api.awesomeapi.com.br/json/last/USD-BRL", timeout=8)
-                        data = response.json()
-                        new_rate = float(data["USDBRL"]["bid"])
-                        self.usd_to_brl_rate = new_rate
-
-                        self.currency_status.value = f"✅ USD/BRL: R$ {new_rate:.3f}"
-                        self.currency_status.color = ft.Colors.GREEN
-                        print(f"✅ Cotação atualizada: R$ {new_rate:.3f}")
-
-                    except Exception as e:
-                        print(f"⚠️ Erro ao buscar cotação: {e}")
-                        self.currency_status.value = f"⚠️ Cotação padrão: R$ {self.usd_to_brl_rate:.2f}"
-                        self.currency_status.color = ft.Colors.ORANGE
-
-                    # Buscar preços reais via AWS Pricing API
-                    try:
-                        print("🔍 Buscando preços reais via AWS Pricing API...")
-
-                        # Salvar preços antigos para comparação
-                        old_athena_price = self.aws_pricing["athena_per_tb"]
-                        old_glue_prices = self.aws_pricing["glue_pricing"].copy()
-
-                        # Buscar preços atualizados via API
-                        pricing_data = self.fetch_aws_pricing_api()
-
-                        if pricing_data:
-                            # Atualizar preços internos
-                            self.aws_pricing["athena_per_tb"] = pricing_data["athena_per_tb"]
-                            self.aws_pricing["glue_pricing"] = pricing_data["glue_pricing"]
-
-                            # Calcular mudanças
-                            new_athena = pricing_data["athena_per_tb"]
-                            athena_change = ((new_athena - old_athena_price) / old_athena_price) * 100 if old_athena_price != 0 else 0
-
-                            # Verificar mudanças no Glue
-                            glue_changes = 0
-                            for machine_type in pricing_data["glue_pricing"]:
-                                old_price = old_glue_prices.get(machine_type, 0)
-                                new_price = pricing_data["glue_pricing"][machine_type]
-                                if abs(new_price - old_price) > 0.01:  # Mudança significativa
-                                    glue_changes += 1
-
-                            # Status baseado nas mudanças
-                            if abs(athena_change) > 1 or glue_changes > 0:
-                                change_text = f"({athena_change:+.1f}%)" if abs(athena_change) > 1 else ""
-                                self.aws_pricing_status.value = f"🔄 Preços atualizados via API! Athena: ${new_athena:.2f}/TB {change_text}"
-                                self.aws_pricing_status.color = ft.Colors.GREEN
-                                print(f"✅ Preços atualizados - Athena: ${old_athena_price:.2f} → ${new_athena:.2f}")
-                            else:
-                                self.aws_pricing_status.value = f"✅ Preços confirmados via API - Athena: ${new_athena:.2f}/TB • Glue: 4 tipos"
-                                self.aws_pricing_status.color = ft.Colors.PURPLE
-                                print("✅ Preços confirmados via AWS API")
-
-                        else:
-                            self.aws_pricing_status.value = "⚠️ API indisponível - Usando preços padrão"
-                            self.aws_pricing_status.color = ft.Colors.ORANGE
+                    if fx_stale:
+                        self.refresh_fx_rate()
+                    if catalog_stale:
+                        self.refresh_pricing_catalog()
 
-                    except Exception as e:
-                        print(f"⚠️ Erro ao buscar preços via API: {e}")
-                        self.aws_pricing_status.value = f"⚠️ Erro na API - Preços padrão: ${self.aws_pricing['athena_per_tb']:.2f}/TB"
-                        self.aws_pricing_status.color = ft.Colors.ORANGE
+                    self.apply_pricing_catalog()
 
                     # Recalcular custos se já existem
                     if self.athena_last_cost_usd > 0 or self.glue_last_cost_usd > 0:
@@ -5506,13 +6403,11 @@ POR WORKGROUP:
 
                 except Exception as e:
                     print(f"❌ Erro geral na atualização: {e}")
-                    self.currency_status.value = "❌ Erro na atualização"
-                    self.currency_status.color = ft.Colors.RED
-                    self.aws_pricing_status.value = "❌ Erro na atualização"
-                    self.aws_pricing_status.color = ft.Colors.RED
 
                 finally:
+                    self.pricing_refresh_in_progress = False
                     self.simulator_progress.visible = False
+                    self.update_simulator_pricing_status()
                     self.page.update()
 
             # Executar atualizações em background
@@ -5520,229 +6415,252 @@ POR WORKGROUP:
 
         except Exception as e:
             print(f"❌ Erro ao iniciar auto-atualização: {e}")
+            self.pricing_refresh_in_progress = False
             self.simulator_progress.visible = False
             if hasattr(self, 'page'):
                 self.page.update()
 
-    def fetch_aws_pricing_api(self):
-        """Busca preços reais do AWS Athena e Glue via AWS Pricing API"""
-        try:
-            print("🔍 Buscando preços via AWS Pricing API...")
-            import boto3
-            import json
+    # ============== CATÁLOGO DE PREÇOS AWS ==============
 
-            # A Pricing API só funciona em us-east-1
-            pricing_client = boto3.client('pricing', region_name='us-east-1')
+    def get_pricing_settings(self):
+        """Configurações do catálogo de preços (config.json -> pricing)"""
+        settings = self.config.get("pricing", {})
+        return {
+            "region": settings.get("region", "sa-east-1"),
+            "catalog_max_age_hours": settings.get("catalog_max_age_hours", 168),
+            "fx_max_age_minutes": settings.get("fx_max_age_minutes", 60),
+        }
 
-            # Buscar preços em paralelo
-            from concurrent.futures import ThreadPoolExecutor
+    def get_pricing_catalog_filename(self, region=None):
+        """Arquivo local do catálogo de preços da região"""
+        region = region or self.get_pricing_settings()["region"]
+        return self.cache_dir / "store" / "pricing" / f"catalog_{region}.json"
 
-            def fetch_athena_pricing():
-                try:
-                    print("🔍 Buscando preços do Athena via AWS Pricing API...")
-
-                    # Tentar diferentes combinações de filtros para Athena
-                    filter_combinations = [
-                        # Filtro principal para região SA-East-1
-                        [
-                            {'Type': 'TERM_MATCH', 'Field': 'location', 'Value': 'South America (Sao Paulo)'},
-                            {'Type': 'TERM_MATCH', 'Field': 'usageType', 'Value': 'SAE1-DataScanned-Bytes'}
-                        ],
-                        # Filtro alternativo sem usage type específico
-                        [
-                            {'Type': 'TERM_MATCH', 'Field': 'location', 'Value': 'South America (Sao Paulo)'},
-                            {'Type': 'TERM_MATCH', 'Field': 'servicecode', 'Value': 'AmazonAthena'}
-                        ],
-                        # Filtro mais genérico
-                        [
-                            {'Type': 'TERM_MATCH', 'Field': 'location', 'Value': 'South America (Sao Paulo)'}
-                        ]
-                    ]
+    def get_fx_rate_filename(self):
+        """Arquivo local da última cotação USD/BRL"""
+        return self.cache_dir / "store" / "pricing" / "fx_usd_brl.json"
 
-                    for i, filters in enumerate(filter_combinations):
-                        try:
-                            print(f"🔍 Tentativa {i+1}/3 para buscar preços Athena...")
-                            response = pricing_client.get_products(
-                                ServiceCode='AmazonAthena',
-                                Filters=filters,
-                                MaxResults=20
-                            )
+    def load_pricing_catalog(self):
+        """Carrega do disco (uma vez) o catálogo de preços e a cotação salvos"""
+        if getattr(self, 'pricing_catalog', None) is None:
+            try:
+                with open(self.get_pricing_catalog_filename(), 'r', encoding='utf-8') as f:
+                    catalog = json.load(f)
+                if catalog.get("schema_version") == PRICING_CATALOG_SCHEMA_VERSION:
+                    self.pricing_catalog = catalog
+                    print(f"📦 Catálogo de preços carregado (vigência {catalog.get('effective_date') or 'N/A'})")
+            except (OSError, ValueError):
+                self.pricing_catalog = None
+
+        if getattr(self, 'fx_rate_cache', None) is None:
+            try:
+                with open(self.get_fx_rate_filename(), 'r', encoding='utf-8') as f:
+                    self.fx_rate_cache = json.load(f)
+            except (OSError, ValueError):
+                self.fx_rate_cache = None
 
-                            print(f"📊 API retornou {len(response['PriceList'])} produtos")
-
-                            for price_item in response['PriceList']:
-                                product = json.loads(price_item)
-
-                                # Debug: mostrar estrutura do produto
-                                if i == 0:  # Só na primeira tentativa para não poluir logs
-                                    attributes = product.get('product', {}).get('attributes', {})
-                                    print(f"🔍 Produto encontrado: {attributes.get('usageType', 'N/A')}")
-
-                                # Extrair preço do JSON complexo
-                                if 'terms' in product:
-                                    on_demand = product['terms'].get('OnDemand', {})
-                                    for term_key, term_data in on_demand.items():
-                                        price_dimensions = term_data.get('priceDimensions', {})
-                                        for price_key, price_data in price_dimensions.items():
-                                            price_per_unit = price_data.get('pricePerUnit', {})
-                                            usd_price = price_per_unit.get('USD', '0')
-
-                                            if float(usd_price) > 0:
-                                                price_value = float(usd_price)
-                                                description = price_data.get('description', '')
-
-                                                # Athena cobra por GB escaneado
-                                                if 'per GB' in description or 'DataScanned' in description:
-                                                    # Converter GB para TB (1 TB = 1024 GB)
-                                                    price_per_tb = price_value * 1024
-                                                    print(f"✅ Athena: ${price_per_tb:.2f} por TB (${price_value:.4f} por GB)")
-                                                    return price_per_tb
-                                                elif 'per TB' in description:
-                                                    print(f"✅ Athena: ${price_value:.2f} por TB (direto)")
-                                                    return price_value
-
-                        except Exception as e:
-                            print(f"⚠️ Erro na tentativa {i+1}: {e}")
-                            continue
-
-                    # Se não encontrou via API, usar preço estimado baseado na documentação AWS
-                    print("⚠️ Não foi possível obter preço via API, usando preço estimado da documentação")
-                    # Preço baseado na documentação oficial AWS para sa-east-1 (≈ $5.00/TB)
-                    return 5.00
+    def _pricing_age_minutes(self, fetched_at):
+        """Idade em minutos de um timestamp ISO salvo no catálogo (None se inválido)"""
+        try:
+            return (datetime.now(timezone.utc) - self._parse_cache_timestamp(fetched_at)).total_seconds() / 60
+        except (TypeError, ValueError, AttributeError):
+            return None
 
-                except Exception as e:
-                    print(f"❌ Erro geral ao buscar preços Athena: {e}")
-                    return 5.00  # Fallback
+    def is_pricing_catalog_stale(self):
+        """Catálogo ausente, de outra região ou mais velho que catalog_max_age_hours"""
+        catalog = getattr(self, 'pricing_catalog', None)
+        settings = self.get_pricing_settings()
+        if not catalog or catalog.get("region") != settings["region"]:
+            return True
+        age = self._pricing_age_minutes(catalog.get("fetched_at"))
+        return age is None or age > settings["catalog_max_age_hours"] * 60
 
-            def fetch_glue_pricing():
+    def is_fx_rate_stale(self):
+        """Cotação ausente ou mais velha que fx_max_age_minutes"""
+        fx = getattr(self, 'fx_rate_cache', None)
+        if not fx:
+            return True
+        age = self._pricing_age_minutes(fx.get("fetched_at"))
+        return age is None or age > self.get_pricing_settings()["fx_max_age_minutes"]
+
+    def _parse_price_list_item(self, price_item):
+        """Extrai (usagetype, atributos resumidos, dimensões de preço OnDemand, vigência) de um item da Price List"""
+        product = json.loads(price_item)
+        attributes = product.get('product', {}).get('attributes', {})
+        dimensions = []
+        effective_date = None
+        for term_data in product.get('terms', {}).get('OnDemand', {}).values():
+            effective_date = max(filter(None, [effective_date, term_data.get('effectiveDate')]), default=None)
+            for price_data in term_data.get('priceDimensions', {}).values():
                 try:
-                    print("🔍 Buscando preços do Glue via AWS Pricing API...")
-
-                    # Preços padrão baseados na documentação AWS
-                    glue_prices = {
-                        "G.025X": 0.11,
-                        "G.1X": 0.44,
-                        "G.2X": 0.88,
-                        "Standard": 0.44
-                    }
-
-                    # Tentar diferentes filtros para buscar preços do Glue
-                    filter_combinations = [
-                        # Filtro principal
-                        [
-                            {'Type': 'TERM_MATCH', 'Field': 'location', 'Value': 'South America (Sao Paulo)'},
-                            {'Type': 'TERM_MATCH', 'Field': 'productFamily', 'Value': 'AWS Glue'}
-                        ],
-                        # Filtro alternativo
-                        [
-                            {'Type': 'TERM_MATCH', 'Field': 'location', 'Value': 'South America (Sao Paulo)'},
-                            {'Type': 'TERM_MATCH', 'Field': 'servicecode', 'Value': 'AWSGlue'}
-                        ],
-                        # Filtro mais genérico
-                        [
-                            {'Type': 'TERM_MATCH', 'Field': 'location', 'Value': 'South America (Sao Paulo)'}
-                        ]
-                    ]
-
-                    for i, filters in enumerate(filter_combinations):
-                        try:
-                            print(f"🔍 Tentativa {i+1}/3 para buscar preços Glue...")
-                            response = pricing_client.get_products(
-                                ServiceCode='AWSGlue',
-                                Filters=filters,
-                                MaxResults=30
-                            )
-
-                            print(f"📊 API retornou {len(response['PriceList'])} produtos")
-
-                            # Processar resposta da API
-                            for price_item in response['PriceList']:
-                                product = json.loads(price_item)
-
-                                # Extrair informações do produto
-                                attributes = product.get('product', {}).get('attributes', {})
-                                instance_type = attributes.get('instanceType', '')
-                                usage_type = attributes.get('usageType', '')
-
-                                # Debug: mostrar o que foi encontrado
-                                if i == 0:  # Só na primeira tentativa
-                                    print(f"🔍 Produto Glue: {instance_type} | {usage_type}")
-
-                                # Extrair preço
-                                if 'terms' in product:
-                                    on_demand = product['terms'].get('OnDemand', {})
-                                    for term_key, term_data in on_demand.items():
-                                        price_dimensions = term_data.get('priceDimensions', {})
-                                        for price_key, price_data in price_dimensions.items():
-                                            price_per_unit = price_data.get('pricePerUnit', {})
-                                            usd_price = price_per_unit.get('USD', '0')
-
-                                            if float(usd_price) > 0:
-                                                price_value = float(usd_price)
-                                                description = price_data.get('description', '')
-
-                                                # Verificar se é preço por DPU-Hour
-                                                if 'DPU-Hour' in description or 'DPU Hour' in description:
-                                                    # Mapear tipos de instância
-                                                    if 'G.025X' in instance_type or '0.25' in description:
-                                                        glue_prices["G.025X"] = price_value
-                                                        print(f"✅ G.025X: ${price_value:.4f} por DPU-hora")
-                                                    elif 'G.1X' in instance_type or 'G.1X' in description:
-                                                        glue_prices["G.1X"] = price_value
-                                                        glue_prices["Standard"] = price_value  # Standard = G.1X
-                                                        print(f"✅ G.1X/Standard: ${price_value:.4f} por DPU-hora")
-                                                    elif 'G.2X' in instance_type or 'G.2X' in description:
-                                                        glue_prices["G.2X"] = price_value
-                                                        print(f"✅ G.2X: ${price_value:.4f} por DPU-hora")
-
-                            # Se encontrou pelo menos um preço, considerar sucesso
-                            if any(price != fallback for price, fallback in
-                                   zip(glue_prices.values(), [0.11, 0.44, 0.88, 0.44])):
-                                print(f"✅ Alguns preços Glue atualizados via API")
-                                break
-
-                        except Exception as e:
-                            print(f"⚠️ Erro na tentativa {i+1} para Glue: {e}")
-                            continue
+                    usd_price = float(price_data.get('pricePerUnit', {}).get('USD', '0'))
+                except ValueError:
+                    continue
+                if usd_price > 0:
+                    dimensions.append({
+                        "usd": usd_price,
+                        "unit": price_data.get('unit', ''),
+                        "description": price_data.get('description', ''),
+                        "begin_range": price_data.get('beginRange', '0'),
+                    })
+        summary = {
+            "product_family": product.get('product', {}).get('productFamily', ''),
+            "group": attributes.get('group', ''),
+            "operation": attributes.get('operation', ''),
+        }
+        return attributes.get('usagetype', ''), summary, dimensions, effective_date
+
+    def stream_price_list(self, pricing_client, service_code, region):
+        """Percorre todas as páginas de get_products da região, processando cada página assim que chega"""
+        paginator = pricing_client.get_paginator('get_products')
+        pages = paginator.paginate(
+            ServiceCode=service_code,
+            Filters=[{'Type': 'TERM_MATCH', 'Field': 'regionCode', 'Value': region}],
+            FormatVersion='aws_v1',
+            PaginationConfig={'PageSize': 100}
+        )
+        for page_number, page in enumerate(pages, start=1):
+            price_list = page.get('PriceList', [])
+            print(f"📊 {service_code}: página {page_number} com {len(price_list)} produtos")
+            for price_item in price_list:
+                yield self._parse_price_list_item(price_item)
+
+    def download_price_list(self, pricing_client, service_code, region):
+        """Monta {usagetype: dimensão do primeiro nível de preço} e a maior data de vigência do serviço"""
+        entries = {}
+        effective_date = None
+        for usage_type, summary, dimensions, item_effective_date in self.stream_price_list(pricing_client, service_code, region):
+            if not usage_type or not dimensions:
+                continue
+            effective_date = max(filter(None, [effective_date, item_effective_date]), default=None)
+            first_tier = min(dimensions, key=lambda dimension: float(dimension["begin_range"] or 0))
+            entries[usage_type] = {**summary, **first_tier}
+        return entries, effective_date
+
+    def derive_simulator_pricing(self, catalog):
+        """Converte as entradas do catálogo nos preços usados pelo simulador (None se algum não existir)"""
+        athena_per_tb = None
+        for usage_type, entry in catalog.get("athena", {}).items():
+            if "DataScanned" not in usage_type:
+                continue
+            unit = entry.get("unit", "").lower()
+            if unit.startswith("terabyte") or unit == "tb":
+                athena_per_tb = entry["usd"]
+            elif unit.startswith("gigabyte") or unit == "gb":
+                athena_per_tb = entry["usd"] * 1024
+            if athena_per_tb:
+                break
+
+        etl_dpu_hour = None
+        for usage_type, entry in catalog.get("glue", {}).items():
+            # Job ETL padrão (exclui Flex, Crawler, Dev Endpoints e Interactive Sessions)
+            if usage_type.endswith("-ETL-DPU-Hour"):
+                etl_dpu_hour = entry["usd"]
+                break
+
+        glue_pricing = None
+        if etl_dpu_hour:
+            glue_pricing = {
+                "G.025X": etl_dpu_hour / 4,  # 0.25 DPU por worker
+                "G.1X": etl_dpu_hour,
+                "G.2X": etl_dpu_hour * 2,
+                "Standard": etl_dpu_hour
+            }
+        return athena_per_tb, glue_pricing
 
-                    print(f"✅ Glue preços finais: G.025X=${glue_prices['G.025X']:.4f}, G.1X=${glue_prices['G.1X']:.4f}, G.2X=${glue_prices['G.2X']:.4f}")
-                    return glue_prices
+    def refresh_pricing_catalog(self):
+        """Baixa e processa as Price Lists do Athena e do Glue, grava no disco e troca o catálogo em memória"""
+        region = self.get_pricing_settings()["region"]
+        try:
+            print(f"🔍 Baixando catálogo de preços ({region}) via AWS Pricing API...")
+            # A Pricing API só funciona em us-east-1
+            pricing_client = boto3.client('pricing', region_name='us-east-1')
 
-                except Exception as e:
-                    print(f"❌ Erro geral ao buscar preços Glue: {e}")
-                    return {
-                        "G.025X": 0.11,
-                        "G.1X": 0.44,
-                        "G.2X": 0.88,
-                        "Standard": 0.44
-                    }  # Fallback
-
-            # Executar buscas em paralelo
             with ThreadPoolExecutor(max_workers=2) as executor:
-                athena_future = executor.submit(fetch_athena_pricing)
-                glue_future = executor.submit(fetch_glue_pricing)
+                athena_future = executor.submit(self.download_price_list, pricing_client, 'AmazonAthena', region)
+                glue_future = executor.submit(self.download_price_list, pricing_client, 'AWSGlue', region)
+                athena_entries, athena_effective = athena_future.result()
+                glue_entries, glue_effective = glue_future.result()
+
+            catalog = {
+                "schema_version": PRICING_CATALOG_SCHEMA_VERSION,
+                "region": region,
+                "fetched_at": datetime.now(timezone.utc).isoformat(),
+                "effective_date": max(filter(None, [athena_effective, glue_effective]), default=None),
+                "athena": athena_entries,
+                "glue": glue_entries,
+            }
+            athena_per_tb, glue_pricing = self.derive_simulator_pricing(catalog)
+            if athena_per_tb is None and glue_pricing is None:
+                print("⚠️ Price List sem preços reconhecidos - mantendo catálogo anterior")
+                return False
 
-                # Aguardar resultados
-                new_athena_price = athena_future.result()
-                new_glue_pricing = glue_future.result()
+            self._atomic_write_bytes(self.get_pricing_catalog_filename(region),
+                                     json.dumps(catalog, ensure_ascii=False).encode('utf-8'))
+            self.pricing_catalog = catalog
+            print(f"✅ Catálogo de preços salvo: {len(athena_entries)} itens Athena, {len(glue_entries)} itens Glue")
+            return True
 
-            return {
-                "athena_per_tb": new_athena_price,
-                "glue_pricing": new_glue_pricing
-            }
+        except Exception as e:
+            print(f"⚠️ Erro ao atualizar catálogo de preços: {e}")
+            return False
 
+    def refresh_fx_rate(self):
+        """Atualiza a cotação USD/BRL e guarda no disco para uso offline"""
+        try:
+            import requests
+            response = requests.get("https://api.awesomeapi.com.br/json/last/USD-BRL", timeout=8)
+            new_rate = float(response.json()["USDBRL"]["bid"])
+            self.fx_rate_cache = {"rate": new_rate, "fetched_at": datetime.now(timezone.utc).isoformat()}
+            self._atomic_write_bytes(self.get_fx_rate_filename(), json.dumps(self.fx_rate_cache).encode('utf-8'))
+            print(f"✅ Cotação atualizada: R$ {new_rate:.3f}")
+            return True
         except Exception as e:
-            print(f"❌ Erro geral na AWS Pricing API: {e}")
-            # Retornar preços de fallback
-            return {
-                "athena_per_tb": 5.00,
-                "glue_pricing": {
-                    "G.025X": 0.11,
-                    "G.1X": 0.44,
-                    "G.2X": 0.88,
-                    "Standard": 0.44
-                }
-            }
+            print(f"⚠️ Erro ao buscar cotação: {e}")
+            return False
+
+    def apply_pricing_catalog(self):
+        """Aplica ao simulador os preços e a cotação em memória (mantém os padrões para o que faltar)"""
+        fx = getattr(self, 'fx_rate_cache', None)
+        if fx and fx.get("rate"):
+            self.usd_to_brl_rate = fx["rate"]
+
+        catalog = getattr(self, 'pricing_catalog', None)
+        if catalog:
+            athena_per_tb, glue_pricing = self.derive_simulator_pricing(catalog)
+            if athena_per_tb:
+                self.aws_pricing["athena_per_tb"] = athena_per_tb
+            if glue_pricing:
+                self.aws_pricing["glue_pricing"] = glue_pricing
+
+    def update_simulator_pricing_status(self):
+        """Atualiza os textos de status de cotação e preços conforme a origem dos dados"""
+        fx = getattr(self, 'fx_rate_cache', None)
+        if getattr(self, 'pricing_refresh_in_progress', False) and self.is_fx_rate_stale():
+            self.currency_status.value = f"🔄 Atualizando cotação... (atual: R$ {self.usd_to_brl_rate:.3f})"
+            self.currency_status.color = ft.Colors.ORANGE
+        elif fx:
+            age = self._pricing_age_minutes(fx.get("fetched_at"))
+            suffix = "" if not self.is_fx_rate_stale() else f" (offline, {self.format_cache_age(age)})"
+            self.currency_status.value = f"✅ USD/BRL: R$ {self.usd_to_brl_rate:.3f}{suffix}"
+            self.currency_status.color = ft.Colors.GREEN if not suffix else ft.Colors.ORANGE
+        else:
+            self.currency_status.value = f"⚠️ Cotação padrão: R$ {self.usd_to_brl_rate:.2f}"
+            self.currency_status.color = ft.Colors.ORANGE
+
+        catalog = getattr(self, 'pricing_catalog', None)
+        athena_text = f"Athena: ${self.aws_pricing['athena_per_tb']:.2f}/TB • Glue G.1X: ${self.aws_pricing['glue_pricing']['G.1X']:.2f}/DPU-h"
+        if getattr(self, 'pricing_refresh_in_progress', False) and self.is_pricing_catalog_stale():
+            self.aws_pricing_status.value = f"🔄 Atualizando catálogo de preços... {athena_text}"
+            self.aws_pricing_status.color = ft.Colors.ORANGE
+        elif catalog:
+            effective_date = (catalog.get("effective_date") or "")[:10] or "N/A"
+            suffix = "" if not self.is_pricing_catalog_stale() else " (offline)"
+            self.aws_pricing_status.value = f"✅ {athena_text} • Vigência {effective_date}{suffix}"
+            self.aws_pricing_status.color = ft.Colors.PURPLE if not suffix else ft.Colors.ORANGE
+        else:
+            self.aws_pricing_status.value = f"⚠️ Preços padrão - {athena_text}"
+            self.aws_pricing_status.color = ft.Colors.ORANGE
 
     def calculate_athena_cost(self, e):
         """Calcula o custo do Athena baseado nos dados escaneados"""
@@ -5861,92 +6779,157 @@ POR WORKGROUP:
             )
 
     # EventBridge Monitoring Functions
-    def fetch_eventbridge_rules(self):
-        """Busca todas as regras do EventBridge usando boto3."""
+    def fetch_eventbridge_rules(self, previous_rules=None):
+        """Busca regras de todos os event buses e schedules do EventBridge Scheduler usando boto3.
+
+        previous_rules: dados da última busca (memória/cache). Schedules cuja LastModificationDate
+        não mudou reaproveitam os detalhes anteriores sem chamar get_schedule novamente.
+        """
         try:
             if not self.current_account_id:
                 print("❌ Necessário estar logado para buscar regras EventBridge")
                 return []
 
             print("🔍 Buscando regras do EventBridge...")
+            start_time = time.time()
 
-            # Usar retry para evitar throttling
-            def get_eventbridge_rules():
-                eventbridge_client = boto3.client('events')
-                paginator = eventbridge_client.get_paginator('list_rules')
+            previous_by_key = {
+                self.get_eventbridge_rule_key(rule): rule
+                for rule in (previous_rules or [])
+            }
 
-                all_rules = []
-                for page in paginator.paginate():
-                    # Pequeno delay entre páginas
-                    time.sleep(0.1)
-                    for rule in page['Rules']:
-                        all_rules.append(rule)
+            # Regras de todos os buses e schedules do Scheduler são buscados em paralelo
+            with ThreadPoolExecutor(max_workers=2) as executor:
+                rules_future = executor.submit(self.fetch_event_bus_rules)
+                schedules_future = executor.submit(self.fetch_scheduler_schedules, previous_by_key)
+                rules_metadata = rules_future.result()
+                schedules_metadata = schedules_future.result()
 
-                return all_rules
+            end_time = time.time()
+            print(f"⚡ {len(rules_metadata)} regras e {len(schedules_metadata)} schedules processados em {end_time - start_time:.2f}s")
 
-            rules = self.retry_with_backoff(get_eventbridge_rules, max_retries=3, base_delay=1.0)
+            return rules_metadata + schedules_metadata
 
-            if not rules:
-                print("📋 Nenhuma regra EventBridge encontrada")
-                return []
+        except Exception as e:
+            print(f"❌ Erro geral ao buscar regras EventBridge: {e}")
+            return []
+
+    def list_event_bus_names(self):
+        """Lista os nomes de todos os event buses (default + customizados)"""
+        def get_event_buses():
+            eventbridge_client = boto3.client('events')
+            bus_names = []
+            kwargs = {}
+            while True:
+                response = eventbridge_client.list_event_buses(**kwargs)
+                bus_names.extend(bus['Name'] for bus in response.get('EventBuses', []))
+                if not response.get('NextToken'):
+                    break
+                kwargs['NextToken'] = response['NextToken']
+                time.sleep(0.1)
+            return bus_names
 
-            print(f"📊 {len(rules)} regras EventBridge encontradas")
+        try:
+            bus_names = self.retry_with_backoff(get_event_buses, max_retries=3, base_delay=1.0) or []
+        except Exception as e:
+            print(f"⚠️ Erro ao listar event buses, usando apenas o default: {e}")
+            bus_names = []
 
-            # Processar regras em paralelo para obter detalhes
-            rules_metadata = []
-            max_workers = min(3, max(2, len(rules) // 10))  # Reduzido para evitar throttling
-            print(f"🔧 Usando {max_workers} workers para processar regras")
+        if "default" not in bus_names:
+            bus_names.insert(0, "default")
+        return bus_names
 
-            start_time = time.time()
+    def list_rules_for_bus(self, bus_name):
+        """Lista as regras de um event bus"""
+        def get_eventbridge_rules():
+            eventbridge_client = boto3.client('events')
+            paginator = eventbridge_client.get_paginator('list_rules')
+
+            all_rules = []
+            for page in paginator.paginate(EventBusName=bus_name):
+                # Pequeno delay entre páginas
+                time.sleep(0.1)
+                for rule in page['Rules']:
+                    all_rules.append(rule)
+
+            return all_rules
+
+        return self.retry_with_backoff(get_eventbridge_rules, max_retries=3, base_delay=1.0) or []
+
+    def fetch_event_bus_rules(self):
+        """Busca as regras de todos os event buses e os detalhes (targets) de cada uma"""
+        bus_names = self.list_event_bus_names()
+        print(f"🚌 {len(bus_names)} event buses encontrados: {', '.join(bus_names)}")
+
+        # Listar regras de cada bus em paralelo
+        rules = []
+        with ThreadPoolExecutor(max_workers=min(4, len(bus_names))) as executor:
+            future_to_bus = {executor.submit(self.list_rules_for_bus, bus_name): bus_name for bus_name in bus_names}
+            for future in as_completed(future_to_bus):
+                bus_name = future_to_bus[future]
+                try:
+                    bus_rules = future.result()
+                    for rule in bus_rules:
+                        rule.setdefault('EventBusName', bus_name)
+                    rules.extend(bus_rules)
+                except Exception as e:
+                    print(f"❌ Erro ao listar regras do bus {bus_name}: {e}")
 
-            with ThreadPoolExecutor(max_workers=max_workers) as executor:
-                # Submeter jobs com delay para evitar burst
-                future_to_rule = {}
-                for i, rule in enumerate(rules):
-                    # Delay progressivo entre submissões
-                    if i > 0:
-                        time.sleep(0.05)
+        if not rules:
+            print("📋 Nenhuma regra EventBridge encontrada")
+            return []
 
-                    future = executor.submit(self.fetch_single_rule_details, rule)
-                    future_to_rule[future] = rule['Name']
+        print(f"📊 {len(rules)} regras EventBridge encontradas")
 
-                # Processar resultados
-                completed = 0
-                for future in as_completed(future_to_rule):
-                    try:
-                        rule_data = future.result()
-                        rules_metadata.append(rule_data)
-                        completed += 1
+        # Processar regras em paralelo para obter detalhes
+        rules_metadata = []
+        max_workers = min(3, max(2, len(rules) // 10))  # Reduzido para evitar throttling
+        print(f"🔧 Usando {max_workers} workers para processar regras")
 
-                        # Log de progresso a cada 25%
-                        if completed % max(1, len(rules) // 4) == 0:
-                            progress = (completed / len(rules)) * 100
-                            print(f"📈 Progresso: {completed}/{len(rules)} ({progress:.0f}%)")
+        with ThreadPoolExecutor(max_workers=max_workers) as executor:
+            # Submeter jobs com delay para evitar burst
+            future_to_rule = {}
+            for i, rule in enumerate(rules):
+                # Delay progressivo entre submissões
+                if i > 0:
+                    time.sleep(0.05)
 
-                    except Exception as e:
-                        rule_name = future_to_rule[future]
-                        print(f"❌ Erro ao processar regra {rule_name}: {e}")
-                        # Adicionar entrada com erro
-                        rules_metadata.append({
-                            'name': rule_name,
-                            'state': "ERROR",
-                            'description': f"Erro: {str(e)}",
-                            'schedule': "N/A",
-                            'targets': 0
-                        })
+                future = executor.submit(self.fetch_single_rule_details, rule)
+                future_to_rule[future] = rule
 
-            end_time = time.time()
-            duration = end_time - start_time
-            print(f"⚡ Regras EventBridge processadas em {duration:.2f}s com {max_workers} workers")
+            # Processar resultados
+            completed = 0
+            for future in as_completed(future_to_rule):
+                try:
+                    rule_data = future.result()
+                    rules_metadata.append(rule_data)
+                    completed += 1
 
-            return rules_metadata
+                    # Log de progresso a cada 25%
+                    if completed % max(1, len(rules) // 4) == 0:
+                        progress = (completed / len(rules)) * 100
+                        print(f"📈 Progresso: {completed}/{len(rules)} ({progress:.0f}%)")
 
-        except Exception as e:
-            print(f"❌ Erro geral ao buscar regras EventBridge: {e}")
-            return []
+                except Exception as e:
+                    rule = future_to_rule[future]
+                    print(f"❌ Erro ao processar regra {rule['Name']}: {e}")
+                    # Adicionar entrada com erro
+                    rules_metadata.append({
+                        'name': rule['Name'],
+                        'state': "ERROR",
+                        'description': f"Erro: {str(e)}",
+                        'schedule': "N/A",
+                        'targets': 0,
+                        'arn': rule.get('Arn', 'N/A'),
+                        'source': "events",
+                        'event_bus': rule.get('EventBusName', 'default')
+                    })
+
+        return rules_metadata
 
     def fetch_single_rule_details(self, rule):
         """Busca detalhes de uma única regra do EventBridge."""
+        event_bus = rule.get('EventBusName', 'default')
         try:
             # Adicionar delay aleatório pequeno para espalhar requisições
             time.sleep(random.uniform(0.1, 0.3))
@@ -5956,18 +6939,22 @@ POR WORKGROUP:
             # Buscar targets da regra com retry
             def get_rule_targets():
                 eventbridge_client = boto3.client('events')
-                return eventbridge_client.list_targets_by_rule(Rule=rule_name)
+                return eventbridge_client.list_targets_by_rule(Rule=rule_name, EventBusName=event_bus)
 
             targets_response = self.retry_with_backoff(get_rule_targets, max_retries=3, base_delay=0.5)
-            target_count = len(targets_response.get('Targets', []))
+            targets = targets_response.get('Targets', [])
 
             return {
                 'name': rule_name,
                 'state': rule.get('State', 'UNKNOWN'),
                 'description': rule.get('Description', 'N/A'),
                 'schedule': rule.get('ScheduleExpression', 'N/A'),
-                'targets': target_count,
-                'arn': rule.get('Arn', 'N/A')
+                'targets': len(targets),
+                'target_arns': [target.get('Arn', '') for target in targets],
+                'event_pattern': rule.get('EventPattern'),
+                'arn': rule.get('Arn', 'N/A'),
+                'source': "events",
+                'event_bus': event_bus
             }
 
         except Exception as e:
@@ -5978,41 +6965,197 @@ POR WORKGROUP:
                 'description': f"Erro: {str(e)}",
                 'schedule': "N/A",
                 'targets': 0,
-                'arn': "N/A"
+                'arn': rule.get('Arn', 'N/A'),
+                'source': "events",
+                'event_bus': event_bus
             }
 
-    def toggle_eventbridge_rule(self, rule_name, current_state):
-        """Liga ou desliga uma regra do EventBridge."""
+    def fetch_scheduler_schedules(self, previous_by_key=None):
+        """Busca schedules do EventBridge Scheduler de todos os schedule groups.
+
+        Só chama get_schedule para schedules novos ou alterados (LastModificationDate diferente).
+        """
+        previous_by_key = previous_by_key or {}
+
+        def get_schedule_groups():
+            scheduler_client = boto3.client('scheduler')
+            paginator = scheduler_client.get_paginator('list_schedule_groups')
+            group_names = []
+            for page in paginator.paginate():
+                group_names.extend(group['Name'] for group in page.get('ScheduleGroups', []))
+            return group_names
+
+        def get_group_schedules(group_name):
+            scheduler_client = boto3.client('scheduler')
+            paginator = scheduler_client.get_paginator('list_schedules')
+            schedules = []
+            for page in paginator.paginate(GroupName=group_name):
+                time.sleep(0.1)
+                schedules.extend(page.get('Schedules', []))
+            return schedules
+
         try:
-            eventbridge_client = boto3.client('events')
+            group_names = self.retry_with_backoff(get_schedule_groups, max_retries=3, base_delay=1.0) or []
+        except Exception as e:
+            print(f"⚠️ EventBridge Scheduler indisponível ou sem permissão: {e}")
+            return []
 
-            if current_state == "ENABLED":
-                # Desabilitar regra
-                def disable_rule():
-                    return eventbridge_client.disable_rule(Name=rule_name)
+        # Listar schedules de cada grupo em paralelo
+        summaries = []
+        if group_names:
+            with ThreadPoolExecutor(max_workers=min(4, len(group_names))) as executor:
+                future_to_group = {
+                    executor.submit(self.retry_with_backoff, get_group_schedules, 3, 1.0, group_name): group_name
+                    for group_name in group_names
+                }
+                for future in as_completed(future_to_group):
+                    group_name = future_to_group[future]
+                    try:
+                        summaries.extend(future.result() or [])
+                    except Exception as e:
+                        print(f"❌ Erro ao listar schedules do grupo {group_name}: {e}")
 
-                self.retry_with_backoff(disable_rule, max_retries=3, base_delay=0.5)
-                new_state = "DISABLED"
-                action = "desabilitada"
+        if not summaries:
+            print("📋 Nenhum schedule do EventBridge Scheduler encontrado")
+            return []
+
+        # Reaproveitar detalhes de schedules que não mudaram desde a última busca
+        schedules_metadata = []
+        to_fetch = []
+        for summary in summaries:
+            last_modified = summary.get('LastModificationDate')
+            last_modified = last_modified.isoformat() if hasattr(last_modified, 'isoformat') else str(last_modified or "")
+            previous = previous_by_key.get(summary.get('Arn'))
+            if previous and previous.get('last_modified') == last_modified and previous.get('state') != "ERROR":
+                # State vem da listagem, então continua correto mesmo reaproveitando o restante
+                schedules_metadata.append({**previous, 'state': summary.get('State', previous.get('state'))})
             else:
-                # Habilitar regra
-                def enable_rule():
-                    return eventbridge_client.enable_rule(Name=rule_name)
+                to_fetch.append((summary, last_modified))
 
-                self.retry_with_backoff(enable_rule, max_retries=3, base_delay=0.5)
-                new_state = "ENABLED"
-                action = "habilitada"
+        print(f"📊 {len(summaries)} schedules encontrados em {len(group_names)} grupos "
+              f"({len(summaries) - len(to_fetch)} reaproveitados, {len(to_fetch)} a detalhar)")
 
-            print(f"✅ Regra '{rule_name}' {action} com sucesso")
-            return new_state
+        if to_fetch:
+            with ThreadPoolExecutor(max_workers=3) as executor:
+                futures = [
+                    executor.submit(self.fetch_single_schedule_details, summary, last_modified)
+                    for summary, last_modified in to_fetch
+                ]
+                for future in as_completed(futures):
+                    schedules_metadata.append(future.result())
 
-        except Exception as e:
-            print(f"❌ Erro ao alterar estado da regra {rule_name}: {e}")
-            return current_state  # Retorna estado original em caso de erro
+        return schedules_metadata
 
-    def update_eventbridge_table(self, rules_data=None):
-        """Atualiza a tabela da aba EventBridge."""
-        if rules_data is None:
+    def fetch_single_schedule_details(self, summary, last_modified):
+        """Busca detalhes de um único schedule do EventBridge Scheduler."""
+        schedule_name = summary.get('Name', 'UNKNOWN')
+        group_name = summary.get('GroupName', 'default')
+        try:
+            time.sleep(random.uniform(0.1, 0.3))
+
+            def get_schedule():
+                scheduler_client = boto3.client('scheduler')
+                return scheduler_client.get_schedule(Name=schedule_name, GroupName=group_name)
+
+            schedule = self.retry_with_backoff(get_schedule, max_retries=3, base_delay=0.5)
+
+            return {
+                'name': schedule_name,
+                'state': schedule.get('State', summary.get('State', 'UNKNOWN')),
+                'description': schedule.get('Description', 'N/A'),
+                'schedule': schedule.get('ScheduleExpression', 'N/A'),
+                'timezone': schedule.get('ScheduleExpressionTimezone', 'UTC'),
+                'targets': 1 if schedule.get('Target') else 0,
+                'target_arns': [schedule['Target']['Arn']] if schedule.get('Target', {}).get('Arn') else [],
+                'arn': schedule.get('Arn', summary.get('Arn', 'N/A')),
+                'source': "scheduler",
+                'group': group_name,
+                'last_modified': last_modified
+            }
+
+        except Exception as e:
+            print(f"❌ Erro ao buscar detalhes do schedule {schedule_name}: {e}")
+            return {
+                'name': schedule_name,
+                'state': "ERROR",
+                'description': f"Erro: {str(e)}",
+                'schedule': "N/A",
+                'targets': 0,
+                'arn': summary.get('Arn', 'N/A'),
+                'source': "scheduler",
+                'group': group_name,
+                'last_modified': last_modified
+            }
+
+    def format_rule_origin(self, rule):
+        """Retorna o bus (regras) ou o grupo do Scheduler (schedules) para exibição"""
+        if rule.get('source') == "scheduler":
+            return f"scheduler/{rule.get('group', 'default')}"
+        return rule.get('event_bus', 'default')
+
+    def toggle_eventbridge_rule(self, rule_name, current_state, event_bus="default"):
+        """Liga ou desliga uma regra do EventBridge."""
+        try:
+            eventbridge_client = boto3.client('events')
+
+            if current_state == "ENABLED":
+                # Desabilitar regra
+                def disable_rule():
+                    return eventbridge_client.disable_rule(Name=rule_name, EventBusName=event_bus)
+
+                self.retry_with_backoff(disable_rule, max_retries=3, base_delay=0.5)
+                new_state = "DISABLED"
+                action = "desabilitada"
+            else:
+                # Habilitar regra
+                def enable_rule():
+                    return eventbridge_client.enable_rule(Name=rule_name, EventBusName=event_bus)
+
+                self.retry_with_backoff(enable_rule, max_retries=3, base_delay=0.5)
+                new_state = "ENABLED"
+                action = "habilitada"
+
+            print(f"✅ Regra '{rule_name}' {action} com sucesso")
+            return new_state
+
+        except Exception as e:
+            print(f"❌ Erro ao alterar estado da regra {rule_name}: {e}")
+            return current_state  # Retorna estado original em caso de erro
+
+    def toggle_scheduler_schedule(self, schedule_name, group_name, current_state):
+        """Liga ou desliga um schedule do EventBridge Scheduler.
+
+        O Scheduler não tem enable/disable: update_schedule substitui o schedule inteiro,
+        então reenviamos a definição atual trocando apenas o State.
+        """
+        try:
+            scheduler_client = boto3.client('scheduler')
+            new_state = "DISABLED" if current_state == "ENABLED" else "ENABLED"
+
+            def update_state():
+                schedule = scheduler_client.get_schedule(Name=schedule_name, GroupName=group_name)
+                update_fields = [
+                    'Name', 'GroupName', 'ScheduleExpression', 'ScheduleExpressionTimezone',
+                    'FlexibleTimeWindow', 'Target', 'Description', 'StartDate', 'EndDate',
+                    'KmsKeyArn', 'ActionAfterCompletion'
+                ]
+                params = {field: schedule[field] for field in update_fields if schedule.get(field) is not None}
+                params['State'] = new_state
+                return scheduler_client.update_schedule(**params)
+
+            self.retry_with_backoff(update_state, max_retries=3, base_delay=0.5)
+
+            action = "habilitado" if new_state == "ENABLED" else "desabilitado"
+            print(f"✅ Schedule '{group_name}/{schedule_name}' {action} com sucesso")
+            return new_state
+
+        except Exception as e:
+            print(f"❌ Erro ao alterar estado do schedule {schedule_name}: {e}")
+            return current_state  # Retorna estado original em caso de erro
+
+    def update_eventbridge_table(self, rules_data=None):
+        """Atualiza a tabela da aba EventBridge."""
+        if rules_data is None:
             rules_data = getattr(self, "all_eventbridge_rules", [])
 
         # Limpa tabela atual
@@ -6027,7 +7170,7 @@ POR WORKGROUP:
                 value=is_enabled,
                 active_color=ft.Colors.GREEN,
                 inactive_color=ft.Colors.RED,
-                on_change=lambda e, rule_name=rule.get("name"): self.on_rule_switch_toggle(e, rule_name)
+                on_change=lambda e, rule_key=self.get_eventbridge_rule_key(rule): self.on_rule_switch_toggle(e, rule_key)
             )
 
             # Definir cor do estado
@@ -6036,9 +7179,11 @@ POR WORKGROUP:
             row = ft.DataRow(
                 cells=[
                     ft.DataCell(ft.Text(rule.get("name", ""), size=12)),
+                    ft.DataCell(ft.Text(self.format_rule_origin(rule), size=12)),
                     ft.DataCell(ft.Text(current_state, size=12, color=state_color, weight=ft.FontWeight.BOLD)),
                     ft.DataCell(ft.Text(rule.get("description", "N/A")[:50] + "..." if len(rule.get("description", "")) > 50 else rule.get("description", "N/A"), size=12)),
                     ft.DataCell(ft.Text(rule.get("schedule", "N/A"), size=12)),
+                    ft.DataCell(ft.Text(self.format_next_run(rule), size=12)),
                     ft.DataCell(ft.Text(str(rule.get("targets", 0)), size=12)),
                     ft.DataCell(switch_button),
                 ]
@@ -6049,20 +7194,22 @@ POR WORKGROUP:
         if hasattr(self, "page"):
             self.page.update()
 
-    def on_rule_switch_toggle(self, e, rule_name):
+    def on_rule_switch_toggle(self, e, rule_key):
         """Callback para quando o usuário clica no switch de uma regra."""
         try:
-            # Encontrar a regra atual na lista
+            # Encontrar a regra atual na lista (pelo ARN: o mesmo nome pode existir em buses/grupos diferentes)
             current_rule = None
             for rule in getattr(self, "all_eventbridge_rules", []):
-                if rule.get("name") == rule_name:
+                if self.get_eventbridge_rule_key(rule) == rule_key:
                     current_rule = rule
                     break
 
             if not current_rule:
-                print(f"❌ Regra {rule_name} não encontrada")
+                print(f"❌ Regra {rule_key} não encontrada")
                 return
 
+            rule_name = current_rule.get("name", rule_key)
+
             current_state = current_rule.get("state", "UNKNOWN")
 
             # Mostrar status de carregamento
@@ -6073,7 +7220,10 @@ POR WORKGROUP:
             # Executar toggle em thread separada para não bloquear a UI
             def toggle_in_background():
                 try:
-                    new_state = self.toggle_eventbridge_rule(rule_name, current_state)
+                    if current_rule.get("source") == "scheduler":
+                        new_state = self.toggle_scheduler_schedule(rule_name, current_rule.get("group", "default"), current_state)
+                    else:
+                        new_state = self.toggle_eventbridge_rule(rule_name, current_state, current_rule.get("event_bus", "default"))
 
                     # Atualizar estado na lista local
                     current_rule["state"] = new_state
@@ -6125,6 +7275,13 @@ POR WORKGROUP:
             self.page.update()
             return
 
+        # Evitar duas varreduras simultâneas do mesmo conjunto de dados
+        if not self.begin_dataset_refresh("eventbridge"):
+            self.monitoring_status_eventbridge.value = "⏳ Atualização já em andamento, aguarde o resultado"
+            self.monitoring_status_eventbridge.color = ft.Colors.ORANGE
+            self.page.update()
+            return
+
         # Ativa progress
         self.monitoring_progress_eventbridge.visible = True
         self.refresh_button_eventbridge.disabled = True
@@ -6134,19 +7291,28 @@ POR WORKGROUP:
 
         def fetch_in_background():
             try:
-                rules = self.fetch_eventbridge_rules()
+                # Dados anteriores (memória ou cache, mesmo expirado) permitem atualização incremental
+                previous_rules = getattr(self, "all_eventbridge_rules", None) or self.load_cache("eventbridge", ignore_age=True) or []
+                rules = self.fetch_eventbridge_rules(previous_rules)
 
                 def update_ui():
-                    self.all_eventbridge_rules = rules
-                    self.update_eventbridge_table(rules)
+                    try:
+                        self.all_eventbridge_rules = rules
+                        self.update_eventbridge_next_runs()
+                        self.update_eventbridge_table(rules)
 
-                    # Salvar no cache
-                    self.save_eventbridge_cache(rules)
+                        # Salvar no cache
+                        self.save_cache("eventbridge", rules)
 
-                    self.monitoring_status_eventbridge.value = f"✅ {len(rules)} regras EventBridge encontradas"
-                    self.monitoring_status_eventbridge.color = ft.Colors.GREEN
-                    self.monitoring_progress_eventbridge.visible = False
-                    self.refresh_button_eventbridge.disabled = False
+                        self.monitoring_status_eventbridge.value = f"✅ {len(rules)} regras EventBridge encontradas"
+                        self.monitoring_status_eventbridge.color = ft.Colors.GREEN
+                    except Exception as e:
+                        self.monitoring_status_eventbridge.value = f"❌ Erro ao atualizar regras: {str(e)}"
+                        self.monitoring_status_eventbridge.color = ft.Colors.RED
+                    finally:
+                        self.monitoring_progress_eventbridge.visible = False
+                        self.refresh_button_eventbridge.disabled = False
+                        self.end_dataset_refresh("eventbridge")
                     self.page.update()
 
                 # Executa atualização da UI na thread principal
@@ -6158,6 +7324,7 @@ POR WORKGROUP:
                     self.monitoring_status_eventbridge.color = ft.Colors.RED
                     self.monitoring_progress_eventbridge.visible = False
                     self.refresh_button_eventbridge.disabled = False
+                    self.end_dataset_refresh("eventbridge")
                     self.page.update()
 
                 self.page.run_thread(update_ui_error)
@@ -6180,7 +7347,8 @@ POR WORKGROUP:
             filtered_rules = [
                 rule for rule in self.all_eventbridge_rules
                 if (filter_text in rule.get("name", "").lower() or
-                    filter_text in rule.get("description", "").lower())
+                    filter_text in rule.get("description", "").lower() or
+                    filter_text in self.format_rule_origin(rule).lower())
             ]
             self.update_eventbridge_table(filtered_rules)
 
@@ -6194,7 +7362,7 @@ POR WORKGROUP:
                 return
 
             # Cabeçalhos
-            headers = ["Name", "State", "Description", "Schedule", "Targets"]
+            headers = ["Name", "Bus/Grupo", "State", "Description", "Schedule", "Próxima Execução", "Targets"]
 
             # Dados das linhas (exceto a coluna Actions)
             data = []
@@ -6261,7 +7429,7 @@ POR WORKGROUP:
         """Executa o export EventBridge após a pasta ser selecionada"""
         try:
             # Criar DataFrame
-            df = pd.DataFrame(self.export_data_eventbridge, columns=["Name", "State", "Description", "Schedule", "Targets"])
+            df = pd.DataFrame(self.export_data_eventbridge, columns=["Name", "Bus/Grupo", "State", "Description", "Schedule", "Próxima Execução", "Targets"])
 
             # Nome do arquivo com timestamp
             timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
@@ -6292,10 +7460,3386 @@ POR WORKGROUP:
             self.monitoring_status_eventbridge.color = ft.Colors.RED
             self.page.update()
 
+    # ============== AGENDA DE EXECUÇÕES (CRON/RATE) ==============
+
+    def get_eventbridge_rule_key(self, rule):
+        """Retorna a chave única de uma regra (ARN quando disponível, senão o nome)"""
+        arn = rule.get('arn')
+        if arn and arn != "N/A":
+            return arn
+        return rule.get('name', '')
+
+    def _cron_value(self, text, names=None):
+        """Converte um valor de campo cron (número ou nome como JAN/MON) para inteiro"""
+        text = text.strip().upper()
+        if names and text in names:
+            return names[text]
+        return int(text)
+
+    def parse_cron_field(self, field, min_value, max_value, names=None):
+        """Converte um campo cron (listas, intervalos e passos) em lista ordenada de valores"""
+        values = set()
+        for part in field.upper().split(','):
+            step = 1
+            has_step = '/' in part
+            if has_step:
+                part, step_text = part.split('/', 1)
+                step = int(step_text)
+                if step <= 0:
+                    raise ValueError(f"passo inválido em '{field}'")
+
+            if part in ('*', ''):
+                start, end = min_value, max_value
+            elif '-' in part:
+                start_text, end_text = part.split('-', 1)
+                start = self._cron_value(start_text, names)
+                end = self._cron_value(end_text, names)
+            else:
+                start = self._cron_value(part, names)
+                end = max_value if has_step else start  # "5/15" = de 5 até o fim, de 15 em 15
+
+            if not (min_value <= start <= max_value and min_value <= end <= max_value):
+                raise ValueError(f"valor fora do intervalo {min_value}-{max_value} em '{field}'")
+
+            # Intervalos invertidos (ex: FRI-MON) dão a volta no ciclo
+            if start <= end:
+                candidates = list(range(start, end + 1))
+            else:
+                candidates = list(range(start, max_value + 1)) + list(range(min_value, end + 1))
+            values.update(candidates[::step])
+
+        return sorted(values)
+
+    def _parse_cron_day_of_month(self, field):
+        """Interpreta o campo dia-do-mês (suporta ?, *, L, LW e nW)"""
+        field = field.strip().upper()
+        if field in ('?', '*'):
+            return {"kind": "any"}
+        if field == 'L':
+            return {"kind": "last"}
+        if field == 'LW':
+            return {"kind": "last_weekday"}
+        if field.endswith('W'):
+            day = int(field[:-1])
+            if not 1 <= day <= 31:
+                raise ValueError(f"dia inválido em '{field}'")
+            return {"kind": "nearest_weekday", "day": day}
+        return {"kind": "values", "values": self.parse_cron_field(field, 1, 31)}
+
+    def _parse_cron_day_of_week(self, field):
+        """Interpreta o campo dia-da-semana (1=SUN..7=SAT; suporta ?, *, L, nL e n#k)"""
+        field = field.strip().upper()
+        if field in ('?', '*'):
+            return {"kind": "any"}
+        if field == 'L':
+            return {"kind": "values", "values": [7]}
+        if '#' in field:
+            weekday_text, nth_text = field.split('#', 1)
+            nth = int(nth_text)
+            if not 1 <= nth <= 5:
+                raise ValueError(f"ocorrência inválida em '{field}'")
+            return {"kind": "nth", "weekday": self._cron_value(weekday_text, CRON_WEEKDAY_NAMES), "nth": nth}
+        if field.endswith('L'):
+            return {"kind": "last_of", "weekday": self._cron_value(field[:-1], CRON_WEEKDAY_NAMES)}
+        return {"kind": "values", "values": self.parse_cron_field(field, 1, 7, CRON_WEEKDAY_NAMES)}
+
+    def parse_schedule_expression(self, expression, timezone_name="UTC"):
+        """Interpreta expressões cron()/rate()/at() do EventBridge. Retorna None se não for um agendamento válido"""
+        if not expression or not isinstance(expression, str):
+            return None
+
+        if not hasattr(self, '_schedule_spec_cache'):
+            self._schedule_spec_cache = {}
+        cache_key = (expression, timezone_name)
+        if cache_key in self._schedule_spec_cache:
+            return self._schedule_spec_cache[cache_key]
+
+        spec = None
+        text = expression.strip()
+        try:
+            if text.startswith("rate(") and text.endswith(")"):
+                value_text, unit = text[5:-1].split()
+                unit_seconds = {
+                    "minute": 60, "minutes": 60,
+                    "hour": 3600, "hours": 3600,
+                    "day": 86400, "days": 86400
+                }
+                value = int(value_text)
+                if value > 0 and unit.lower() in unit_seconds:
+                    spec = {
+                        "type": "rate",
+                        "period_seconds": value * unit_seconds[unit.lower()],
+                        "timezone": timezone_name
+                    }
+
+            elif text.startswith("at(") and text.endswith(")"):
+                # Execução única do EventBridge Scheduler: at(yyyy-mm-ddThh:mm:ss) no timezone do schedule
+                local_time = pd.Timestamp(text[3:-1])
+                spec = {
+                    "type": "at",
+                    "fire_value": local_time.tz_localize(timezone_name, ambiguous=True, nonexistent='shift_forward').tz_convert('UTC').value,
+                    "timezone": timezone_name
+                }
+
+            elif text.startswith("cron(") and text.endswith(")"):
+                fields = text[5:-1].split()
+                if len(fields) == 6:
+                    minutes, hours, day_of_month, months, day_of_week, years = fields
+                    spec = {
+                        "type": "cron",
+                        "minutes": self.parse_cron_field(minutes, 0, 59),
+                        "hours": self.parse_cron_field(hours, 0, 23),
+                        "day_of_month": self._parse_cron_day_of_month(day_of_month),
+                        "months": self.parse_cron_field(months, 1, 12, CRON_MONTH_NAMES),
+                        "day_of_week": self._parse_cron_day_of_week(day_of_week),
+                        "years": None if years in ('*', '?') else self.parse_cron_field(years, 1970, 2199),
+                        "timezone": timezone_name
+                    }
+
+        except (ValueError, KeyError) as e:
+            print(f"⚠️ Expressão de agendamento inválida '{expression}': {e}")
+            spec = None
+
+        self._schedule_spec_cache[cache_key] = spec
+        return spec
+
+    def _build_schedule_calendar(self, first_day, days):
+        """Monta o calendário (um dia por linha) compartilhado por todas as regras de um timezone"""
+        dates = pd.date_range(first_day, periods=days, freq='D', unit='ns')
+        return {
+            "dates": dates.values,
+            "year": dates.year.values,
+            "month": dates.month.values,
+            "day": dates.day.values,
+            "days_in_month": dates.days_in_month.values,
+            # pandas usa segunda=0..domingo=6; o EventBridge usa domingo=1..sábado=7
+            "weekday": ((dates.dayofweek.values + 1) % 7) + 1,
+        }
+
+    def _cron_day_mask(self, spec, calendar):
+        """Calcula (vetorizado) quais dias do calendário satisfazem mês, ano, dia-do-mês e dia-da-semana"""
+        day = calendar["day"]
+        weekday = calendar["weekday"]
+        days_in_month = calendar["days_in_month"]
+
+        mask = np.isin(calendar["month"], spec["months"])
+        if spec["years"] is not None:
+            mask &= np.isin(calendar["year"], spec["years"])
+
+        dom = spec["day_of_month"]
+        if dom["kind"] == "values":
+            mask &= np.isin(day, dom["values"])
+        elif dom["kind"] == "last":
+            mask &= day == days_in_month
+        elif dom["kind"] in ("nearest_weekday", "last_weekday"):
+            # Dia útil (seg-sex) mais próximo do dia alvo, sem sair do mês
+            target = days_in_month if dom["kind"] == "last_weekday" else np.minimum(dom["day"], days_in_month)
+            target_weekday = ((weekday - 1 + (target - day)) % 7) + 1
+            adjusted = np.where(
+                target_weekday == 7,
+                np.where(target > 1, target - 1, target + 2),
+                np.where(target_weekday == 1, np.where(target < days_in_month, target + 1, target - 2), target)
+            )
+            mask &= day == adjusted
+
+        dow = spec["day_of_week"]
+        if dow["kind"] == "values":
+            mask &= np.isin(weekday, dow["values"])
+        elif dow["kind"] == "last_of":
+            mask &= (weekday == dow["weekday"]) & (day + 7 > days_in_month)
+        elif dow["kind"] == "nth":
+            mask &= (weekday == dow["weekday"]) & ((day - 1) // 7 + 1 == dow["nth"])
+
+        return mask
+
+    def _cron_fire_times(self, spec, calendar, start, count, until):
+        """Gera os horários (ns desde epoch, UTC) de uma regra cron a partir do calendário"""
+        day_values = calendar["dates"][self._cron_day_mask(spec, calendar)]
+        offsets = np.array(sorted(h * 60 + m for h in spec["hours"] for m in spec["minutes"]), dtype='int64')
+        if not len(day_values) or not len(offsets):
+            return np.array([], dtype='int64')
+
+        if until is None:
+            # Só precisamos dos primeiros dias que cobrem 'count' execuções (+ margem para timezone/DST)
+            day_values = day_values[:count // len(offsets) + 3]
+
+        local_times = (day_values[:, None] + (offsets * 60_000_000_000).astype('timedelta64[ns]')[None, :]).ravel()
+        fire_index = pd.DatetimeIndex(local_times).tz_localize(
+            spec["timezone"],
+            ambiguous=np.ones(len(local_times), dtype=bool),
+            nonexistent='shift_forward'
+        ).tz_convert('UTC').as_unit('ns')
+
+        values = np.unique(fire_index.asi8)
+        values = values[values >= start.value]
+        if until is not None:
+            return values[values < until.value]
+        return values[:count]
+
+    def _rate_fire_times(self, spec, start, count, until):
+        """Gera os horários (ns desde epoch, UTC) de uma regra rate()
+
+        O EventBridge conta o intervalo a partir da criação da regra, que não temos localmente;
+        usamos a grade alinhada à época (ex: rate(5 minutes) -> :00, :05, :10...).
+        """
+        period_ns = spec["period_seconds"] * 1_000_000_000
+        first = -(-start.value // period_ns) * period_ns
+        if until is not None:
+            total = max(0, (until.value - first - 1) // period_ns + 1)
+        else:
+            total = count
+        return first + np.arange(total, dtype='int64') * period_ns
+
+    def compute_schedule_fire_times(self, schedules, start=None, count=5, until=None):
+        """Calcula as próximas execuções de vários agendamentos numa única passada vetorizada
+
+        schedules: lista de tuplas (chave, expressão, timezone). Com 'until' retorna todas as
+        execuções no intervalo; sem ele, as próximas 'count' de cada agendamento. O resultado é
+        um DataFrame com colunas 'key' e 'fire_time' (UTC), ordenado por horário.
+        """
+        start = pd.Timestamp(start) if start is not None else pd.Timestamp.now(tz='UTC')
+        start = start.tz_localize('UTC') if start.tzinfo is None else start.tz_convert('UTC')
+        if until is not None:
+            until = pd.Timestamp(until)
+            until = until.tz_localize('UTC') if until.tzinfo is None else until.tz_convert('UTC')
+            horizon_days = (until - start).days + 3
+        else:
+            horizon_days = 800  # ~2 anos cobre expressões anuais
+
+        calendars = {}
+        keys = []
+        values = []
+
+        for key, expression, timezone_name in schedules:
+            spec = self.parse_schedule_expression(expression, timezone_name or "UTC")
+            if not spec:
+                continue
+
+            try:
+                if spec["type"] == "rate":
+                    fire_values = self._rate_fire_times(spec, start, count, until)
+                elif spec["type"] == "at":
+                    in_range = spec["fire_value"] >= start.value and (until is None or spec["fire_value"] < until.value)
+                    fire_values = np.array([spec["fire_value"]] if in_range else [], dtype='int64')
+                else:
+                    tz = spec["timezone"]
+                    if tz not in calendars:
+                        # Começa um dia antes para cobrir timezones atrás do UTC
+                        first_day = start.tz_convert(tz).tz_localize(None).normalize() - pd.Timedelta(days=1)
+                        calendars[tz] = self._build_schedule_calendar(first_day, horizon_days)
+                    fire_values = self._cron_fire_times(spec, calendars[tz], start, count, until)
+            except Exception as e:
+                print(f"⚠️ Erro ao calcular execuções de {key}: {e}")
+                continue
+
+            if len(fire_values):
+                keys.append(np.full(len(fire_values), key, dtype=object))
+                values.append(fire_values)
+
+        if not values:
+            return pd.DataFrame({"key": pd.Series([], dtype=object), "fire_time": pd.DatetimeIndex([], tz='UTC')})
+
+        fires = pd.DataFrame({
+            "key": np.concatenate(keys),
+            "fire_time": pd.to_datetime(np.concatenate(values), unit='ns', utc=True)
+        })
+        return fires.sort_values("fire_time", kind="stable").reset_index(drop=True)
+
+    def get_schedule_entries(self, rules, only_enabled=False):
+        """Extrai (chave, expressão, timezone) das regras que possuem agendamento"""
+        entries = []
+        for rule in rules:
+            if only_enabled and rule.get('state') != "ENABLED":
+                continue
+            schedule = rule.get('schedule')
+            if schedule and schedule != "N/A":
+                entries.append((self.get_eventbridge_rule_key(rule), schedule, rule.get('timezone') or "UTC"))
+        return entries
+
+    def update_eventbridge_next_runs(self):
+        """Recalcula a próxima execução de todas as regras agendadas"""
+        try:
+            rules = getattr(self, "all_eventbridge_rules", [])
+            fires = self.compute_schedule_fire_times(self.get_schedule_entries(rules), count=1)
+            self.eventbridge_next_runs = dict(zip(fires["key"], fires["fire_time"]))
+        except Exception as e:
+            print(f"⚠️ Erro ao calcular próximas execuções: {e}")
+            self.eventbridge_next_runs = {}
+
+    def format_next_run(self, rule):
+        """Formata a próxima execução de uma regra para exibição na tabela"""
+        if rule.get('state') != "ENABLED":
+            return "—"
+        next_run = getattr(self, "eventbridge_next_runs", {}).get(self.get_eventbridge_rule_key(rule))
+        if next_run is None:
+            return "—"
+        return next_run.strftime("%Y-%m-%d %H:%M UTC")
+
+    def build_schedule_timeline(self, rules, hours=24, bucket_minutes=60, top_peaks=10):
+        """Monta a timeline das próximas X horas e o histograma de execuções simultâneas"""
+        start = pd.Timestamp.now(tz='UTC').floor('min')
+        until = start + pd.Timedelta(hours=hours)
+        fires = self.compute_schedule_fire_times(self.get_schedule_entries(rules, only_enabled=True), start=start, until=until)
+
+        # Histograma por faixa de horário (inclui faixas vazias para a timeline ficar contínua)
+        buckets = pd.date_range(start.floor(f"{bucket_minutes}min"), until, freq=f"{bucket_minutes}min")
+        histogram = fires.groupby(fires["fire_time"].dt.floor(f"{bucket_minutes}min")).size()
+        histogram = histogram.reindex(buckets, fill_value=0)
+
+        # Minutos com mais regras disparando ao mesmo tempo
+        per_minute = fires.groupby("fire_time")["key"].agg(list)
+        per_minute_count = per_minute.map(len).sort_values(ascending=False, kind="stable")
+        peaks = [(fire_time, per_minute[fire_time]) for fire_time in per_minute_count.index[:top_peaks]]
+
+        return {
+            "start": start,
+            "until": until,
+            "total_fires": len(fires),
+            "rules_count": fires["key"].nunique(),
+            "histogram": histogram,
+            "peaks": peaks,
+            "peak_concurrency": int(per_minute_count.iloc[0]) if len(per_minute_count) else 0
+        }
+
+    def toggle_eventbridge_timeline(self, e=None):
+        """Mostra/oculta o painel com a agenda das próximas 24h"""
+        if self.eventbridge_timeline_container.visible:
+            self.eventbridge_timeline_container.visible = False
+            self.page.update()
+            return
+
+        rules = getattr(self, "all_eventbridge_rules", [])
+        if not rules:
+            self.monitoring_status_eventbridge.value = "❌ Carregue as regras EventBridge primeiro"
+            self.monitoring_status_eventbridge.color = ft.Colors.RED
+            self.page.update()
+            return
+
+        self.monitoring_status_eventbridge.value = "🗓️ Calculando agenda das próximas 24h..."
+        self.monitoring_status_eventbridge.color = ft.Colors.ORANGE
+        self.page.update()
+
+        def build_in_background():
+            try:
+                timeline = self.build_schedule_timeline(rules)
+
+                def update_ui():
+                    self.render_eventbridge_timeline(timeline)
+                    self.monitoring_status_eventbridge.value = (
+                        f"🗓️ {timeline['total_fires']} execuções de {timeline['rules_count']} regras nas próximas 24h"
+                    )
+                    self.monitoring_status_eventbridge.color = ft.Colors.GREEN
+                    self.page.update()
+
+                self.page.run_thread(update_ui)
+
+            except Exception as e:
+                def update_ui_error():
+                    self.monitoring_status_eventbridge.value = f"❌ Erro ao calcular agenda: {str(e)}"
+                    self.monitoring_status_eventbridge.color = ft.Colors.RED
+                    self.page.update()
+
+                self.page.run_thread(update_ui_error)
+
+        threading.Thread(target=build_in_background, daemon=True).start()
+
+    def render_eventbridge_timeline(self, timeline):
+        """Desenha o histograma por hora e os picos de concorrência no painel da agenda"""
+        histogram = timeline["histogram"]
+        max_count = int(histogram.max()) if len(histogram) else 0
+
+        bars = []
+        for bucket, count in histogram.items():
+            bar_width = 400 * count / max_count if max_count else 0
+            bars.append(ft.Row([
+                ft.Text(bucket.strftime("%d/%m %H:%M"), size=11, color=ft.Colors.GREY_400, width=90),
+                ft.Container(
+                    width=max(bar_width, 2) if count else 0,
+                    height=12,
+                    bgcolor=ft.Colors.RED_400 if count == max_count and count > 0 else ft.Colors.BLUE_400,
+                    border_radius=3
+                ),
+                ft.Text(str(count), size=11, color=ft.Colors.WHITE),
+            ], spacing=8))
+
+        peak_lines = []
+        for fire_time, keys in timeline["peaks"]:
+            names = [key.split('/')[-1] for key in keys]
+            preview = ", ".join(names[:5]) + (f" +{len(names) - 5}" if len(names) > 5 else "")
+            peak_lines.append(ft.Text(
+                f"• {fire_time.strftime('%d/%m %H:%M')} UTC — {len(keys)} regras: {preview}",
+                size=12,
+                color=ft.Colors.ORANGE if len(keys) > 1 else ft.Colors.WHITE
+            ))
+
+        self.eventbridge_timeline_container.content = ft.Column([
+            ft.Text(
+                f"Agenda {timeline['start'].strftime('%d/%m %H:%M')} → {timeline['until'].strftime('%d/%m %H:%M')} UTC"
+                f" • Pico: {timeline['peak_concurrency']} regras no mesmo minuto",
+                size=14, weight=ft.FontWeight.BOLD, color=ft.Colors.WHITE
+            ),
+            ft.Container(height=10),
+            ft.Text("Execuções por hora:", size=12, weight=ft.FontWeight.W_500, color=ft.Colors.BLUE_200),
+            ft.Column(bars, spacing=2),
+            ft.Container(height=10),
+            ft.Text("Horários com mais regras simultâneas:", size=12, weight=ft.FontWeight.W_500, color=ft.Colors.BLUE_200),
+            ft.Column(peak_lines or [ft.Text("Nenhuma execução agendada", size=12, color=ft.Colors.GREY_400)], spacing=2),
+        ])
+        self.eventbridge_timeline_container.visible = True
+        self.page.update()
+
+    # ============== TESTE LOCAL DE EVENT PATTERNS ==============
+
+    def _compile_pattern_condition(self, condition):
+        """Compila uma condição de folha do event pattern em um predicado sobre um valor escalar"""
+        if not isinstance(condition, dict):
+            # Valor literal: comparação exata (sem confundir True com 1)
+            return lambda value: value == condition and isinstance(value, bool) == isinstance(condition, bool)
+
+        if len(condition) != 1:
+            raise ValueError(f"condição inválida: {condition}")
+        operator, argument = next(iter(condition.items()))
+
+        if operator in ("prefix", "suffix"):
+            ignore_case = isinstance(argument, dict)
+            text = argument.get("equals-ignore-case", "") if ignore_case else argument
+            text = text.lower() if ignore_case else text
+
+            def match_affix(value):
+                if not isinstance(value, str):
+                    return False
+                value = value.lower() if ignore_case else value
+                return value.startswith(text) if operator == "prefix" else value.endswith(text)
+            return match_affix
+
+        if operator == "equals-ignore-case":
+            return lambda value: isinstance(value, str) and value.lower() == argument.lower()
+
+        if operator == "wildcard":
+            regex = re.compile(".*".join(re.escape(part) for part in argument.split("*")), re.DOTALL)
+            return lambda value: isinstance(value, str) and regex.fullmatch(value) is not None
+
+        if operator == "numeric":
+            comparisons = {
+                "=": lambda a, b: a == b, "<": lambda a, b: a < b, "<=": lambda a, b: a <= b,
+                ">": lambda a, b: a > b, ">=": lambda a, b: a >= b
+            }
+            checks = [(comparisons[argument[i]], argument[i + 1]) for i in range(0, len(argument), 2)]
+            return lambda value: (
+                isinstance(value, (int, float)) and not isinstance(value, bool)
+                and all(compare(value, limit) for compare, limit in checks)
+            )
+
+        if operator == "cidr":
+            network = ipaddress.ip_network(argument, strict=False)
+
+            def match_cidr(value):
+                try:
+                    return isinstance(value, str) and ipaddress.ip_address(value) in network
+                except ValueError:
+                    return False
+            return match_cidr
+
+        if operator == "anything-but":
+            excluded = argument if isinstance(argument, list) else [argument]
+            predicates = [self._compile_pattern_condition(item) for item in excluded]
+            return lambda value: not any(predicate(value) for predicate in predicates)
+
+        raise ValueError(f"operador não suportado: {operator}")
+
+    def _compile_pattern_leaf(self, conditions):
+        """Compila a lista de condições de um campo. Retorna matcher(presente, valor)"""
+        if not isinstance(conditions, list):
+            raise ValueError(f"valores do pattern devem ser listas: {conditions}")
+
+        exists_checks = []
+        predicates = []
+        for condition in conditions:
+            if isinstance(condition, dict) and "exists" in condition:
+                exists_checks.append(bool(condition["exists"]))
+            else:
+                predicates.append(self._compile_pattern_condition(condition))
+
+        def match_leaf(present, value):
+            if any(present == should_exist for should_exist in exists_checks):
+                return True
+            if not present:
+                return False
+            # Campos com array no evento casam se qualquer elemento casar
+            values = value if isinstance(value, list) else [value]
+            return any(predicate(item) for item in values for predicate in predicates)
+
+        return match_leaf
+
+    def _compile_pattern_object(self, pattern):
+        """Compila um nível (objeto) do event pattern. Retorna matcher(presente, valor)"""
+        if not isinstance(pattern, dict):
+            raise ValueError(f"pattern deve ser um objeto: {pattern}")
+
+        field_matchers = []
+        or_matchers = []
+        for key, sub_pattern in pattern.items():
+            if key == "$or":
+                or_matchers.append([self._compile_pattern_object(option) for option in sub_pattern])
+            elif isinstance(sub_pattern, dict):
+                field_matchers.append((key, self._compile_pattern_object(sub_pattern)))
+            else:
+                field_matchers.append((key, self._compile_pattern_leaf(sub_pattern)))
+
+        def match_object(present, value):
+            if present and isinstance(value, list):
+                # Array de objetos no evento: basta um elemento casar
+                return any(match_object(True, item) for item in value if isinstance(item, dict))
+
+            obj = value if present and isinstance(value, dict) else {}
+            for key, matcher in field_matchers:
+                if not matcher(key in obj, obj.get(key)):
+                    return False
+            for options in or_matchers:
+                if not any(option(present, value) for option in options):
+                    return False
+            return True
+
+        return match_object
+
+    def compile_event_pattern(self, event_pattern):
+        """Compila (com cache) o EventPattern de uma regra em uma função evento -> bool"""
+        if not hasattr(self, '_event_pattern_matchers'):
+            self._event_pattern_matchers = {}
+        if event_pattern in self._event_pattern_matchers:
+            return self._event_pattern_matchers[event_pattern]
+
+        pattern = json.loads(event_pattern) if isinstance(event_pattern, str) else event_pattern
+        object_matcher = self._compile_pattern_object(pattern)
+        matcher = lambda event: object_matcher(True, event)
+
+        if isinstance(event_pattern, str):
+            self._event_pattern_matchers[event_pattern] = matcher
+        return matcher
+
+    def match_event_against_rules(self, event, rules):
+        """Avalia um evento contra o EventPattern de todas as regras. Retorna (regras que casam, erros)"""
+        matched = []
+        errors = []
+        for rule in rules:
+            event_pattern = rule.get('event_pattern')
+            if not event_pattern:
+                continue
+            try:
+                if self.compile_event_pattern(event_pattern)(event):
+                    matched.append(rule)
+            except Exception as e:
+                errors.append((rule.get('name', ''), str(e)))
+        return matched, errors
+
+    def toggle_event_test_panel(self, e=None):
+        """Mostra/oculta o painel de teste de eventos"""
+        self.eventbridge_test_container.visible = not self.eventbridge_test_container.visible
+        self.page.update()
+
+    def run_event_pattern_test(self, e=None):
+        """Testa o evento JSON informado contra todas as regras carregadas"""
+        rules = getattr(self, "all_eventbridge_rules", [])
+        self.eventbridge_test_results.controls.clear()
+
+        try:
+            event = json.loads(self.eventbridge_test_input.value or "")
+            if not isinstance(event, dict):
+                raise ValueError("o evento deve ser um objeto JSON")
+        except ValueError as ex:
+            self.eventbridge_test_results.controls.append(
+                ft.Text(f"❌ JSON inválido: {ex}", size=12, color=ft.Colors.RED)
+            )
+            self.page.update()
+            return
+
+        start_time = time.time()
+        matched, errors = self.match_event_against_rules(event, rules)
+        duration_ms = (time.time() - start_time) * 1000
+        patterns_count = sum(1 for rule in rules if rule.get('event_pattern'))
+
+        self.eventbridge_test_results.controls.append(ft.Text(
+            f"{'✅' if matched else '⚪'} {len(matched)} de {patterns_count} regras com pattern casam ({duration_ms:.0f} ms)",
+            size=13, weight=ft.FontWeight.BOLD, color=ft.Colors.WHITE
+        ))
+
+        for rule in matched:
+            is_enabled = rule.get('state') == "ENABLED"
+            targets = rule.get('target_arns') or []
+            self.eventbridge_test_results.controls.append(ft.Column([
+                ft.Text(
+                    f"• {rule.get('name', '')} [{self.format_rule_origin(rule)}]" + ("" if is_enabled else f" ({rule.get('state')})"),
+                    size=12, weight=ft.FontWeight.W_500,
+                    color=ft.Colors.GREEN if is_enabled else ft.Colors.ORANGE
+                ),
+                *[ft.Text(f"    → {target_arn}", size=11, color=ft.Colors.GREY_400, selectable=True) for target_arn in targets],
+            ], spacing=1))
+
+        for rule_name, error in errors:
+            self.eventbridge_test_results.controls.append(
+                ft.Text(f"⚠️ {rule_name}: pattern não suportado ({error})", size=11, color=ft.Colors.ORANGE)
+            )
+
+        self.page.update()
+
+    # ============== GRAFO DE GATILHOS (EVENTBRIDGE / STEP FUNCTIONS / GLUE) ==============
+
+    def _trigger_graph_node_for_arn(self, arn):
+        """Converte o ARN de um target em nó do grafo (state machines e jobs Glue viram nós conhecidos)"""
+        parts = arn.split(':')
+        if len(parts) >= 7 and parts[2] == "states" and parts[5] == "stateMachine":
+            return f"sfn:{parts[6]}"
+        if len(parts) >= 6 and parts[2] == "glue" and parts[5].startswith("job/"):
+            return f"glue:job:{parts[5][4:]}"
+        return f"arn:{arn}"
+
+    def extract_state_machine_refs(self, definition):
+        """Extrai da definição (ASL) os jobs Glue e state machines iniciados pela state machine"""
+        refs = {"glue_jobs": set(), "state_machines": set()}
+
+        def walk(node):
+            if isinstance(node, dict):
+                resource = node.get("Resource")
+                if isinstance(resource, str):
+                    # Parameters (JSONPath) ou Arguments (JSONata); valores dinâmicos ("JobName.$") são ignorados
+                    params = node.get("Parameters") or node.get("Arguments") or {}
+                    if ":glue:startJobRun" in resource and isinstance(params.get("JobName"), str):
+                        refs["glue_jobs"].add(params["JobName"])
+                    elif ":states:startExecution" in resource and isinstance(params.get("StateMachineArn"), str):
+                        refs["state_machines"].add(params["StateMachineArn"])
+                for value in node.values():
+                    walk(value)
+            elif isinstance(node, list):
+                for value in node:
+                    walk(value)
+
+        try:
+            walk(json.loads(definition) if isinstance(definition, str) else definition)
+        except (ValueError, TypeError) as e:
+            print(f"⚠️ Definição de state machine inválida: {e}")
+
+        return {key: sorted(values) for key, values in refs.items()}
+
+    def fetch_glue_triggers_by_job(self, glue_client):
+        """Busca os triggers Glue e agrupa por job iniciado (job -> triggers que o disparam)"""
+        triggers_by_job = {}
+        try:
+            paginator = glue_client.get_paginator('get_triggers')
+            for page in paginator.paginate():
+                for trigger in page.get('Triggers', []):
+                    condition_jobs = sorted({
+                        condition['JobName']
+                        for condition in trigger.get('Predicate', {}).get('Conditions', [])
+                        if condition.get('JobName')
+                    })
+                    trigger_info = {
+                        'name': trigger['Name'],
+                        'type': trigger.get('Type', ''),
+                        'state': trigger.get('State', ''),
+                        'schedule': trigger.get('Schedule', ''),
+                        'condition_jobs': condition_jobs
+                    }
+                    for action in trigger.get('Actions', []):
+                        if action.get('JobName'):
+                            triggers_by_job.setdefault(action['JobName'], []).append(trigger_info)
+        except Exception as e:
+            print(f"⚠️ Erro ao buscar triggers do Glue: {e}")
+        return triggers_by_job
+
+    def _build_trigger_graph_edges(self, source, items):
+        """Gera as arestas (origem, destino) de um dos três conjuntos de dados"""
+        edges = set()
+        if source == "glue":
+            for job in items:
+                for trigger in job.get('triggers', []):
+                    trigger_node = f"glue:trigger:{trigger['name']}"
+                    edges.add((trigger_node, f"glue:job:{job['name']}"))
+                    for upstream_job in trigger.get('condition_jobs', []):
+                        edges.add((f"glue:job:{upstream_job}", trigger_node))
+        elif source == "stpf":
+            for sm in items:
+                refs = sm.get('definition_refs') or {}
+                for job_name in refs.get('glue_jobs', []):
+                    edges.add((f"sfn:{sm['name']}", f"glue:job:{job_name}"))
+                for sm_arn in refs.get('state_machines', []):
+                    edges.add((f"sfn:{sm['name']}", self._trigger_graph_node_for_arn(sm_arn)))
+        elif source == "eventbridge":
+            for rule in items:
+                rule_node = f"events:rule:{self.get_eventbridge_rule_key(rule)}"
+                for target_arn in rule.get('target_arns') or []:
+                    edges.add((rule_node, self._trigger_graph_node_for_arn(target_arn)))
+        return edges
+
+    def update_trigger_graph(self, source, items):
+        """Atualiza o índice apenas para o conjunto de dados que mudou (glue, stpf ou eventbridge)"""
+        if not hasattr(self, 'trigger_graph_edges'):
+            self.trigger_graph_edges = {}
+            self.trigger_graph_labels = {}
+
+        try:
+            self.trigger_graph_edges[source] = self._build_trigger_graph_edges(source, items or [])
+            if source == "eventbridge":
+                self.trigger_graph_labels = {
+                    f"events:rule:{self.get_eventbridge_rule_key(rule)}": rule.get('name', '')
+                    for rule in items or []
+                }
+
+            # Índices de adjacência (nó -> vizinhos) a partir da união das arestas
+            upstream = {}
+            downstream = {}
+            for edges in self.trigger_graph_edges.values():
+                for origin, destination in edges:
+                    downstream.setdefault(origin, set()).add(destination)
+                    upstream.setdefault(destination, set()).add(origin)
+            self.trigger_graph_upstream = upstream
+            self.trigger_graph_downstream = downstream
+
+            print(f"🕸️ Grafo de gatilhos atualizado ({source}): {sum(len(edges) for edges in self.trigger_graph_edges.values())} ligações")
+        except Exception as e:
+            print(f"⚠️ Erro ao atualizar grafo de gatilhos: {e}")
+
+    def ensure_trigger_graph_sources(self):
+        """Carrega do cache os conjuntos de dados que ainda não entraram no grafo"""
+        indexed = getattr(self, 'trigger_graph_edges', {})
+        loaders = {
+            "glue": lambda: self.load_cache("glue", ignore_age=True),
+            "stpf": lambda: self.load_cache("stpf", ignore_age=True),
+            "eventbridge": lambda: self.load_cache("eventbridge", ignore_age=True),
+        }
+        for source, loader in loaders.items():
+            if source not in indexed:
+                # Os loaders já atualizam o grafo quando encontram dados
+                loader()
+
+    def get_trigger_graph_neighbors(self, node):
+        """Retorna (quem dispara este nó, o que este nó dispara)"""
+        upstream = sorted(getattr(self, 'trigger_graph_upstream', {}).get(node, set()))
+        downstream = sorted(getattr(self, 'trigger_graph_downstream', {}).get(node, set()))
+        return upstream, downstream
+
+    def format_trigger_graph_node(self, node):
+        """Formata um nó do grafo para exibição"""
+        if node.startswith("glue:job:"):
+            return f"🧩 Glue Job: {node[9:]}"
+        if node.startswith("glue:trigger:"):
+            return f"⏱️ Glue Trigger: {node[13:]}"
+        if node.startswith("sfn:"):
+            return f"🔀 Step Function: {node[4:]}"
+        if node.startswith("events:rule:"):
+            label = getattr(self, 'trigger_graph_labels', {}).get(node) or node[12:].split('/')[-1]
+            return f"📅 EventBridge: {label}"
+        return f"🔗 {node[4:]}"
+
+    def show_trigger_graph_dialog(self, node):
+        """Mostra quem dispara e o que é disparado pelo job/state machine selecionado"""
+        try:
+            self.ensure_trigger_graph_sources()
+            upstream, downstream = self.get_trigger_graph_neighbors(node)
+
+            # Triggers Glue condicionais: mostrar também os jobs que alimentam o trigger
+            upstream_lines = []
+            for origin in upstream:
+                upstream_lines.append(ft.Text(self.format_trigger_graph_node(origin), size=13, selectable=True))
+                if origin.startswith("glue:trigger:"):
+                    for condition_node in self.get_trigger_graph_neighbors(origin)[0]:
+                        upstream_lines.append(ft.Text(f"    ↳ após {self.format_trigger_graph_node(condition_node)}", size=12, color=ft.Colors.GREY_400))
+
+            downstream_lines = []
+            for destination in downstream:
+                downstream_lines.append(ft.Text(self.format_trigger_graph_node(destination), size=13, selectable=True))
+                if destination.startswith("glue:trigger:"):
+                    for started_node in self.get_trigger_graph_neighbors(destination)[1]:
+                        downstream_lines.append(ft.Text(f"    ↳ inicia {self.format_trigger_graph_node(started_node)}", size=12, color=ft.Colors.GREY_400))
+
+            empty_text = lambda: ft.Text("Nenhum encontrado nos caches carregados", size=12, color=ft.Colors.GREY_400)
+
+            dialog = ft.AlertDialog(
+                title=ft.Text(self.format_trigger_graph_node(node), size=16, weight=ft.FontWeight.BOLD),
+                content=ft.Container(
+                    content=ft.Column([
+                        ft.Text("⬆️ Disparado por:", size=14, weight=ft.FontWeight.W_500, color=ft.Colors.BLUE_200),
+                        *(upstream_lines or [empty_text()]),
+                        ft.Container(height=10),
+                        ft.Text("⬇️ Dispara:", size=14, weight=ft.FontWeight.W_500, color=ft.Colors.BLUE_200),
+                        *(downstream_lines or [empty_text()]),
+                    ], spacing=4, scroll=ft.ScrollMode.AUTO),
+                    width=600,
+                    height=400
+                ),
+                actions=[ft.TextButton("Fechar", on_click=lambda e: self.page.close(dialog))],
+            )
+            self.page.open(dialog)
+
+        except Exception as e:
+            print(f"❌ Erro ao exibir grafo de gatilhos: {e}")
+
+    # ============== PRÉ-CARREGAMENTO DE CACHE APÓS LOGIN ==============
+
+    def on_warmup_toggle(self, e):
+        """Salva a preferência de pré-carregamento após login"""
+        self.config.setdefault("cache", {})["warmup_after_login"] = bool(e.control.value)
+        self.save_config()
+        if e.control.value and self.current_account_id:
+            self.start_cache_warmup()
+
+    def start_cache_warmup(self):
+        """Inicia (uma única vez por vez) o pré-carregamento dos caches em segundo plano"""
+        if getattr(self, "warmup_thread", None) and self.warmup_thread.is_alive():
+            return
+        self.warmup_thread = threading.Thread(target=self.run_cache_warmup, daemon=True)
+        self.warmup_thread.start()
+
+    def run_cache_warmup(self):
+        """Busca sequencialmente os conjuntos de dados com cache vencido (soft TTL) e grava no cache.
+
+        Roda com baixa prioridade: um conjunto por vez, com pausa entre eles, e aguardando
+        enquanto houver atualização disparada pelo usuário.
+        """
+        warmup_fetchers = [
+            ("glue", self.fetch_glue_jobs),
+            ("stpf", self.fetch_step_functions),
+            ("eventbridge", lambda: self.fetch_eventbridge_rules(self.load_cache("eventbridge", ignore_age=True) or [])),
+            ("tables", lambda: self.fetch_all_tables(databases=["itau", "teste"])),
+        ]
+        account_id = self.current_account_id
+        print("🔥 Pré-carregamento de cache iniciado")
+        start_time = time.time()
+
+        for dataset, fetch in warmup_fetchers:
+            # Interromper se o usuário deslogou ou trocou de conta
+            if not self.current_account_id or self.current_account_id != account_id:
+                print("🔥 Pré-carregamento interrompido (sessão mudou)")
+                return
+
+            if self.is_cache_fresh(dataset):
+                print(f"🔥 {dataset}: cache ainda atual, pulando")
+                continue
+
+            # Dar preferência às atualizações iniciadas pelo usuário, sem esperar indefinidamente
+            waited = 0
+            while self.refreshing_datasets and waited < CACHE_WARMUP_MAX_WAIT_SECONDS:
+                time.sleep(1)
+                waited += 1
+
+            if not self.begin_dataset_refresh(dataset):
+                print(f"🔥 {dataset}: atualização em andamento, pulando")
+                continue
+            try:
+                items = fetch()
+                if items:
+                    self.save_cache(dataset, items)
+                    self.apply_warmed_dataset(dataset)
+            except Exception as e:
+                print(f"⚠️ Erro no pré-carregamento de {dataset}: {e}")
+            finally:
+                self.end_dataset_refresh(dataset)
+
+            time.sleep(2)
+
+        print(f"🔥 Pré-carregamento concluído em {time.time() - start_time:.1f}s")
+
+    def apply_warmed_dataset(self, dataset):
+        """Se a aba do conjunto recém pré-carregado estiver aberta, exibe os dados novos"""
+        sections = {
+            "glue": "Monitoring Glue",
+            "stpf": "Monitoring STF",
+            "tables": "Monitoring Tables",
+            "eventbridge": "EventBridge",
+        }
+        if self.current_section == sections.get(dataset):
+            self.page.run_thread(lambda: self.check_and_load_cache_on_tab_open(dataset))
+
+    # ============== CACHE DO COST EXPLORER ==============
+
+    def get_cost_explorer_cache_filename(self, request_shape):
+        """Retorna o arquivo de cache para um formato de consulta (granularidade, métricas, agrupamento e filtro)"""
+        shape_hash = hashlib.sha256(json.dumps(request_shape, sort_keys=True).encode('utf-8')).hexdigest()[:16]
+        return self.cache_dir / "store" / "cost_explorer" / f"{self.current_account_id}_{shape_hash}.json"
+
+    def _cost_explorer_buckets(self, start_date, end_date, granularity):
+        """Lista os períodos (início, fim) que o Cost Explorer retorna para o intervalo. None se não suportado"""
+        start = datetime.strptime(start_date, '%Y-%m-%d').date()
+        end = datetime.strptime(end_date, '%Y-%m-%d').date()
+        buckets = []
+        current = start
+        while current < end:
+            if granularity == 'DAILY':
+                next_start = current + timedelta(days=1)
+            elif granularity == 'MONTHLY':
+                next_start = (current.replace(day=1) + timedelta(days=32)).replace(day=1)
+            else:
+                return None
+            next_start = min(next_start, end)
+            buckets.append((current.isoformat(), next_start.isoformat()))
+            current = next_start
+        return buckets
+
+    def get_cost_and_usage_cached(self, ce_client, params):
+        """Executa get_cost_and_usage reaproveitando períodos fechados já consultados.
+
+        Períodos já encerrados (não estimados e com fim até hoje) ficam em disco sem expiração;
+        somente os períodos faltantes/abertos são consultados, numa única chamada cobrindo do
+        primeiro ao último período faltante.
+        """
+        request_shape = {key: value for key, value in params.items() if key not in ('TimePeriod', 'NextPageToken')}
+        buckets = self._cost_explorer_buckets(params['TimePeriod']['Start'], params['TimePeriod']['End'], params['Granularity'])
+
+        def call_cost_explorer(time_period):
+            results = []
+            request = {**params, 'TimePeriod': time_period}
+            while True:
+                response = self.retry_with_backoff(ce_client.get_cost_and_usage, 3, 0.5, **request)
+                results.extend(response.get('ResultsByTime', []))
+                if not response.get('NextPageToken'):
+                    return results
+                request['NextPageToken'] = response['NextPageToken']
+
+        if buckets is None:
+            # Granularidade sem períodos previsíveis: consulta direta, sem cache
+            return {'ResultsByTime': call_cost_explorer(params['TimePeriod'])}
+
+        cache_file = self.get_cost_explorer_cache_filename(request_shape)
+        try:
+            with open(cache_file, 'r', encoding='utf-8') as f:
+                cached_periods = json.load(f).get('periods', {})
+        except (OSError, ValueError):
+            cached_periods = {}
+
+        missing = [bucket for bucket in buckets if f"{bucket[0]}/{bucket[1]}" not in cached_periods]
+        fetched = {}
+        if missing:
+            time_period = {'Start': missing[0][0], 'End': missing[-1][1]}
+            print(f"💰 Cost Explorer: {len(buckets) - len(missing)} períodos do cache, consultando {time_period['Start']} a {time_period['End']}")
+            today = datetime.now(timezone.utc).date().isoformat()
+            for result in call_cost_explorer(time_period):
+                key = f"{result['TimePeriod']['Start']}/{result['TimePeriod']['End']}"
+                fetched[key] = result
+                # Só períodos fechados vão para o disco; o período aberto é sempre reconsultado
+                if not result.get('Estimated') and result['TimePeriod']['End'] <= today:
+                    cached_periods[key] = result
+
+            try:
+                self.ensure_cache_directory()
+                self._atomic_write_bytes(cache_file, json.dumps({
+                    'request_shape': request_shape,
+                    'periods': cached_periods
+                }, ensure_ascii=False).encode('utf-8'))
+            except Exception as e:
+                print(f"⚠️ Erro ao salvar cache do Cost Explorer: {e}")
+        else:
+            print(f"💰 Cost Explorer: {len(buckets)} períodos atendidos pelo cache (nenhuma chamada)")
+
+        results_by_time = []
+        for bucket in buckets:
+            key = f"{bucket[0]}/{bucket[1]}"
+            result = fetched.get(key) or cached_periods.get(key)
+            if result:
+                results_by_time.append(result)
+        return {'ResultsByTime': results_by_time}
+
+    # ============== MOTOR DE SINCRONIZAÇÃO S3 ==============
+
+    def get_s3_transfer_settings(self, s3_uri=None):
+        """Configurações de transferência (config.json -> s3.transfer), com os ajustes do ambiente
+        (s3.transfer.per_env.<ambiente>) do caminho informado ou, sem caminho, do ambiente selecionado."""
+        settings = dict(self.config.get("s3", {}).get("transfer", {}))
+        env = self.get_env_from_s3_uri(s3_uri) if s3_uri else getattr(getattr(self, 'env_dropdown', None), 'value', None)
+        settings.update(settings.get("per_env", {}).get(env, {}))
+        return {
+            "multipart_threshold_mb": settings.get("multipart_threshold_mb", 8),
+            "multipart_chunksize_mb": settings.get("multipart_chunksize_mb", 8),
+            "max_concurrency": settings.get("max_concurrency", 10),
+            "max_parallel_files": settings.get("max_parallel_files", 8),
+            "list_workers": settings.get("list_workers", 8),
+            "compare_content": settings.get("compare_content", True),
+            "hash_workers": settings.get("hash_workers", 0),
+            "resumable_threshold_mb": settings.get("resumable_threshold_mb", 256),
+            "max_bandwidth_mbps": settings.get("max_bandwidth_mbps", 0),
+        }
+
+    def get_env_from_s3_uri(self, s3_uri):
+        """Ambiente (sirius, athena...) de um caminho s3://bucket/<prefixo>/<rt>/<ambiente>/..."""
+        try:
+            parts = self.parse_s3_uri(s3_uri)[1].strip('/').split('/')
+        except ValueError:
+            return None
+        env_options = self.config.get("s3", {}).get("environment_options", [])
+        return parts[2] if len(parts) > 2 and parts[2] in env_options else None
+
+    def build_s3_transfer_config(self, settings=None):
+        """Monta o TransferConfig do boto3 a partir das configurações"""
+        settings = settings or self.get_s3_transfer_settings()
+        return TransferConfig(
+            multipart_threshold=int(settings["multipart_threshold_mb"] * 1024 * 1024),
+            multipart_chunksize=int(settings["multipart_chunksize_mb"] * 1024 * 1024),
+            max_concurrency=settings["max_concurrency"],
+            use_threads=True
+        )
+
+    def create_s3_transfer_client(self, settings=None, pool_size=None):
+        """Cliente S3 com pool de conexões suficiente para arquivos e partes em paralelo"""
+        settings = settings or self.get_s3_transfer_settings()
+        pool_size = max(10, pool_size or settings["max_parallel_files"] * settings["max_concurrency"])
+        return boto3.client('s3', config=BotoConfig(max_pool_connections=pool_size,
+                                                    retries={'max_attempts': 10, 'mode': 'adaptive'}))
+
+    def parse_s3_uri(self, s3_uri):
+        """Separa 's3://bucket/prefixo/' em (bucket, prefixo terminado em '/')"""
+        if not s3_uri or not s3_uri.startswith("s3://"):
+            raise ValueError(f"Caminho S3 inválido: {s3_uri}")
+        bucket, _, prefix = s3_uri[5:].partition('/')
+        if prefix and not prefix.endswith('/'):
+            prefix += '/'
+        return bucket, prefix
+
+    def list_local_files(self, root):
+        """Lista arquivos locais como {chave relativa com '/': (tamanho, mtime)}"""
+        files = {}
+        root = Path(root)
+        if not root.exists():
+            return files
+        stack = [root]
+        while stack:
+            with os.scandir(stack.pop()) as entries:
+                for entry in entries:
+                    if entry.is_dir(follow_symlinks=False):
+                        stack.append(Path(entry.path))
+                    elif entry.is_file(follow_symlinks=False):
+                        stat = entry.stat()
+                        key = Path(entry.path).relative_to(root).as_posix()
+                        files[key] = (stat.st_size, stat.st_mtime)
+        return files
+
+    def list_s3_objects(self, s3_client, bucket, prefix, cancel_event=None):
+        """Lista objetos do prefixo como {chave relativa: (tamanho, mtime, etag)}.
+
+        O primeiro nível é listado com Delimiter='/' e cada subpasta é listada em paralelo.
+        """
+        objects = {}
+        paginator = s3_client.get_paginator('list_objects_v2')
+
+        def add_contents(page):
+            for obj in page.get('Contents', []):
+                key = obj['Key'][len(prefix):]
+                if key and not key.endswith('/'):
+                    objects[key] = (obj['Size'], obj['LastModified'].timestamp(), obj.get('ETag', '').strip('"'))
+
+        subprefixes = []
+        for page in paginator.paginate(Bucket=bucket, Prefix=prefix, Delimiter='/'):
+            add_contents(page)
+            subprefixes.extend(common['Prefix'] for common in page.get('CommonPrefixes', []))
+
+        def list_subprefix(subprefix):
+            pages = []
+            for page in paginator.paginate(Bucket=bucket, Prefix=subprefix):
+                if cancel_event is not None and cancel_event.is_set():
+                    break
+                pages.append(page)
+            return pages
+
+        if subprefixes:
+            workers = min(self.get_s3_transfer_settings()["list_workers"], len(subprefixes))
+            with ThreadPoolExecutor(max_workers=workers) as executor:
+                for future in as_completed([executor.submit(list_subprefix, subprefix) for subprefix in subprefixes]):
+                    for page in future.result():
+                        add_contents(page)
+        return objects
+
+    def compute_s3_sync_diff(self, source, destination, delete=False):
+        """Aplica as regras do 'aws s3 sync': copia o que falta no destino, tem tamanho diferente
+        ou é mais novo na origem; com delete remove do destino o que não existe na origem.
+
+        Datas são comparadas em segundos inteiros, a resolução do LastModified do S3.
+        """
+        transfers = []
+        for key, (size, mtime, *_) in source.items():
+            existing = destination.get(key)
+            if existing is None or existing[0] != size or int(mtime) > int(existing[1]):
+                transfers.append((key, size))
+        deletes = sorted(key for key in destination if key not in source) if delete else []
+        transfers.sort()
+        return transfers, deletes
+
+    def build_s3_sync_plan(self, direction, local_path, s3_uri, delete=False, s3_client=None, cancel_event=None,
+                           convert_parquet=False):
+        """Lista os dois lados em paralelo e monta o plano de sincronização.
+
+        direction: 'upload' (Local → S3) ou 'download' (S3 → Local).
+        convert_parquet: no upload, envia CSV/JSON convertidos para Parquet no lugar dos originais.
+        """
+        bucket, prefix = self.parse_s3_uri(s3_uri)
+        s3_client = s3_client or self.create_s3_transfer_client()
+        manifest_file = self.get_sync_manifest_filename(local_path, s3_uri)
+        manifest_s3_objects = self.load_manifest_s3_snapshot(manifest_file, direction)
+
+        with ThreadPoolExecutor(max_workers=2) as executor:
+            local_future = executor.submit(self.list_local_files, local_path)
+            if manifest_s3_objects is None:
+                s3_future = executor.submit(self.list_s3_objects, s3_client, bucket, prefix, cancel_event)
+            local_files = local_future.result()
+            s3_objects = s3_future.result() if manifest_s3_objects is None else manifest_s3_objects
+
+        staged = None
+        if direction == 'upload' and convert_parquet:
+            if pq is None:
+                print("⚠️ pyarrow não instalado: enviando CSV/JSON sem conversão para Parquet")
+            else:
+                staged = self.stage_parquet_conversions(local_path, s3_uri, local_files, cancel_event)
+                local_files = {key: meta for key, meta in local_files.items() if key not in staged["sources"]}
+                local_files.update(staged["files"])
+        self.save_manifest_listing(manifest_file, local_files, s3_objects if manifest_s3_objects is None else None)
+
+        if direction == 'upload':
+            transfers, deletes = self.compute_s3_sync_diff(local_files, s3_objects, delete)
+        else:
+            transfers, deletes = self.compute_s3_sync_diff(s3_objects, local_files, delete)
+
+        unchanged = []
+        settings = self.get_s3_transfer_settings(s3_uri)
+        if settings["compare_content"]:
+            transfers, unchanged = self.skip_unchanged_by_etag(transfers, local_path, local_files, s3_objects,
+                                                               manifest_file, settings,
+                                                               staged["paths"] if staged else None)
+
+        print(f"📋 Plano de sync ({direction}): {len(local_files)} locais, {len(s3_objects)} no S3 → "
+              f"{len(transfers)} transferências, {len(deletes)} remoções, {len(unchanged)} iguais por ETag")
+        return {
+            "direction": direction,
+            "local_path": str(local_path),
+            "s3_uri": s3_uri,
+            "bucket": bucket,
+            "prefix": prefix,
+            "delete": delete,
+            "transfers": transfers,
+            "deletes": deletes,
+            "total_bytes": sum(size for _, size in transfers),
+            "source_meta": s3_objects if direction == 'download' else local_files,
+            "manifest_file": str(manifest_file),
+            "unchanged": unchanged,
+            "staged_files": staged["paths"] if staged else {},
+            "parquet_report": staged["report"] if staged else None,
+        }
+
+    def execute_s3_sync_plan(self, plan, s3_client=None, progress_callback=None, cancel_event=None,
+                             concurrency=None):
+        """Executa o plano com transferências concorrentes (multipart via TransferConfig).
+
+        progress_callback(bytes_done, total_bytes, bytes_per_second, eta_seconds, files_done, files_total)
+        é chamado no máximo a cada 0,5s. cancel_event (threading.Event) interrompe as transferências.
+        concurrency: AdaptiveConcurrencyLimiter compartilhado (sync em lote); sem ele o plano usa o próprio.
+        """
+        settings = self.get_s3_transfer_settings(plan["s3_uri"])
+        s3_client = s3_client or self.create_s3_transfer_client(settings)
+        transfer_config = self.build_s3_transfer_config(settings)
+        bandwidth_limiter = self.get_transfer_bandwidth_limiter(plan["s3_uri"], settings)
+        concurrency = concurrency or AdaptiveConcurrencyLimiter(settings["max_parallel_files"])
+        cancel_event = cancel_event or threading.Event()
+        local_root = Path(plan["local_path"])
+        bucket, prefix = plan["bucket"], plan["prefix"]
+
+        progress_lock = threading.Lock()
+        progress = {"bytes": 0, "files": 0, "last_report": 0.0}
+        total_bytes = plan["total_bytes"]
+        total_files = len(plan["transfers"])
+        started_at = time.monotonic()
+        errors = []
+        transferred_keys = []
+        resumable_threshold = max(int(settings["resumable_threshold_mb"] * 1024 * 1024), transfer_config.multipart_threshold)
+
+        if plan["direction"] == 'upload' and plan.get("manifest_file") and any(
+                size >= resumable_threshold for _, size in plan["transfers"]):
+            self.cleanup_stale_multipart_uploads(s3_client, bucket, prefix, plan["manifest_file"])
+
+        def report(force=False):
+            now = time.monotonic()
+            with progress_lock:
+                if not force and now - progress["last_report"] < 0.5:
+                    return
+                progress["last_report"] = now
+                bytes_done, files_done = progress["bytes"], progress["files"]
+            if progress_callback:
+                elapsed = max(now - started_at, 1e-6)
+                rate = bytes_done / elapsed
+                eta = (total_bytes - bytes_done) / rate if rate > 0 else None
+                progress_callback(bytes_done, total_bytes, rate, eta, files_done, total_files)
+
+        def transfer_attempt(key, size, on_bytes):
+            staged_file = plan.get("staged_files", {}).get(key)
+            if staged_file:
+                local_file = Path(staged_file)
+            elif plan["direction"] == 'download':
+                local_file = self.resolve_local_sync_path(local_root, key)
+            else:
+                local_file = local_root / Path(*key.split('/'))
+            if plan["direction"] == 'upload' and size >= resumable_threshold and plan.get("manifest_file"):
+                self.upload_file_resumable(s3_client, plan, key, local_file, on_bytes, cancel_event)
+            elif plan["direction"] == 'upload':
+                s3_client.upload_file(str(local_file), bucket, prefix + key,
+                                      Config=transfer_config, Callback=on_bytes)
+            else:
+                local_file.parent.mkdir(parents=True, exist_ok=True)
+                s3_client.download_file(bucket, prefix + key, str(local_file),
+                                        Config=transfer_config, Callback=on_bytes)
+                # Mesmo mtime do S3 para que o próximo sync não baixe de novo
+                source_mtime = plan["source_meta"].get(key, (None, None))[1]
+                if source_mtime:
+                    os.utime(local_file, (source_mtime, source_mtime))
+
+        def transfer_one(key, size):
+            for attempt in range(TRANSFER_MAX_ATTEMPTS):
+                if cancel_event.is_set():
+                    return
+                attempt_bytes = [0]
+
+                def on_bytes(amount, throttle=True):
+                    if cancel_event.is_set():
+                        raise SyncCancelledError("Sincronização cancelada")
+                    with progress_lock:
+                        progress["bytes"] += amount
+                        attempt_bytes[0] += amount
+                    if throttle:
+                        bandwidth_limiter.consume(amount)
+                    report()
+
+                concurrency.acquire()
+                try:
+                    transfer_attempt(key, size, on_bytes)
+                    concurrency.release(success=True)
+                    with progress_lock:
+                        progress["files"] += 1
+                        transferred_keys.append((key, int(time.time())))
+                    return
+                except SyncCancelledError:
+                    concurrency.release(success=True)
+                    return
+                except Exception as e:
+                    concurrency.release(success=False)
+                    with progress_lock:
+                        progress["bytes"] -= attempt_bytes[0]
+                    if cancel_event.is_set():
+                        return
+                    if self.is_transient_transfer_error(e) and attempt < TRANSFER_MAX_ATTEMPTS - 1:
+                        concurrency.on_congestion()
+                        delay = 2 ** attempt + random.uniform(0, 1)
+                        print(f"⏳ Erro transitório em {key} (tentativa {attempt + 1}/{TRANSFER_MAX_ATTEMPTS}), "
+                              f"nova tentativa em {delay:.1f}s: {e}")
+                        time.sleep(delay)
+                        continue
+                    print(f"❌ Erro ao transferir {key}: {e}")
+                    errors.append((key, str(e)))
+                    return
+
+        with ThreadPoolExecutor(max_workers=settings["max_parallel_files"]) as executor:
+            futures = [executor.submit(transfer_one, key, size) for key, size in plan["transfers"]]
+            for future in as_completed(futures):
+                future.result()
+
+        deleted_keys = []
+        if plan["deletes"] and not cancel_event.is_set():
+            deleted_keys = self.delete_s3_sync_extras(plan, s3_client, errors)
+
+        if plan.get("manifest_file"):
+            self.record_sync_manifest_results(plan, transferred_keys, deleted_keys)
+
+        report(force=True)
+        elapsed = time.monotonic() - started_at
+        return {
+            "transferred": progress["files"],
+            "bytes": progress["bytes"],
+            "deleted": len(deleted_keys),
+            "errors": errors,
+            "cancelled": cancel_event.is_set(),
+            "elapsed": elapsed,
+        }
+
+    def is_transient_transfer_error(self, error):
+        """Erros de rede/proxy ou de sobrecarga do S3, que justificam reduzir a concorrência e tentar de novo"""
+        if isinstance(error, (BotoConnectionError, HTTPClientError)):
+            return True
+        if isinstance(error, ClientError):
+            code = error.response.get('Error', {}).get('Code', '')
+            status = error.response.get('ResponseMetadata', {}).get('HTTPStatusCode', 0)
+            return code in TRANSIENT_S3_ERROR_CODES or status >= 500
+        message = str(error).lower()
+        return any(word in message for word in TRANSIENT_TRANSFER_ERROR_WORDS)
+
+    def delete_s3_sync_extras(self, plan, s3_client, errors):
+        """Remove do destino os arquivos que não existem na origem (semântica do --delete).
+
+        Retorna as chaves relativas efetivamente removidas.
+        """
+        deleted = []
+        if plan["direction"] == 'upload':
+            prefix = plan["prefix"]
+            for start in range(0, len(plan["deletes"]), 1000):
+                batch = plan["deletes"][start:start + 1000]
+                response = s3_client.delete_objects(
+                    Bucket=plan["bucket"],
+                    Delete={'Objects': [{'Key': prefix + key} for key in batch], 'Quiet': True}
+                )
+                failed = set()
+                for error in response.get('Errors', []):
+                    failed.add(error.get('Key', '')[len(prefix):])
+                    errors.append((error.get('Key'), error.get('Message')))
+                deleted.extend(key for key in batch if key not in failed)
+        else:
+            local_root = Path(plan["local_path"])
+            for key in plan["deletes"]:
+                try:
+                    self.resolve_local_sync_path(local_root, key).unlink()
+                    deleted.append(key)
+                except (OSError, ValueError) as e:
+                    print(f"❌ Erro ao remover {key}: {e}")
+                    errors.append((key, str(e)))
+        return deleted
+
+    def resolve_local_sync_path(self, local_root, key):
+        """Caminho local de uma chave relativa, garantindo que fica dentro da pasta sincronizada.
+
+        Chaves do S3 como 'a/../../.bashrc' levantam ValueError em vez de escrever ou remover
+        arquivos fora da pasta (o 'aws s3 sync' também recusava essas chaves).
+        """
+        root = Path(local_root).resolve()
+        target = (root / Path(*key.split('/'))).resolve()
+        if target == root or not target.is_relative_to(root):
+            raise ValueError(f"chave aponta para fora da pasta local, ignorada: {key}")
+        return target
+
+    def format_transfer_size(self, num_bytes):
+        """Formata bytes para exibição (ex: '12.3 MB')"""
+        size = float(num_bytes)
+        for unit in ("B", "KB", "MB", "GB"):
+            if size < 1024:
+                return f"{size:.1f} {unit}" if unit != "B" else f"{size:.0f} B"
+            size /= 1024
+        return f"{size:.2f} TB"
+
+    def format_transfer_progress(self, bytes_done, total_bytes, rate, eta, files_done, files_total):
+        """Texto de progresso: arquivos, bytes, velocidade e tempo restante"""
+        eta_text = f"{eta:.0f}s" if eta is not None and eta < 120 else (f"{eta / 60:.0f} min" if eta is not None else "--")
+        return (f"📦 {files_done}/{files_total} arquivos • {self.format_transfer_size(bytes_done)}"
+                f" de {self.format_transfer_size(total_bytes)} • {self.format_transfer_size(rate)}/s • ETA {eta_text}")
+
+    def get_s3_selection_label(self):
+        """Identificação curta da combinação selecionada (prefixo/rt/ambiente/squad)"""
+        parts = [self.prefix_dropdown.value, self.rt_dropdown.value, self.env_dropdown.value, self.squad_dropdown.value]
+        return "/".join(part for part in parts if part)
+
+    def run_s3_sync(self, direction):
+        """Coloca a sincronização da combinação selecionada na fila de transferências"""
+        try:
+            if not self.ensure_local_path_exists():
+                raise Exception("Erro ao criar pasta local")
+            s3_path = self.get_s3_path()
+            if not s3_path:
+                raise Exception("Selecione todas as opções e faça login na AWS")
+
+            delete = direction == 'download' and bool(self.delete_checkbox.value)
+            convert_parquet = direction == 'upload' and bool(self.parquet_checkbox.value)
+            if convert_parquet and pq is None:
+                raise Exception("Conversão para Parquet requer o pacote pyarrow (pip install pyarrow)")
+            job = self.enqueue_transfer_job(direction, self.get_local_path(), s3_path,
+                                            delete=delete, label=self.get_s3_selection_label(),
+                                            convert_parquet=convert_parquet)
+            arrow = "Local → S3" if direction == 'upload' else "S3 → Local"
+            self.s3_status.value = f"📥 Job #{job['id']} na fila: {arrow} ({job['label']})"
+            self.s3_status.color = ft.Colors.BLUE
+
+        except Exception as e:
+            self.s3_status.value = f"❌ Erro: {str(e)}"
+            self.s3_status.color = ft.Colors.RED
+
+        self.render_transfer_jobs()
+        self.page.update()
+
+    # ============== PRÉVIA DE SINCRONIZAÇÃO (DRY-RUN) ==============
+
+    def preview_s3_sync(self, direction):
+        """Calcula o plano completo sem transferir nada e mostra o resumo e a lista de mudanças"""
+        try:
+            if not self.ensure_local_path_exists():
+                raise Exception("Erro ao criar pasta local")
+            s3_path = self.get_s3_path()
+            if not s3_path:
+                raise Exception("Selecione todas as opções e faça login na AWS")
+        except Exception as e:
+            self.s3_status.value = f"❌ Erro: {str(e)}"
+            self.s3_status.color = ft.Colors.RED
+            self.page.update()
+            return
+
+        delete = direction == 'download' and bool(self.delete_checkbox.value)
+        convert_parquet = direction == 'upload' and bool(self.parquet_checkbox.value) and pq is not None
+        local_path = self.get_local_path()
+        label = self.get_s3_selection_label()
+        self.s3_preview_plan = None
+        self.s3_preview_summary.value = "🔍 Listando os dois lados para montar a prévia..."
+        self.s3_preview_summary.color = ft.Colors.ORANGE
+        self.s3_preview_list.controls = []
+        self.s3_preview_execute_button.disabled = True
+        self.s3_preview_container.visible = True
+        self.page.update()
+
+        def preview_worker():
+            try:
+                plan = self.build_s3_sync_plan(direction, local_path, s3_path, delete=delete,
+                                               convert_parquet=convert_parquet)
+                plan["label"] = label
+                plan["created_at"] = datetime.now()
+                plan["convert_parquet"] = convert_parquet
+                self.s3_preview_plan = plan
+                self.s3_preview_summary.value = self.format_s3_sync_plan_summary(plan)
+                self.s3_preview_summary.color = ft.Colors.RED_300 if plan["deletes"] else ft.Colors.GREEN
+                self.s3_preview_execute_button.disabled = not (plan["transfers"] or plan["deletes"])
+                self.render_s3_preview_list()
+            except Exception as e:
+                self.s3_preview_summary.value = f"❌ Erro ao calcular prévia: {str(e)}"
+                self.s3_preview_summary.color = ft.Colors.RED
+            self.page.update()
+
+        threading.Thread(target=preview_worker, daemon=True).start()
+
+    def format_s3_sync_plan_summary(self, plan):
+        """Resumo do plano: arquivos/bytes a transferir e remoções"""
+        arrow = "Local → S3" if plan["direction"] == 'upload' else "S3 → Local"
+        verb = "uploads" if plan["direction"] == 'upload' else "downloads"
+        target = "no S3" if plan["direction"] == 'upload' else "locais"
+        summary = (f"📋 {arrow} ({plan.get('label') or plan['s3_uri']}): {len(plan['transfers'])} {verb}"
+                   f" • {self.format_transfer_size(plan['total_bytes'])}")
+        if plan.get("unchanged"):
+            summary += f" • {len(plan['unchanged'])} ignorados (mesmo conteúdo)"
+        if plan.get("parquet_report"):
+            summary += f"\n{self.format_parquet_report(plan['parquet_report'])}"
+        if plan["delete"]:
+            summary += f" • ⚠️ {len(plan['deletes'])} arquivos {target} serão removidos"
+        if not plan["transfers"] and not plan["deletes"]:
+            summary += " • ✅ Nada a sincronizar"
+        return summary
+
+    def render_s3_preview_list(self, e=None):
+        """Preenche a lista da prévia aplicando o filtro de texto e de tipo"""
+        plan = getattr(self, 's3_preview_plan', None)
+        if not plan:
+            return
+        text_filter = (self.s3_preview_filter.value or "").strip().lower()
+        kind_filter = self.s3_preview_kind.value or "all"
+        transfer_icon = "⬆️" if plan["direction"] == 'upload' else "⬇️"
+
+        entries = []
+        if kind_filter in ("all", "transfer"):
+            entries.extend((transfer_icon, key, size) for key, size in plan["transfers"])
+        if kind_filter in ("all", "delete"):
+            entries.extend(("🗑️", key, None) for key in plan["deletes"])
+        if text_filter:
+            entries = [entry for entry in entries if text_filter in entry[1].lower()]
+
+        rows = [
+            ft.Row([
+                ft.Text(icon, size=12),
+                ft.Text(key, size=12, color=ft.Colors.WHITE, expand=True, selectable=True),
+                ft.Text(self.format_transfer_size(size) if size is not None else "remover",
+                        size=12, color=ft.Colors.GREY_400 if size is not None else ft.Colors.RED_300),
+            ], spacing=8)
+            for icon, key, size in entries[:S3_PREVIEW_MAX_ROWS]
+        ]
+        if len(entries) > S3_PREVIEW_MAX_ROWS:
+            rows.append(ft.Text(f"... mostrando {S3_PREVIEW_MAX_ROWS} de {len(entries)} itens (use o filtro)",
+                                size=12, color=ft.Colors.GREY_500))
+        self.s3_preview_list.controls = rows
+        if e is not None:
+            self.page.update()
+
+    def execute_s3_preview_plan(self, e):
+        """Envia para a fila o plano da prévia, sem listar de novo (a menos que ela esteja desatualizada)"""
+        plan = getattr(self, 's3_preview_plan', None)
+        if not plan:
+            return
+        job = self.enqueue_transfer_job(plan["direction"], plan["local_path"], plan["s3_uri"],
+                                        delete=plan["delete"], label=plan.get("label", ""), plan=plan,
+                                        convert_parquet=plan.get("convert_parquet", False))
+        self.s3_status.value = f"📥 Job #{job['id']} na fila com o plano da prévia ({job['label']})"
+        if self.is_s3_preview_plan_stale(plan):
+            self.s3_status.value += (" • ⚠️ prévia desatualizada: o plano será recalculado e só as remoções "
+                                     "mostradas na prévia serão feitas")
+        self.s3_status.color = ft.Colors.BLUE
+        self.discard_s3_preview()
+
+    def discard_s3_preview(self, e=None):
+        """Fecha a prévia e descarta o plano guardado"""
+        self.s3_preview_plan = None
+        self.s3_preview_list.controls = []
+        self.s3_preview_container.visible = False
+        self.render_transfer_jobs()
+        self.page.update()
+
+    # ============== MANIFESTO DE SINCRONIZAÇÃO ==============
+
+    def get_sync_manifest_filename(self, local_path, s3_uri):
+        """Manifesto SQLite do par (pasta local, prefixo S3)"""
+        pair_hash = hashlib.sha256(f"{Path(local_path)}|{s3_uri}".encode('utf-8')).hexdigest()[:16]
+        return self.cache_dir / "store" / "sync_manifest" / f"{pair_hash}.sqlite"
+
+    def _connect_sync_manifest(self, manifest_file):
+        """Abre o manifesto criando o esquema se necessário"""
+        manifest_file = Path(manifest_file)
+        manifest_file.parent.mkdir(parents=True, exist_ok=True)
+        conn = sqlite3.connect(str(manifest_file), timeout=30)
+        conn.execute("PRAGMA journal_mode=WAL")
+        conn.execute("""
+            CREATE TABLE IF NOT EXISTS files (
+                rel_path TEXT PRIMARY KEY,
+                local_size INTEGER,
+                local_mtime REAL,
+                s3_size INTEGER,
+                s3_mtime REAL,
+                etag TEXT,
+                synced_at REAL
+            )
+        """)
+        conn.execute("CREATE TABLE IF NOT EXISTS meta (key TEXT PRIMARY KEY, value TEXT)")
+        conn.execute("""
+            CREATE TABLE IF NOT EXISTS hashes (
+                rel_path TEXT PRIMARY KEY,
+                size INTEGER,
+                mtime REAL,
+                threshold INTEGER,
+                part_size INTEGER,
+                etag TEXT
+            )
+        """)
+        conn.execute("""
+            CREATE TABLE IF NOT EXISTS multipart_uploads (
+                rel_path TEXT PRIMARY KEY,
+                upload_id TEXT,
+                size INTEGER,
+                mtime REAL,
+                part_size INTEGER,
+                created_at REAL
+            )
+        """)
+        return conn
+
+    def load_manifest_s3_snapshot(self, manifest_file, direction):
+        """Retorna o estado do S3 registrado no manifesto se puder substituir a listagem, senão None.
+
+        Só vale para Local → S3 e enquanto a última listagem completa tiver menos de
+        s3.transfer.manifest_trust_minutes (0 desativa). S3 → Local sempre lista, para
+        enxergar o que outras pessoas publicaram.
+        """
+        trust_minutes = self.config.get("s3", {}).get("transfer", {}).get("manifest_trust_minutes", 10)
+        if direction != 'upload' or not trust_minutes or not Path(manifest_file).exists():
+            return None
+        try:
+            conn = self._connect_sync_manifest(manifest_file)
+            try:
+                row = conn.execute("SELECT value FROM meta WHERE key = 's3_listed_at'").fetchone()
+                if not row or time.time() - float(row[0]) > trust_minutes * 60:
+                    return None
+                rows = conn.execute(
+                    "SELECT rel_path, s3_size, s3_mtime, etag FROM files WHERE s3_size IS NOT NULL"
+                ).fetchall()
+            finally:
+                conn.close()
+            print(f"📒 Manifesto: usando estado do S3 registrado ({len(rows)} objetos), sem listar")
+            return {rel_path: (size, mtime, etag or '') for rel_path, size, mtime, etag in rows}
+        except (sqlite3.Error, ValueError) as e:
+            print(f"⚠️ Erro ao ler manifesto de sync: {e}")
+            return None
+
+    def save_manifest_listing(self, manifest_file, local_files, s3_objects):
+        """Grava no manifesto o retrato atual da pasta local e, se listado, do prefixo S3"""
+        try:
+            conn = self._connect_sync_manifest(manifest_file)
+            try:
+                with conn:
+                    conn.execute("UPDATE files SET local_size = NULL, local_mtime = NULL")
+                    conn.executemany(
+                        """INSERT INTO files (rel_path, local_size, local_mtime) VALUES (?, ?, ?)
+                           ON CONFLICT(rel_path) DO UPDATE SET
+                               local_size = excluded.local_size, local_mtime = excluded.local_mtime""",
+                        ((key, size, mtime) for key, (size, mtime) in local_files.items())
+                    )
+                    if s3_objects is not None:
+                        conn.execute("UPDATE files SET s3_size = NULL, s3_mtime = NULL, etag = NULL")
+                        conn.executemany(
+                            """INSERT INTO files (rel_path, s3_size, s3_mtime, etag) VALUES (?, ?, ?, ?)
+                               ON CONFLICT(rel_path) DO UPDATE SET
+                                   s3_size = excluded.s3_size, s3_mtime = excluded.s3_mtime, etag = excluded.etag""",
+                            ((key, size, mtime, etag) for key, (size, mtime, etag) in s3_objects.items())
+                        )
+                        conn.execute("INSERT OR REPLACE INTO meta (key, value) VALUES ('s3_listed_at', ?)",
+                                     (str(time.time()),))
+                    conn.execute("DELETE FROM files WHERE local_size IS NULL AND s3_size IS NULL")
+                    conn.execute("DELETE FROM hashes WHERE rel_path NOT IN "
+                                 "(SELECT rel_path FROM files WHERE local_size IS NOT NULL)")
+            finally:
+                conn.close()
+        except sqlite3.Error as e:
+            print(f"⚠️ Erro ao gravar manifesto de sync: {e}")
+
+    def record_sync_manifest_results(self, plan, transferred_keys, deleted_keys):
+        """Atualiza no manifesto os dois lados dos arquivos transferidos e removidos"""
+        now = time.time()
+        source_meta = plan["source_meta"]
+        if plan["direction"] == 'upload':
+            rows = [(key, source_meta[key][0], source_meta[key][1], source_meta[key][0], uploaded_at, None, now)
+                    for key, uploaded_at in transferred_keys]
+            clear_sql = "UPDATE files SET s3_size = NULL, s3_mtime = NULL, etag = NULL WHERE rel_path = ?"
+        else:
+            rows = [(key, source_meta[key][0], int(source_meta[key][1]), source_meta[key][0], source_meta[key][1],
+                     source_meta[key][2], now)
+                    for key, _ in transferred_keys]
+            clear_sql = "UPDATE files SET local_size = NULL, local_mtime = NULL WHERE rel_path = ?"
+        try:
+            conn = self._connect_sync_manifest(plan["manifest_file"])
+            try:
+                with conn:
+                    conn.executemany(
+                        """INSERT INTO files (rel_path, local_size, local_mtime, s3_size, s3_mtime, etag, synced_at)
+                           VALUES (?, ?, ?, ?, ?, ?, ?)
+                           ON CONFLICT(rel_path) DO UPDATE SET
+                               local_size = excluded.local_size, local_mtime = excluded.local_mtime,
+                               s3_size = excluded.s3_size, s3_mtime = excluded.s3_mtime,
+                               etag = excluded.etag, synced_at = excluded.synced_at""",
+                        rows
+                    )
+                    conn.executemany(clear_sql, ((key,) for key in deleted_keys))
+                    conn.execute("DELETE FROM files WHERE local_size IS NULL AND s3_size IS NULL")
+            finally:
+                conn.close()
+        except sqlite3.Error as e:
+            print(f"⚠️ Erro ao atualizar manifesto de sync: {e}")
+
+    # ============== COMPARAÇÃO POR CONTEÚDO (ETAG) ==============
+
+    def skip_unchanged_by_etag(self, transfers, local_path, local_files, s3_objects, manifest_file, settings,
+                               staged_files=None):
+        """Remove do plano os arquivos de mesmo tamanho cujo ETag local bate com o do S3.
+
+        Só são hasheados os candidatos que seriam copiados apenas pela data (ex.: após git checkout
+        ou unzip). Retorna (transferências restantes, chaves iguais por conteúdo).
+        """
+        candidates = [
+            key for key, size in transfers
+            if key in local_files and key in s3_objects
+            and local_files[key][0] == s3_objects[key][0] and s3_objects[key][2]
+        ]
+        if not candidates:
+            return transfers, []
+
+        threshold = int(settings["multipart_threshold_mb"] * 1024 * 1024)
+        part_size = int(settings["multipart_chunksize_mb"] * 1024 * 1024)
+        local_etags = self.load_cached_local_etags(manifest_file, local_files, candidates, threshold, part_size)
+
+        to_hash = [key for key in candidates if key not in local_etags]
+        if to_hash:
+            print(f"🔐 Calculando ETag de {len(to_hash)} arquivos ({len(local_etags)} do cache)...")
+            computed = self.compute_local_etags(local_path, to_hash, threshold, part_size, settings["hash_workers"],
+                                                staged_files)
+            local_etags.update(computed)
+            self.save_cached_local_etags(manifest_file, local_files, computed, threshold, part_size)
+
+        unchanged = {key for key in candidates if local_etags.get(key) == s3_objects[key][2]}
+        return [item for item in transfers if item[0] not in unchanged], sorted(unchanged)
+
+    def compute_local_etags(self, local_path, keys, threshold, part_size, workers=0, staged_files=None):
+        """Calcula os ETags em paralelo num pool de processos (leitura em blocos, sem carregar o arquivo)"""
+        root = Path(local_path)
+        staged_files = staged_files or {}
+        paths = {key: staged_files.get(key) or str(root / Path(*key.split('/'))) for key in keys}
+        etags = {}
+
+        def collect(executor):
+            futures = {executor.submit(compute_s3_etag, path, threshold, part_size): key for key, path in paths.items()}
+            for future in as_completed(futures):
+                try:
+                    etags[futures[future]] = future.result()
+                except OSError as e:
+                    print(f"⚠️ Erro ao calcular ETag de {futures[future]}: {e}")
+
+        if len(paths) == 1:
+            with ThreadPoolExecutor(max_workers=1) as executor:
+                collect(executor)
+            return etags
+
+        max_workers = min(workers or os.cpu_count() or 1, len(paths))
+        try:
+            with ProcessPoolExecutor(max_workers=max_workers) as executor:
+                collect(executor)
+        except Exception as e:
+            # Pool de processos indisponível (ex.: ambiente sem fork/spawn): usa threads
+            print(f"⚠️ Pool de processos indisponível ({e}), calculando ETags com threads")
+            with ThreadPoolExecutor(max_workers=max_workers) as executor:
+                collect(executor)
+        return etags
+
+    def load_cached_local_etags(self, manifest_file, local_files, keys, threshold, part_size):
+        """ETags já calculados no manifesto para o mesmo (caminho, tamanho, mtime) e TransferConfig"""
+        cached = {}
+        try:
+            conn = self._connect_sync_manifest(manifest_file)
+            try:
+                wanted = set(keys)
+                for rel_path, size, mtime, row_threshold, row_part_size, etag in conn.execute(
+                        "SELECT rel_path, size, mtime, threshold, part_size, etag FROM hashes"):
+                    if (rel_path in wanted and (size, mtime) == local_files[rel_path]
+                            and (row_threshold, row_part_size) == (threshold, part_size)):
+                        cached[rel_path] = etag
+            finally:
+                conn.close()
+        except sqlite3.Error as e:
+            print(f"⚠️ Erro ao ler cache de hashes: {e}")
+        return cached
+
+    def save_cached_local_etags(self, manifest_file, local_files, etags, threshold, part_size):
+        """Guarda no manifesto os ETags calculados, chaveados por (caminho, tamanho, mtime)"""
+        try:
+            conn = self._connect_sync_manifest(manifest_file)
+            try:
+                with conn:
+                    conn.executemany(
+                        "INSERT OR REPLACE INTO hashes (rel_path, size, mtime, threshold, part_size, etag) VALUES (?, ?, ?, ?, ?, ?)",
+                        ((key, local_files[key][0], local_files[key][1], threshold, part_size, etag)
+                         for key, etag in etags.items())
+                    )
+            finally:
+                conn.close()
+        except sqlite3.Error as e:
+            print(f"⚠️ Erro ao gravar cache de hashes: {e}")
+
+    # ============== AUTO-SYNC (OBSERVAR PASTA) ==============
+
+    def get_s3_watch_settings(self):
+        """Configurações do auto-sync (config.json -> s3.watch)"""
+        settings = self.config.get("s3", {}).get("watch", {})
+        return {
+            "poll_seconds": settings.get("poll_seconds", 2),
+            "debounce_seconds": settings.get("debounce_seconds", 3),
+        }
+
+    def on_s3_watch_toggle(self, e):
+        """Liga/desliga a observação da pasta local selecionada"""
+        if self.s3_watch_checkbox.value:
+            if not self.start_s3_watch():
+                self.s3_watch_checkbox.value = False
+        else:
+            self.stop_s3_watch()
+        self.page.update()
+
+    def start_s3_watch(self):
+        """Inicia o polling da pasta local da combinação selecionada"""
+        local_path = self.get_local_path()
+        s3_path = self.get_s3_path()
+        if not local_path or not s3_path:
+            self.s3_watch_status.value = "❌ Selecione todas as opções e faça login na AWS para observar a pasta"
+            self.s3_watch_status.color = ft.Colors.RED
+            return False
+
+        convert_parquet = bool(self.parquet_checkbox.value)
+        if convert_parquet and pq is None:
+            self.s3_watch_status.value = "❌ Conversão para Parquet requer o pacote pyarrow (pip install pyarrow)"
+            self.s3_watch_status.color = ft.Colors.RED
+            return False
+
+        self.stop_s3_watch()
+        local_path.mkdir(parents=True, exist_ok=True)
+        self.s3_watch_stop_event = threading.Event()
+        label = self.get_s3_selection_label()
+        threading.Thread(
+            target=self._s3_watch_loop,
+            args=(local_path, s3_path, label, self.s3_watch_stop_event, convert_parquet),
+            daemon=True
+        ).start()
+        self.s3_watch_status.value = (f"👀 Observando {label}: alterações vão para o S3 automaticamente"
+                                      + (" (CSV/JSON como Parquet)" if convert_parquet else ""))
+        self.s3_watch_status.color = ft.Colors.BLUE
+        print(f"👀 Auto-sync iniciado: {local_path} → {s3_path}")
+        return True
+
+    def stop_s3_watch(self):
+        """Interrompe o polling (jobs já enfileirados continuam)"""
+        stop_event = getattr(self, 's3_watch_stop_event', None)
+        if stop_event and not stop_event.is_set():
+            stop_event.set()
+            self.s3_watch_status.value = "⏸️ Auto-sync desligado"
+            self.s3_watch_status.color = ft.Colors.GREY_400
+            print("⏸️ Auto-sync interrompido")
+
+    def _s3_watch_loop(self, local_path, s3_uri, label, stop_event, convert_parquet=False):
+        """Compara o índice de mtime a cada poll e envia lotes após debounce_seconds sem novas alterações.
+
+        Só um lote por vez fica na fila; o que mudar enquanto ele roda entra no lote seguinte.
+        Com convert_parquet o lote passa pela mesma área de staging do sync completo.
+        """
+        settings = self.get_s3_watch_settings()
+        index = self.list_local_files(local_path)
+        pending = set()
+        last_change = 0.0
+        batch_job = None
+
+        while not stop_event.wait(settings["poll_seconds"]):
+            try:
+                current = self.list_local_files(local_path)
+            except OSError as e:
+                print(f"⚠️ Auto-sync: erro ao ler {local_path}: {e}")
+                continue
+
+            changed = {key for key, meta in current.items() if index.get(key) != meta}
+            index = current
+            if changed:
+                pending |= changed
+                last_change = time.monotonic()
+
+            batch_running = batch_job is not None and batch_job["status"] in TRANSFER_JOB_ACTIVE_STATUSES
+            if not pending or batch_running or time.monotonic() - last_change < settings["debounce_seconds"]:
+                continue
+
+            keys = sorted(key for key in pending if key in current)
+            pending.clear()
+            if not keys:
+                continue
+
+            try:
+                plan = self.build_incremental_upload_plan(local_path, s3_uri, current, keys,
+                                                          convert_parquet=convert_parquet, cancel_event=stop_event)
+            except Exception as e:
+                print(f"⚠️ Auto-sync: erro ao montar o lote: {e}")
+                pending.update(keys)
+                continue
+            plan["label"] = label
+            batch_job = self.enqueue_transfer_job('upload', local_path, s3_uri, label=f"👀 {label}", plan=plan,
+                                                  convert_parquet=convert_parquet)
+            self.s3_watch_status.value = (f"👀 {label}: {len(keys)} arquivos alterados enviados às "
+                                          f"{datetime.now().strftime('%H:%M:%S')}")
+            self.refresh_transfer_jobs_ui(force=True)
+
+    def build_incremental_upload_plan(self, local_path, s3_uri, local_files, keys, convert_parquet=False,
+                                      cancel_event=None):
+        """Plano Local → S3 só com as chaves informadas, sem listar o S3.
+
+        convert_parquet: CSV/JSON alterados vão como os Parquet do staging (junto com os da mesma pasta
+        reconvertidos por alargamento de esquema), como no sync completo.
+        """
+        bucket, prefix = self.parse_s3_uri(s3_uri)
+        staged = None
+        if convert_parquet:
+            staged = self.stage_parquet_conversions(local_path, s3_uri, local_files, cancel_event)
+            changed = set(keys)
+            keys = sorted({key for key in keys if key not in staged["sources"]}
+                          | {output for source in changed | staged["converted"] if source in staged["outputs"]
+                             for output in staged["outputs"][source]})
+            local_files = {key: meta for key, meta in local_files.items() if key not in staged["sources"]}
+            local_files.update(staged["files"])
+        transfers = [(key, local_files[key][0]) for key in keys]
+        return {
+            "direction": 'upload',
+            "local_path": str(local_path),
+            "s3_uri": s3_uri,
+            "bucket": bucket,
+            "prefix": prefix,
+            "delete": False,
+            "transfers": transfers,
+            "deletes": [],
+            "total_bytes": sum(size for _, size in transfers),
+            "source_meta": local_files,
+            "manifest_file": str(self.get_sync_manifest_filename(local_path, s3_uri)),
+            "unchanged": [],
+            "staged_files": staged["paths"] if staged else {},
+            "parquet_report": staged["report"] if staged else None,
+        }
+
+    # ============== UPLOAD MULTIPART RETOMÁVEL ==============
+
+    def upload_file_resumable(self, s3_client, plan, key, local_file, on_bytes, cancel_event):
+        """Upload multipart com diário local (upload id, tamanho e mtime) para retomar após queda.
+
+        Partes já confirmadas pelo S3 (list_parts, com os ETags oficiais) não são reenviadas. Se o arquivo mudou desde o
+        upload anterior, o upload antigo é abortado e recomeça do zero.
+        """
+        settings = self.get_s3_transfer_settings(plan["s3_uri"])
+        bucket, s3_key = plan["bucket"], plan["prefix"] + key
+        manifest_file = plan["manifest_file"]
+        stat = os.stat(local_file)
+        size, mtime = stat.st_size, stat.st_mtime
+        part_size = s3_multipart_part_size(size, int(settings["multipart_chunksize_mb"] * 1024 * 1024))
+        part_count = -(-size // part_size)
+
+        upload_id, completed = self._resume_multipart_upload(s3_client, bucket, s3_key, manifest_file, key,
+                                                             size, mtime, part_size)
+        if upload_id is None:
+            upload_id = s3_client.create_multipart_upload(Bucket=bucket, Key=s3_key)['UploadId']
+            self._journal_multipart_start(manifest_file, key, upload_id, size, mtime, part_size)
+        else:
+            resumed_bytes = sum(min(part_size, size - (number - 1) * part_size) for number in completed)
+            print(f"⏯️ Retomando {key}: {len(completed)}/{part_count} partes já enviadas")
+            on_bytes(resumed_bytes, throttle=False)
+
+        def upload_part(part_number):
+            if cancel_event.is_set():
+                raise SyncCancelledError("Sincronização cancelada")
+            with open(local_file, 'rb') as f:
+                f.seek((part_number - 1) * part_size)
+                data = f.read(part_size)
+            response = s3_client.upload_part(Bucket=bucket, Key=s3_key, UploadId=upload_id,
+                                             PartNumber=part_number, Body=data)
+            on_bytes(len(data))
+            return part_number, response['ETag']
+
+        missing = [number for number in range(1, part_count + 1) if number not in completed]
+        with ThreadPoolExecutor(max_workers=settings["max_concurrency"]) as executor:
+            for future in as_completed([executor.submit(upload_part, number) for number in missing]):
+                part_number, etag = future.result()
+                completed[part_number] = etag
+
+        s3_client.complete_multipart_upload(
+            Bucket=bucket, Key=s3_key, UploadId=upload_id,
+            MultipartUpload={'Parts': [{'PartNumber': number, 'ETag': completed[number]} for number in sorted(completed)]}
+        )
+        self._journal_multipart_finish(manifest_file, key)
+
+    def _resume_multipart_upload(self, s3_client, bucket, s3_key, manifest_file, key, size, mtime, part_size):
+        """Retorna (upload_id, {parte: etag}) de um upload anterior ainda válido, ou (None, {})"""
+        try:
+            conn = self._connect_sync_manifest(manifest_file)
+            try:
+                row = conn.execute("SELECT upload_id, size, mtime, part_size FROM multipart_uploads WHERE rel_path = ?",
+                                   (key,)).fetchone()
+            finally:
+                conn.close()
+        except sqlite3.Error as e:
+            print(f"⚠️ Erro ao ler diário de multipart: {e}")
+            return None, {}
+        if not row:
+            return None, {}
+
+        upload_id = row[0]
+        if (row[1], row[2], row[3]) != (size, mtime, part_size):
+            print(f"🔁 {key} mudou desde o upload interrompido, recomeçando")
+            self._abort_multipart_upload(s3_client, bucket, s3_key, upload_id)
+            self._journal_multipart_finish(manifest_file, key)
+            return None, {}
+
+        completed = {}
+        try:
+            paginator = s3_client.get_paginator('list_parts')
+            for page in paginator.paginate(Bucket=bucket, Key=s3_key, UploadId=upload_id):
+                for part in page.get('Parts', []):
+                    expected = min(part_size, size - (part['PartNumber'] - 1) * part_size)
+                    if part['Size'] == expected:
+                        completed[part['PartNumber']] = part['ETag']
+        except ClientError as e:
+            if e.response.get('Error', {}).get('Code') == 'NoSuchUpload':
+                self._journal_multipart_finish(manifest_file, key)
+                return None, {}
+            raise
+        return upload_id, completed
+
+    def _abort_multipart_upload(self, s3_client, bucket, s3_key, upload_id):
+        try:
+            s3_client.abort_multipart_upload(Bucket=bucket, Key=s3_key, UploadId=upload_id)
+        except ClientError as e:
+            if e.response.get('Error', {}).get('Code') != 'NoSuchUpload':
+                print(f"⚠️ Erro ao abortar upload {s3_key}: {e}")
+
+    def _journal_multipart_start(self, manifest_file, key, upload_id, size, mtime, part_size):
+        conn = self._connect_sync_manifest(manifest_file)
+        try:
+            with conn:
+                conn.execute(
+                    "INSERT OR REPLACE INTO multipart_uploads (rel_path, upload_id, size, mtime, part_size, created_at) "
+                    "VALUES (?, ?, ?, ?, ?, ?)",
+                    (key, upload_id, size, mtime, part_size, time.time())
+                )
+        finally:
+            conn.close()
+
+    def _journal_multipart_finish(self, manifest_file, key):
+        conn = self._connect_sync_manifest(manifest_file)
+        try:
+            with conn:
+                conn.execute("DELETE FROM multipart_uploads WHERE rel_path = ?", (key,))
+        finally:
+            conn.close()
+
+    def cleanup_stale_multipart_uploads(self, s3_client, bucket, prefix, manifest_file):
+        """Aborta uploads multipart incompletos do prefixo mais velhos que s3.transfer.multipart_stale_hours
+        e remove do diário entradas que o S3 já não conhece."""
+        stale_hours = self.config.get("s3", {}).get("transfer", {}).get("multipart_stale_hours", 72)
+        cutoff = datetime.now(timezone.utc) - timedelta(hours=stale_hours)
+        active_ids = set()
+        aborted = 0
+        try:
+            paginator = s3_client.get_paginator('list_multipart_uploads')
+            for page in paginator.paginate(Bucket=bucket, Prefix=prefix):
+                for upload in page.get('Uploads', []):
+                    if upload['Initiated'] < cutoff:
+                        self._abort_multipart_upload(s3_client, bucket, upload['Key'], upload['UploadId'])
+                        aborted += 1
+                    else:
+                        active_ids.add(upload['UploadId'])
+
+            conn = self._connect_sync_manifest(manifest_file)
+            try:
+                with conn:
+                    rows = conn.execute("SELECT rel_path, upload_id FROM multipart_uploads").fetchall()
+                    for rel_path, upload_id in rows:
+                        if upload_id not in active_ids:
+                            conn.execute("DELETE FROM multipart_uploads WHERE rel_path = ?", (rel_path,))
+            finally:
+                conn.close()
+        except (ClientError, sqlite3.Error) as e:
+            print(f"⚠️ Erro ao limpar uploads multipart incompletos: {e}")
+        if aborted:
+            print(f"🧹 {aborted} uploads multipart incompletos abortados em s3://{bucket}/{prefix}")
+
+    # ============== AJUSTES DE TRANSFERÊNCIA POR AMBIENTE ==============
+
+    def load_transfer_settings_fields(self):
+        """Preenche os campos de ajuste com os valores efetivos do ambiente selecionado"""
+        env = self.env_dropdown.value
+        settings = self.get_s3_transfer_settings()
+        self.transfer_parallel_files_field.value = str(settings["max_parallel_files"])
+        self.transfer_concurrency_field.value = str(settings["max_concurrency"])
+        self.transfer_bandwidth_field.value = f"{settings['max_bandwidth_mbps']:g}"
+        self.transfer_chunksize_field.value = f"{settings['multipart_chunksize_mb']:g}"
+        self.transfer_settings_title.value = f"⚙️ Transferência ({env or 'padrão'}):"
+
+    def save_transfer_settings(self, e):
+        """Valida e salva em config.json os ajustes de transferência do ambiente selecionado"""
+        env = self.env_dropdown.value
+        try:
+            if not env:
+                raise ValueError("Selecione um ambiente")
+            env_settings = {
+                "max_parallel_files": int(self.transfer_parallel_files_field.value),
+                "max_concurrency": int(self.transfer_concurrency_field.value),
+                "max_bandwidth_mbps": float(self.transfer_bandwidth_field.value or 0),
+                "multipart_chunksize_mb": float(self.transfer_chunksize_field.value),
+            }
+            if env_settings["max_parallel_files"] < 1 or env_settings["max_concurrency"] < 1:
+                raise ValueError("Arquivos e requisições simultâneas devem ser pelo menos 1")
+            if env_settings["max_bandwidth_mbps"] < 0:
+                raise ValueError("Banda máxima não pode ser negativa (0 = ilimitada)")
+            if env_settings["multipart_chunksize_mb"] < 5:
+                raise ValueError("O S3 exige partes de pelo menos 5 MB")
+
+            transfer = self.config.setdefault("s3", {}).setdefault("transfer", {})
+            transfer.setdefault("per_env", {})[env] = env_settings
+            self.save_config()
+
+            bandwidth = f"{env_settings['max_bandwidth_mbps']:g} MB/s" if env_settings["max_bandwidth_mbps"] else "ilimitada"
+            self.s3_status.value = (f"💾 Ajustes salvos para {env}: {env_settings['max_parallel_files']} arquivos × "
+                                    f"{env_settings['max_concurrency']} requisições, banda {bandwidth}, "
+                                    f"partes de {env_settings['multipart_chunksize_mb']:g} MB")
+            self.s3_status.color = ft.Colors.GREEN
+        except ValueError as ex:
+            self.s3_status.value = f"❌ Ajustes inválidos: {ex}"
+            self.s3_status.color = ft.Colors.RED
+        self.page.update()
+
+    # ============== CONVERSÃO CSV/JSON → PARQUET ==============
+
+    def get_parquet_settings(self):
+        """Configurações da conversão (config.json -> s3.parquet)"""
+        settings = self.config.get("s3", {}).get("parquet", {})
+        return {
+            "compression": settings.get("compression", "snappy"),
+            "chunk_rows": settings.get("chunk_rows", 100000),
+            "partition_columns": settings.get("partition_columns", []),
+        }
+
+    def get_parquet_staging_dir(self, local_path, s3_uri):
+        """Pasta onde ficam os Parquet gerados para o par (pasta local, prefixo S3)"""
+        return self.cache_dir / "parquet_staging" / self.get_sync_manifest_filename(local_path, s3_uri).stem
+
+    def stage_parquet_conversions(self, local_path, s3_uri, local_files, cancel_event=None):
+        """Converte os CSV/JSON da pasta para Parquet na área de staging (só os que mudaram).
+
+        Retorna {"sources": chaves convertidas (não são enviadas), "files": {chave parquet: (tamanho, mtime)},
+        "paths": {chave parquet: caminho}, "outputs": {fonte: chaves parquet}, "converted": fontes
+        convertidas nesta chamada, "report": resumo de tamanhos}. Arquivos que falharem na
+        conversão continuam sendo enviados no formato original. Chamadas para o mesmo par (auto-sync e
+        sync completo) são serializadas, pois compartilham o índice e os arquivos do staging.
+        """
+        staging_dir = self.get_parquet_staging_dir(local_path, s3_uri)
+        with self.parquet_staging_locks_lock:
+            staging_lock = self.parquet_staging_locks.setdefault(str(staging_dir), threading.Lock())
+        with staging_lock:
+            return self._stage_parquet_conversions(local_path, local_files, staging_dir, cancel_event)
+
+    def _stage_parquet_conversions(self, local_path, local_files, staging_dir, cancel_event):
+        settings = self.get_parquet_settings()
+        index_file = staging_dir / "index.json"
+        try:
+            with open(index_file, 'r', encoding='utf-8') as f:
+                index = json.load(f)
+        except (OSError, ValueError):
+            index = {}
+        if index.get("version") != PARQUET_STAGING_INDEX_VERSION:
+            # Índice de formato anterior: descarta as saídas e reconverte tudo
+            for entry in index.get("sources", {}).values():
+                self._remove_parquet_outputs(staging_dir, entry["outputs"])
+            index = {"version": PARQUET_STAGING_INDEX_VERSION, "sources": {}, "schemas": {}}
+
+        report = {"converted": 0, "reused": 0, "source_bytes": 0, "parquet_bytes": 0, "errors": []}
+        candidates = []
+        for key in sorted(local_files):
+            if not key.lower().endswith(PARQUET_SOURCE_EXTENSIONS):
+                continue
+            # A saída <arquivo>.parquet (ou <partição>/<arquivo>.parquet) não pode substituir um arquivo da pasta
+            folder, _, file_name = key.rpartition('/')
+            clash = f"{key}.parquet" if f"{key}.parquet" in local_files else None
+            if not clash and settings["partition_columns"]:
+                clash = next((other for other in local_files
+                              if other.startswith(f"{folder}/" if folder else "")
+                              and other.rpartition('/')[2] == f"{file_name}.parquet"), None)
+            if clash:
+                print(f"⚠️ Parquet: {key} será enviado sem conversão ({clash} já existe na pasta)")
+                report["errors"].append((key, f"{clash} já existe na pasta"))
+                continue
+            candidates.append(key)
+
+        # Remove saídas de fontes que sumiram (ou que deixaram de ser convertidas)
+        for key in list(index["sources"]):
+            if key not in candidates:
+                self._remove_parquet_outputs(staging_dir, index["sources"].pop(key)["outputs"])
+
+        folders = {}
+        for key in candidates:
+            folders.setdefault(key.rpartition('/')[0], []).append(key)
+        converted = set()
+        for folder, keys in folders.items():
+            if cancel_event is not None and cancel_event.is_set():
+                break
+            converted |= self._stage_parquet_folder(local_path, folder, keys, local_files, index, staging_dir,
+                                                    settings, report, cancel_event)
+
+        sources = set()
+        files, paths, outputs = {}, {}, {}
+        for key in candidates:
+            entry = index["sources"].get(key)
+            if not entry:
+                continue
+            sources.add(key)
+            outputs[key] = entry["outputs"]
+            report["source_bytes"] += local_files[key][0]
+            for output in entry["outputs"]:
+                output_path = staging_dir / output
+                stat = output_path.stat()
+                files[output] = (stat.st_size, stat.st_mtime)
+                paths[output] = str(output_path)
+        report["converted"] = len(converted & sources)
+        report["reused"] = len(sources) - report["converted"]
+        report["parquet_bytes"] = sum(size for size, _ in files.values())
+
+        self._atomic_write_bytes(index_file, json.dumps(index, ensure_ascii=False).encode('utf-8'))
+        if sources or report["errors"]:
+            print(f"🗜️ Parquet: {report['converted']} convertidos, {report['reused']} reaproveitados, "
+                  f"{len(report['errors'])} com erro")
+        return {"sources": sources, "files": files, "paths": paths, "outputs": outputs,
+                "converted": converted & sources, "report": report}
+
+    def _stage_parquet_folder(self, local_path, folder, keys, local_files, index, staging_dir, settings, report,
+                              cancel_event=None):
+        """Converte os CSV/JSON de uma pasta com um esquema comum e retorna as chaves convertidas.
+
+        Arquivos inalterados são reaproveitados. Se um arquivo exigir alargar o esquema (ex.: inteiro
+        que recebeu decimal) ou uma fonte da pasta sumir, a pasta inteira é reconvertida com o esquema
+        novo, para que todos os Parquet da pasta tenham os mesmos tipos.
+        """
+        stored = index["schemas"].get(folder)
+        schema_spec = stored["columns"] if stored else None
+        if stored and set(stored["sources"]) - set(keys):
+            schema_spec = None
+
+        def is_reusable(key):
+            entry = index["sources"].get(key)
+            return (entry is not None and (entry["size"], entry["mtime"]) == tuple(local_files[key])
+                    and all((staging_dir / output).exists() for output in entry["outputs"]))
+
+        pending = [key for key in keys if schema_spec is None or not is_reusable(key)]
+        converted = set()
+        while pending:
+            restart = False
+            for key in pending:
+                if cancel_event is not None and cancel_event.is_set():
+                    return converted
+                entry = index["sources"].pop(key, None)
+                if entry:
+                    self._remove_parquet_outputs(staging_dir, entry["outputs"])
+                try:
+                    outputs, new_spec = self.convert_file_to_parquet(
+                        Path(local_path) / Path(*key.split('/')), key, schema_spec, staging_dir, settings
+                    )
+                except Exception as e:
+                    print(f"⚠️ Parquet: {key} será enviado sem conversão ({e})")
+                    report["errors"].append((key, str(e)))
+                    converted.discard(key)
+                    continue
+                size, mtime = local_files[key]
+                index["sources"][key] = {"size": size, "mtime": mtime, "outputs": outputs}
+                converted.add(key)
+                others_encoded = any(other != key and other in index["sources"] for other in keys)
+                if schema_spec is not None and new_spec != schema_spec and others_encoded:
+                    print(f"🗜️ Parquet: esquema de '{folder or '/'}' alargado por {key}, reconvertendo a pasta")
+                    schema_spec = new_spec
+                    pending = [other for other in keys if other != key]
+                    report["errors"] = [error for error in report["errors"] if error[0] not in pending]
+                    restart = True
+                    break
+                schema_spec = new_spec
+            if not restart:
+                break
+
+        converted_sources = {key: [local_files[key][0], local_files[key][1]] for key in keys if key in index["sources"]}
+        if schema_spec and converted_sources:
+            index["schemas"][folder] = {"columns": schema_spec, "sources": converted_sources}
+        else:
+            index["schemas"].pop(folder, None)
+        return converted
+
+    def _remove_parquet_outputs(self, staging_dir, outputs):
+        for output in outputs:
+            try:
+                (staging_dir / output).unlink()
+            except OSError:
+                pass
+
+    def _read_parquet_source_chunks(self, source_path, chunk_rows):
+        """Lê CSV ou JSON Lines em blocos de chunk_rows linhas (memória limitada)"""
+        if source_path.suffix.lower() == ".csv":
+            return pd.read_csv(source_path, chunksize=chunk_rows, low_memory=False)
+        return pd.read_json(source_path, lines=True, chunksize=chunk_rows)
+
+    def _infer_parquet_schema(self, sample):
+        """Esquema [(coluna, tipo)] a partir do primeiro bloco: int64, float64, bool ou string"""
+        schema_spec = []
+        for column, dtype in sample.dtypes.items():
+            if pd.api.types.is_bool_dtype(dtype):
+                type_name = "bool"
+            elif pd.api.types.is_integer_dtype(dtype):
+                type_name = "int64"
+            elif pd.api.types.is_float_dtype(dtype):
+                type_name = "float64"
+            else:
+                type_name = "string"
+            schema_spec.append([str(column), type_name])
+        return schema_spec
+
+    def _cast_parquet_chunk(self, chunk, schema_spec):
+        """Aplica o esquema ao bloco. Colunas cujo tipo não comporta os valores são alargadas
+        (bool → string, int64 → float64 → string). Retorna (bloco, esquema possivelmente alargado)."""
+        widened_spec = []
+        for column, type_name in schema_spec:
+            while True:
+                try:
+                    chunk[column].astype(PARQUET_PANDAS_DTYPES[type_name])
+                    break
+                except (TypeError, ValueError):
+                    type_name = PARQUET_WIDER_TYPES[type_name]
+            widened_spec.append([column, type_name])
+        return chunk.astype({column: PARQUET_PANDAS_DTYPES[type_name] for column, type_name in widened_spec}), widened_spec
+
+    def convert_file_to_parquet(self, source_path, key, schema_spec, staging_dir, settings):
+        """Converte um arquivo em blocos para Parquet comprimido, particionado por
+        s3.parquet.partition_columns (estilo Hive: coluna=valor/).
+
+        Usa o esquema da pasta (ou infere do primeiro bloco). Se um bloco posterior não couber no
+        esquema, recomeça o arquivo com os tipos alargados. Retorna (saídas, esquema usado).
+        """
+        while True:
+            try:
+                return self._write_parquet_file(source_path, key, schema_spec, staging_dir, settings)
+            except ParquetSchemaWidened as widened:
+                schema_spec = widened.schema_spec
+
+    def _write_parquet_file(self, source_path, key, schema_spec, staging_dir, settings):
+        if pq is None:
+            raise RuntimeError("pyarrow não instalado")
+
+        folder, _, file_name = key.rpartition('/')
+        writers = {}
+        outputs = []
+        try:
+            for chunk in self._read_parquet_source_chunks(source_path, settings["chunk_rows"]):
+                if schema_spec is None:
+                    schema_spec = self._infer_parquet_schema(chunk)
+                columns = [column for column, _ in schema_spec]
+                missing = set(chunk.columns.astype(str)) - set(columns)
+                if missing:
+                    raise ValueError(f"colunas fora do esquema da pasta: {', '.join(sorted(missing))}")
+                chunk.columns = chunk.columns.astype(str)
+                chunk, widened_spec = self._cast_parquet_chunk(chunk.reindex(columns=columns), schema_spec)
+                if widened_spec != schema_spec:
+                    if writers:
+                        raise ParquetSchemaWidened(widened_spec)
+                    schema_spec = widened_spec
+
+                partition_columns = [column for column in settings["partition_columns"] if column in columns]
+                data_schema = pa.schema([(column, PARQUET_ARROW_TYPES[type_name]())
+                                         for column, type_name in schema_spec if column not in partition_columns])
+                groups = chunk.groupby(partition_columns, dropna=False) if partition_columns else [((), chunk)]
+
+                for values, part in groups:
+                    values = values if isinstance(values, tuple) else (values,)
+                    partition_dir = "/".join(
+                        f"{hive_escape_path_name(column)}="
+                        f"{PARQUET_HIVE_DEFAULT_PARTITION if pd.isna(value) or value == '' else hive_escape_path_name(value)}"
+                        for column, value in zip(partition_columns, values)
+                    )
+                    output = "/".join(part_name for part_name in (folder, partition_dir, f"{file_name}.parquet") if part_name)
+                    if output not in writers:
+                        output_path = staging_dir / output
+                        if not output_path.resolve().is_relative_to(Path(staging_dir).resolve()):
+                            raise ValueError(f"partição aponta para fora do staging: {output}")
+                        output_path.parent.mkdir(parents=True, exist_ok=True)
+                        writers[output] = pq.ParquetWriter(str(output_path), data_schema,
+                                                           compression=settings["compression"])
+                        outputs.append(output)
+                    table = pa.Table.from_pandas(part.drop(columns=partition_columns), schema=data_schema,
+                                                 preserve_index=False)
+                    writers[output].write_table(table)
+        except Exception:
+            for writer in writers.values():
+                writer.close()
+            self._remove_parquet_outputs(staging_dir, outputs)
+            raise
+        for writer in writers.values():
+            writer.close()
+        if not outputs:
+            raise ValueError("arquivo sem linhas")
+        return outputs, schema_spec
+
+    def get_athena_price_per_tb(self):
+        """Preço por TB escaneado usado no simulador (catálogo em cache ou padrão)"""
+        if hasattr(self, 'aws_pricing'):
+            return self.aws_pricing["athena_per_tb"]
+        self.load_pricing_catalog()
+        if getattr(self, 'pricing_catalog', None):
+            athena_per_tb = self.derive_simulator_pricing(self.pricing_catalog)[0]
+            if athena_per_tb:
+                return athena_per_tb
+        return 5.00
+
+    def format_parquet_report(self, report):
+        """Resumo da conversão: redução de tamanho e custo de uma varredura completa no Athena"""
+        if not report["source_bytes"]:
+            return "🗜️ Parquet: nenhum CSV/JSON convertido" + (f" ({len(report['errors'])} com erro)" if report["errors"] else "")
+        price_per_tb = self.get_athena_price_per_tb()
+        reduction = 1 - report["parquet_bytes"] / report["source_bytes"]
+        source_cost = report["source_bytes"] / 1024 ** 4 * price_per_tb
+        parquet_cost = report["parquet_bytes"] / 1024 ** 4 * price_per_tb
+        text = (f"🗜️ Parquet: {self.format_transfer_size(report['source_bytes'])} → "
+                f"{self.format_transfer_size(report['parquet_bytes'])} (-{reduction:.0%}) • varredura completa no Athena: "
+                f"${source_cost:.6f} → ${parquet_cost:.6f} (${price_per_tb:.2f}/TB)")
+        if report["errors"]:
+            text += f" • {len(report['errors'])} enviados sem conversão"
+        return text
+
+    # ============== NAVEGADOR S3 ==============
+
+    def get_s3_browser_settings(self):
+        """Configurações do navegador S3 (config.json -> s3.browser)"""
+        settings = self.config.get("s3", {}).get("browser", {})
+        return {
+            "ttl_seconds": settings.get("ttl_seconds", 60),
+            "page_size": settings.get("page_size", 1000),
+            "prefetch_children": settings.get("prefetch_children", 5),
+            "max_cached_prefixes": settings.get("max_cached_prefixes", 300),
+        }
+
+    def get_s3_browser_bucket(self):
+        """Bucket da squad da conta logada"""
+        return f"itau-self-wkp-sa-east-1-{self.current_account_id}" if self.current_account_id else None
+
+    def setup_s3_browser(self):
+        """Estado do navegador: cache por prefixo (LRU) e pool de prefetch"""
+        self.s3_browser_cache = OrderedDict()
+        self.s3_browser_lock = threading.Lock()
+        self.s3_browser_inflight = {}
+        self.s3_browser_prefix = ""
+        self.s3_browser_client = None
+        self.s3_browser_prefetch_pool = None
+        self.s3_object_preview_key = None
+
+    def _get_s3_browser_client(self):
+        if self.s3_browser_client is None:
+            self.s3_browser_client = boto3.client('s3', config=BotoConfig(max_pool_connections=16))
+        return self.s3_browser_client
+
+    def list_s3_browser_page(self, bucket, prefix, continuation_token=None):
+        """Lista um nível (Delimiter='/') a partir do token, uma página por vez"""
+        params = {
+            'Bucket': bucket,
+            'Prefix': prefix,
+            'Delimiter': '/',
+            'MaxKeys': self.get_s3_browser_settings()["page_size"]
+        }
+        if continuation_token:
+            params['ContinuationToken'] = continuation_token
+        response = self.retry_with_backoff(self._get_s3_browser_client().list_objects_v2, 3, 0.5, **params)
+        folders = [common['Prefix'] for common in response.get('CommonPrefixes', [])]
+        files = [
+            (obj['Key'], obj['Size'], obj['LastModified'])
+            for obj in response.get('Contents', []) if obj['Key'] != prefix
+        ]
+        return folders, files, response.get('NextContinuationToken') if response.get('IsTruncated') else None
+
+    def get_s3_browser_listing(self, prefix, force=False):
+        """Primeira página do prefixo, do cache se ainda dentro do TTL.
+
+        Listagens simultâneas do mesmo prefixo (navegação + prefetch) compartilham a mesma chamada.
+        """
+        bucket = self.get_s3_browser_bucket()
+        cache_key = (bucket, prefix)
+        ttl = self.get_s3_browser_settings()["ttl_seconds"]
+        with self.s3_browser_lock:
+            entry = self.s3_browser_cache.get(cache_key)
+            if entry and not force and time.monotonic() - entry["fetched_at"] < ttl:
+                self.s3_browser_cache.move_to_end(cache_key)
+                return entry
+            event = self.s3_browser_inflight.get(cache_key)
+            owner = event is None
+            if owner:
+                event = self.s3_browser_inflight[cache_key] = threading.Event()
+
+        if not owner:
+            event.wait(30)
+            with self.s3_browser_lock:
+                entry = self.s3_browser_cache.get(cache_key)
+            if entry:
+                return entry
+            return self.get_s3_browser_listing(prefix, force=True)
+
+        try:
+            folders, files, token = self.list_s3_browser_page(bucket, prefix)
+            entry = {"folders": folders, "files": files, "token": token, "fetched_at": time.monotonic()}
+            with self.s3_browser_lock:
+                self.s3_browser_cache[cache_key] = entry
+                self.s3_browser_cache.move_to_end(cache_key)
+                while len(self.s3_browser_cache) > self.get_s3_browser_settings()["max_cached_prefixes"]:
+                    self.s3_browser_cache.popitem(last=False)
+            return entry
+        finally:
+            with self.s3_browser_lock:
+                self.s3_browser_inflight.pop(cache_key, None)
+            event.set()
+
+    def prefetch_s3_prefixes(self, prefixes):
+        """Aquece em background o cache dos prefixos (ignorando os que já estão no cache)"""
+        if self.s3_browser_prefetch_pool is None:
+            self.s3_browser_prefetch_pool = ThreadPoolExecutor(max_workers=4, thread_name_prefix="s3-prefetch")
+        bucket = self.get_s3_browser_bucket()
+        ttl = self.get_s3_browser_settings()["ttl_seconds"]
+        for prefix in prefixes:
+            with self.s3_browser_lock:
+                entry = self.s3_browser_cache.get((bucket, prefix))
+                if (entry and time.monotonic() - entry["fetched_at"] < ttl) or (bucket, prefix) in self.s3_browser_inflight:
+                    continue
+
+            def prefetch(prefix=prefix):
+                try:
+                    self.get_s3_browser_listing(prefix)
+                except Exception as e:
+                    print(f"⚠️ Prefetch de {prefix} falhou: {e}")
+
+            self.s3_browser_prefetch_pool.submit(prefetch)
+
+    def toggle_s3_browser(self, e=None):
+        """Mostra/oculta o navegador; ao abrir, começa pela pasta da combinação selecionada"""
+        self.s3_browser_container.visible = not self.s3_browser_container.visible
+        if self.s3_browser_container.visible:
+            if not self.get_s3_browser_bucket():
+                self.s3_browser_status.value = "❌ Faça login na AWS para navegar no bucket"
+                self.s3_browser_status.color = ft.Colors.RED
+            else:
+                s3_path = self.get_s3_path()
+                self.navigate_s3_browser(self.parse_s3_uri(s3_path)[1] if s3_path else "")
+                return
+        self.page.update()
+
+    def navigate_s3_browser(self, prefix, force=False):
+        """Abre o prefixo: mostra o cache na hora (se houver) e lista em background se preciso"""
+        self.s3_browser_prefix = prefix
+        self.s3_browser_filter.value = ""
+        self.render_s3_browser_breadcrumb()
+
+        bucket = self.get_s3_browser_bucket()
+        with self.s3_browser_lock:
+            cached = self.s3_browser_cache.get((bucket, prefix))
+        if cached and not force:
+            self.render_s3_browser_entries(cached)
+        else:
+            self.s3_browser_list.controls = [ft.ProgressRing(width=20, height=20)]
+            self.s3_browser_status.value = f"🔄 Listando s3://{bucket}/{prefix}..."
+            self.s3_browser_status.color = ft.Colors.ORANGE
+        self.page.update()
+
+        def load():
+            try:
+                entry = self.get_s3_browser_listing(prefix, force=force)
+                if self.s3_browser_prefix != prefix:
+                    return  # Usuário já navegou para outro lugar
+                self.render_s3_browser_entries(entry)
+                self.prefetch_s3_prefixes(entry["folders"][:self.get_s3_browser_settings()["prefetch_children"]])
+                parent = self.get_s3_parent_prefix(prefix)
+                if parent is not None:
+                    self.prefetch_s3_prefixes([parent])
+            except Exception as ex:
+                self.s3_browser_status.value = f"❌ Erro ao listar: {ex}"
+                self.s3_browser_status.color = ft.Colors.RED
+            self.page.update()
+
+        threading.Thread(target=load, daemon=True).start()
+
+    def get_s3_parent_prefix(self, prefix):
+        """Prefixo pai ('' para a raiz; None se já estiver na raiz)"""
+        if not prefix:
+            return None
+        parent = prefix.rstrip('/').rpartition('/')[0]
+        return f"{parent}/" if parent else ""
+
+    def load_more_s3_browser(self, e=None):
+        """Busca a próxima página do prefixo atual e acrescenta ao cache"""
+        prefix = self.s3_browser_prefix
+        bucket = self.get_s3_browser_bucket()
+        with self.s3_browser_lock:
+            entry = self.s3_browser_cache.get((bucket, prefix))
+        if not entry or not entry["token"]:
+            return
+        self.s3_browser_status.value = "🔄 Carregando mais itens..."
+        self.page.update()
+
+        def load():
+            try:
+                folders, files, token = self.list_s3_browser_page(bucket, prefix, entry["token"])
+                with self.s3_browser_lock:
+                    entry["folders"].extend(folders)
+                    entry["files"].extend(files)
+                    entry["token"] = token
+                if self.s3_browser_prefix == prefix:
+                    self.render_s3_browser_entries(entry)
+            except Exception as ex:
+                self.s3_browser_status.value = f"❌ Erro ao listar: {ex}"
+                self.s3_browser_status.color = ft.Colors.RED
+            self.page.update()
+
+        threading.Thread(target=load, daemon=True).start()
+
+    def render_s3_browser_breadcrumb(self):
+        """Caminho clicável: bucket / pasta / subpasta /"""
+        bucket = self.get_s3_browser_bucket() or "bucket"
+        crumbs = [ft.TextButton(f"🪣 {bucket}", on_click=lambda e: self.navigate_s3_browser(""))]
+        accumulated = ""
+        for part in [part for part in self.s3_browser_prefix.split('/') if part]:
+            accumulated += f"{part}/"
+            crumbs.append(ft.Text("/", color=ft.Colors.GREY_500))
+            crumbs.append(ft.TextButton(part, on_click=lambda e, target=accumulated: self.navigate_s3_browser(target)))
+        self.s3_browser_breadcrumb.controls = crumbs
+
+    def render_s3_browser_entries(self, entry=None, e=None):
+        """Monta as linhas (pastas e arquivos) aplicando o filtro; a ListView só desenha as visíveis"""
+        if entry is None:
+            with self.s3_browser_lock:
+                entry = self.s3_browser_cache.get((self.get_s3_browser_bucket(), self.s3_browser_prefix))
+            if entry is None:
+                return
+        prefix = self.s3_browser_prefix
+        text_filter = (self.s3_browser_filter.value or "").strip().lower()
+
+        rows = []
+        parent = self.get_s3_parent_prefix(prefix)
+        if parent is not None:
+            rows.append(self._s3_browser_folder_row("⬆️ ..", parent))
+        for folder in entry["folders"]:
+            name = folder[len(prefix):]
+            if not text_filter or text_filter in name.lower():
+                rows.append(self._s3_browser_folder_row(f"📁 {name}", folder))
+        for key, size, last_modified in entry["files"]:
+            name = key[len(prefix):]
+            if text_filter and text_filter not in name.lower():
+                continue
+            rows.append(ft.Container(
+                content=ft.Row([
+                    ft.Text(f"📄 {name}", size=12, color=ft.Colors.WHITE, expand=True, no_wrap=True),
+                    ft.Text(self.format_transfer_size(size), size=12, color=ft.Colors.GREY_400, width=90),
+                    ft.Text(last_modified.astimezone().strftime('%d/%m/%Y %H:%M'), size=12,
+                            color=ft.Colors.GREY_400, width=120),
+                ], spacing=10),
+                padding=ft.padding.symmetric(horizontal=8),
+                on_click=lambda e, key=key: self.on_s3_browser_file_click(key),
+            ))
+        if entry["token"]:
+            rows.append(ft.TextButton("⬇️ Carregar mais", on_click=self.load_more_s3_browser))
+        self.s3_browser_list.controls = rows
+
+        more = " (há mais itens)" if entry["token"] else ""
+        age = time.monotonic() - entry["fetched_at"]
+        self.s3_browser_status.value = (f"📂 {len(entry['folders'])} pastas, {len(entry['files'])} arquivos{more}"
+                                        f" • listado há {age:.0f}s")
+        self.s3_browser_status.color = ft.Colors.GREY_400
+
+    def _s3_browser_folder_row(self, label, target_prefix):
+        """Linha de pasta: clique navega, passar o mouse pré-carrega a listagem"""
+        return ft.Container(
+            content=ft.Text(label, size=12, color=ft.Colors.AMBER_200, no_wrap=True),
+            padding=ft.padding.symmetric(horizontal=8),
+            on_click=lambda e: self.navigate_s3_browser(target_prefix),
+            on_hover=lambda e: self.prefetch_s3_prefixes([target_prefix]) if e.data == "true" else None,
+        )
+
+    def on_s3_browser_file_click(self, key, copy=False):
+        """Abre a prévia do arquivo quando o formato é suportado; senão copia o caminho S3"""
+        if not copy and self.get_s3_object_preview_format(key):
+            self.open_s3_object_preview(key)
+            return
+        s3_uri = f"s3://{self.get_s3_browser_bucket()}/{key}"
+        try:
+            pyperclip.copy(s3_uri)
+            self.s3_browser_status.value = f"📋 Copiado: {s3_uri}"
+        except Exception as ex:
+            self.s3_browser_status.value = f"⚠️ Não foi possível copiar {s3_uri}: {ex}"
+        self.page.update()
+
+    # ============== PRÉVIA DE OBJETOS S3 ==============
+
+    def get_s3_object_preview_settings(self):
+        """Limites da prévia (config.json -> s3.object_preview); max_kb é o teto de bytes por prévia"""
+        settings = self.config.get("s3", {}).get("object_preview", {})
+        return {
+            "max_kb": settings.get("max_kb", 2048),
+            "head_kb": settings.get("head_kb", 256),
+            "max_rows": settings.get("max_rows", 200),
+        }
+
+    def get_s3_object_preview_format(self, key):
+        """csv, json ou parquet pela extensão (None se não houver prévia para o tipo)"""
+        return S3_OBJECT_PREVIEW_FORMATS.get(Path(key).suffix.lower())
+
+    def _format_preview_cell(self, value):
+        if value is None or value is pd.NA or value is pd.NaT or (isinstance(value, float) and np.isnan(value)):
+            return ""
+        if isinstance(value, (dict, list)):
+            return json.dumps(value, ensure_ascii=False, default=str)
+        return str(value)
+
+    def _preview_from_records(self, records, max_rows):
+        """Colunas (na ordem em que aparecem) e linhas de texto a partir de uma lista de dicts"""
+        columns = []
+        for record in records[:max_rows]:
+            for column in record:
+                if column not in columns:
+                    columns.append(column)
+        rows = [[self._format_preview_cell(record.get(column)) for column in columns] for record in records[:max_rows]]
+        return [str(column) for column in columns], rows
+
+    def _split_complete_lines(self, data, truncated):
+        """Texto do trecho baixado sem a última linha, se ela foi cortada pelo Range"""
+        text = data.decode('utf-8', errors='replace')
+        if truncated:
+            text = text[:text.rfind('\n') + 1]
+        return text
+
+    def preview_s3_object_head(self, s3_client, bucket, key, size, fmt, settings):
+        """CSV/JSON Lines: um único GET com Range do início do objeto"""
+        length = min(size, int(settings["head_kb"] * 1024), int(settings["max_kb"] * 1024))
+        if length <= 0:
+            return {"columns": [], "rows": [], "bytes_read": 0, "note": "objeto vazio"}
+        response = self.retry_with_backoff(
+            s3_client.get_object, 3, 0.5, Bucket=bucket, Key=key, Range=f"bytes=0-{length - 1}")
+        data = response['Body'].read()
+        truncated = len(data) < size
+        text = self._split_complete_lines(data, truncated)
+        max_rows = settings["max_rows"]
+        note = f"início do arquivo ({self.format_transfer_size(len(data))} de {self.format_transfer_size(size)})" \
+            if truncated else "arquivo completo"
+
+        if not text.strip():
+            return {"columns": [], "rows": [], "bytes_read": len(data),
+                    "note": f"{note} • nenhuma linha completa no trecho (aumente s3.object_preview.head_kb)"}
+
+        if fmt == "csv":
+            # Só separadores usuais: o sniffing livre do pandas aceita letras (ex.: 'i' de 'id')
+            try:
+                delimiter = csv.Sniffer().sniff(text[:64 * 1024], delimiters=S3_OBJECT_PREVIEW_CSV_DELIMITERS).delimiter
+            except csv.Error:
+                delimiter = ","
+            frame = pd.read_csv(io.StringIO(text), nrows=max_rows, dtype=str, keep_default_na=False, sep=delimiter)
+            rows = [[self._format_preview_cell(value) for value in row] for row in frame.itertuples(index=False)]
+            return {"columns": [str(column) for column in frame.columns], "rows": rows,
+                    "bytes_read": len(data), "note": note}
+
+        if text.lstrip().startswith('['):
+            # JSON em array só pode ser interpretado inteiro
+            if truncated:
+                lines = text.splitlines()[:max_rows]
+                return {"columns": ["conteúdo"], "rows": [[line] for line in lines], "bytes_read": len(data),
+                        "note": f"{note} • JSON em array maior que o trecho: texto bruto (use o filtro S3 Select)"}
+            records = json.loads(text)
+        else:
+            records = [json.loads(line) for line in text.splitlines()[:max_rows] if line.strip()]
+        records = [record if isinstance(record, dict) else {"valor": record} for record in records]
+        columns, rows = self._preview_from_records(records, max_rows)
+        return {"columns": columns, "rows": rows, "bytes_read": len(data), "note": note}
+
+    def preview_s3_object_parquet(self, s3_client, bucket, key, size, settings):
+        """Parquet: rodapé (esquema/metadados) e primeiro row group via Range, dentro do teto de bytes"""
+        if pq is None:
+            raise RuntimeError("pyarrow não instalado: prévia de Parquet indisponível")
+        reader = S3RangeReader(s3_client, bucket, key, size, int(settings["max_kb"] * 1024))
+        parquet_file = pq.ParquetFile(reader)
+        metadata = parquet_file.metadata
+        columns = parquet_file.schema_arrow.names
+        note = f"{metadata.num_rows} linhas em {metadata.num_row_groups} row groups"
+        if metadata.num_row_groups == 0:
+            return {"columns": columns, "rows": [], "bytes_read": reader.bytes_read, "note": note}
+
+        group_size = metadata.row_group(0).total_byte_size
+        if group_size > reader.max_bytes - reader.bytes_read:
+            # Só o esquema: o primeiro row group estouraria o limite da prévia
+            schema = parquet_file.schema_arrow
+            rows = [[field.name, str(field.type)] for field in schema]
+            return {"columns": ["coluna", "tipo"], "rows": rows, "bytes_read": reader.bytes_read,
+                    "note": f"{note} • primeiro row group ({self.format_transfer_size(group_size)}) "
+                            f"maior que o limite da prévia: mostrando só o esquema"}
+        try:
+            table = parquet_file.read_row_group(0)
+        except PreviewByteLimitError as e:
+            schema = parquet_file.schema_arrow
+            rows = [[field.name, str(field.type)] for field in schema]
+            return {"columns": ["coluna", "tipo"], "rows": rows, "bytes_read": reader.bytes_read,
+                    "note": f"{note} • {e}: mostrando só o esquema"}
+        records = table.slice(0, settings["max_rows"]).to_pylist()
+        rows = [[self._format_preview_cell(record.get(column)) for column in columns] for record in records]
+        return {"columns": columns, "rows": rows, "bytes_read": reader.bytes_read,
+                "note": f"{note} • primeiro row group"}
+
+    def select_s3_object_preview(self, s3_client, bucket, key, fmt, where, settings):
+        """Filtra no servidor com S3 Select; para de ler o stream ao atingir o teto de bytes"""
+        input_serialization = {
+            "csv": {'CSV': {'FileHeaderInfo': 'USE', 'AllowQuotedRecordDelimiter': True}},
+            "json": {'JSON': {'Type': 'LINES'}},
+            "parquet": {'Parquet': {}},
+        }[fmt]
+        expression = "SELECT * FROM S3Object s"
+        if where:
+            expression += f" WHERE {where}"
+        expression += f" LIMIT {settings['max_rows']}"
+
+        response = self.retry_with_backoff(
+            s3_client.select_object_content, 3, 0.5,
+            Bucket=bucket, Key=key, ExpressionType='SQL', Expression=expression,
+            InputSerialization=input_serialization, OutputSerialization={'JSON': {'RecordDelimiter': '\n'}}
+        )
+        max_bytes = int(settings["max_kb"] * 1024)
+        payload = b''
+        truncated = False
+        bytes_scanned = None
+        stream = response['Payload']
+        try:
+            for event in stream:
+                if 'Records' in event:
+                    payload += event['Records']['Payload']
+                    if len(payload) >= max_bytes:
+                        truncated = True
+                        break
+                elif 'Stats' in event:
+                    bytes_scanned = event['Stats']['Details'].get('BytesScanned')
+        finally:
+            stream.close()
+
+        text = self._split_complete_lines(payload[:max_bytes], truncated)
+        records = [json.loads(line) for line in text.splitlines() if line.strip()]
+        columns, rows = self._preview_from_records(records, settings["max_rows"])
+        note = f"S3 Select: {expression}"
+        if bytes_scanned is not None:
+            note += f" • {self.format_transfer_size(bytes_scanned)} varridos no S3"
+        if truncated:
+            note += " • resultado cortado no limite de bytes"
+        return {"columns": columns, "rows": rows, "bytes_read": len(payload), "note": note}
+
+    def preview_s3_object(self, key, where=""):
+        """Monta a prévia do objeto: início (CSV/JSON), rodapé + 1º row group (Parquet) ou S3 Select"""
+        fmt = self.get_s3_object_preview_format(key)
+        if fmt is None:
+            raise ValueError(f"sem prévia para arquivos {Path(key).suffix or 'sem extensão'}")
+        settings = self.get_s3_object_preview_settings()
+        s3_client = self._get_s3_browser_client()
+        bucket = self.get_s3_browser_bucket()
+        if where:
+            return self.select_s3_object_preview(s3_client, bucket, key, fmt, where, settings)
+        size = self.retry_with_backoff(s3_client.head_object, 3, 0.5, Bucket=bucket, Key=key)['ContentLength']
+        if fmt == "parquet":
+            return self.preview_s3_object_parquet(s3_client, bucket, key, size, settings)
+        return self.preview_s3_object_head(s3_client, bucket, key, size, fmt, settings)
+
+    def open_s3_object_preview(self, key, where=""):
+        """Mostra o painel de prévia e carrega em background (descarta o resultado se outro arquivo foi aberto)"""
+        self.s3_object_preview_key = key
+        self.s3_object_preview_title.value = f"👁️ s3://{self.get_s3_browser_bucket()}/{key}"
+        if not where:
+            self.s3_object_preview_where.value = ""
+        self.s3_object_preview_status.value = "🔄 Lendo trecho do objeto..."
+        self.s3_object_preview_status.color = ft.Colors.ORANGE
+        self.s3_object_preview_grid.content = ft.ProgressRing(width=20, height=20)
+        self.s3_object_preview_container.visible = True
+        self.page.update()
+
+        def load():
+            try:
+                preview = self.preview_s3_object(key, where)
+                if self.s3_object_preview_key != key:
+                    return
+                self.render_s3_object_preview(preview)
+            except Exception as ex:
+                if self.s3_object_preview_key != key:
+                    return
+                self.s3_object_preview_grid.content = None
+                self.s3_object_preview_status.value = f"❌ Erro na prévia: {ex}"
+                self.s3_object_preview_status.color = ft.Colors.RED
+            self.page.update()
+
+        threading.Thread(target=load, daemon=True).start()
+
+    def apply_s3_object_preview_filter(self, e=None):
+        """Refaz a prévia com S3 Select usando a condição digitada (vazio = prévia normal)"""
+        if self.s3_object_preview_key:
+            self.open_s3_object_preview(self.s3_object_preview_key, (self.s3_object_preview_where.value or "").strip())
+
+    def close_s3_object_preview(self, e=None):
+        self.s3_object_preview_key = None
+        self.s3_object_preview_container.visible = False
+        self.s3_object_preview_grid.content = None
+        self.page.update()
+
+    def render_s3_object_preview(self, preview):
+        """Grade com cabeçalho fixo e linhas em ListView de altura fixa (só as visíveis são desenhadas)"""
+        columns = preview["columns"]
+        width = S3_OBJECT_PREVIEW_COLUMN_WIDTH
+
+        def cells(values, **text_style):
+            return ft.Row([
+                ft.Container(content=ft.Text(value, size=12, no_wrap=True, tooltip=value if len(value) > 18 else None,
+                                             **text_style), width=width)
+                for value in values
+            ], spacing=0)
+
+        header = cells(columns, weight=ft.FontWeight.BOLD, color=ft.Colors.AMBER_200)
+        body = ft.ListView(
+            controls=[cells(row, color=ft.Colors.WHITE) for row in preview["rows"]],
+            height=260, item_extent=24, spacing=0
+        )
+        self.s3_object_preview_grid.content = ft.Row([
+            ft.Container(content=ft.Column([header, ft.Divider(height=1), body], spacing=4),
+                         width=max(1, len(columns)) * width)
+        ], scroll=ft.ScrollMode.AUTO)
+        self.s3_object_preview_status.value = (
+            f"📊 {len(preview['rows'])} linhas x {len(columns)} colunas • "
+            f"{self.format_transfer_size(preview['bytes_read'])} baixados • {preview['note']}")
+        self.s3_object_preview_status.color = ft.Colors.GREY_400
+
+    def copy_s3_object_preview_uri(self, e=None):
+        if self.s3_object_preview_key:
+            self.on_s3_browser_file_click(self.s3_object_preview_key, copy=True)
+
+    # ============== SINCRONIZAÇÃO EM LOTE ==============
+
+    def get_s3_batch_settings(self):
+        """Orçamento do lote (config.json -> s3.transfer): arquivos simultâneos somando todas as
+        combinações e quantas combinações são listadas/transferidas ao mesmo tempo"""
+        transfer = self.config.get("s3", {}).get("transfer", {})
+        return {
+            "max_parallel_files": transfer.get("batch_max_parallel_files", 16),
+            "max_parallel_targets": transfer.get("batch_max_parallel_targets", 4),
+        }
+
+    def get_s3_batch_combinations(self):
+        """Combinações marcadas no modo lote: RT/squads marcadas x ambientes marcados, no prefixo selecionado"""
+        prefix = self.prefix_dropdown.value
+        envs = [checkbox.data for checkbox in self.s3_batch_env_checkboxes if checkbox.value]
+        targets = []
+        for checkbox in self.s3_batch_target_checkboxes:
+            if not checkbox.value:
+                continue
+            rt, squad = checkbox.data
+            for env in envs:
+                local_path = self.get_combination_local_path(prefix, rt, env, squad)
+                s3_uri = self.get_combination_s3_path(prefix, rt, env, squad)
+                if local_path and s3_uri:
+                    targets.append({
+                        "label": "/".join(part for part in (prefix, rt, env, squad) if part),
+                        "local_path": str(local_path),
+                        "s3_uri": s3_uri,
+                    })
+        return targets
+
+    def toggle_s3_batch(self, e=None):
+        """Mostra/oculta o painel do sync em lote"""
+        self.s3_batch_container.visible = not self.s3_batch_container.visible
+        self.update_s3_batch_count()
+        self.page.update()
+
+    def update_s3_batch_count(self, e=None):
+        """Atualiza a contagem de combinações marcadas e habilita os botões do lote"""
+        targets = self.get_s3_batch_combinations()
+        if not self.current_account_id:
+            self.s3_batch_count.value = "❌ Faça login na AWS para sincronizar em lote"
+        else:
+            self.s3_batch_count.value = f"🧺 {len(targets)} combinações selecionadas"
+        self.s3_batch_upload_button.disabled = not targets
+        self.s3_batch_download_button.disabled = not targets
+        if e is not None:
+            self.page.update()
+
+    def run_s3_batch_sync(self, direction):
+        """Coloca um único job na fila que sincroniza todas as combinações marcadas"""
+        try:
+            targets = self.get_s3_batch_combinations()
+            if not targets:
+                raise Exception("Marque ao menos uma RT/squad e um ambiente e faça login na AWS")
+
+            delete = direction == 'download' and bool(self.delete_checkbox.value)
+            convert_parquet = direction == 'upload' and bool(self.parquet_checkbox.value)
+            if convert_parquet and pq is None:
+                raise Exception("Conversão para Parquet requer o pacote pyarrow (pip install pyarrow)")
+            job = self.enqueue_transfer_job(direction, "", "", delete=delete,
+                                            label=f"Lote: {len(targets)} combinações ({self.prefix_dropdown.value})",
+                                            convert_parquet=convert_parquet, targets=targets)
+            arrow = "Local → S3" if direction == 'upload' else "S3 → Local"
+            self.s3_status.value = f"📥 Job #{job['id']} na fila: {arrow} ({job['label']})"
+            overlapping = self.get_overlapping_transfer_jobs(job)
+            if overlapping:
+                self.s3_status.value += (f" • começa depois de {', '.join('#' + str(other['id']) for other in overlapping)}"
+                                         f" (mesmas combinações)")
+            self.s3_status.color = ft.Colors.BLUE
+
+        except Exception as e:
+            self.s3_status.value = f"❌ Erro: {str(e)}"
+            self.s3_status.color = ft.Colors.RED
+
+        self.render_transfer_jobs()
+        self.page.update()
+
+    def _run_transfer_batch_job(self, job):
+        """Sync em lote: todas as combinações usam o mesmo cliente S3 (um pool de conexões) e o mesmo
+        limitador AIMD, então o total de arquivos em voo respeita o orçamento do lote"""
+        targets = job["targets"]
+        batch_settings = self.get_s3_batch_settings()
+        parallel_targets = max(1, min(batch_settings["max_parallel_targets"], len(targets)))
+        target_settings = [self.get_s3_transfer_settings(target["s3_uri"]) for target in targets]
+        pool_size = (batch_settings["max_parallel_files"] * max(settings["max_concurrency"] for settings in target_settings)
+                     + parallel_targets * max(settings["list_workers"] for settings in target_settings))
+        s3_client = self.create_s3_transfer_client(target_settings[0], pool_size=pool_size)
+        concurrency = AdaptiveConcurrencyLimiter(batch_settings["max_parallel_files"])
+        cancel_event = job["cancel_event"]
+        started_at = time.monotonic()
+
+        job["status"] = "listing"
+        job["message"] = f"Listando {len(targets)} combinações..."
+        self.refresh_transfer_jobs_ui(force=True)
+
+        plans = {}
+        failures = {}
+
+        def build(target):
+            return self.build_s3_sync_plan(job["direction"], target["local_path"], target["s3_uri"],
+                                           delete=job["delete"], s3_client=s3_client, cancel_event=cancel_event,
+                                           convert_parquet=job["convert_parquet"])
+
+        with ThreadPoolExecutor(max_workers=parallel_targets) as executor:
+            futures = {executor.submit(build, target): index for index, target in enumerate(targets)}
+            for future in as_completed(futures):
+                index = futures[future]
+                try:
+                    plans[index] = future.result()
+                except Exception as e:
+                    print(f"❌ Erro ao listar {targets[index]['label']}: {e}")
+                    failures[index] = str(e)
+                job["message"] = f"Listadas {len(plans) + len(failures)}/{len(targets)} combinações..."
+                self.refresh_transfer_jobs_ui()
+
+        total_bytes = sum(plan["total_bytes"] for plan in plans.values())
+        total_files = sum(len(plan["transfers"]) for plan in plans.values())
+        job.update(status="running", total_bytes=total_bytes, files_total=total_files)
+        job["message"] = f"{total_files} arquivos para transferir em {len(plans)} combinações"
+        self.refresh_transfer_jobs_ui(force=True)
+
+        progress_lock = threading.Lock()
+        plan_progress = {index: (0, 0) for index in plans}
+
+        def progress_for(index):
+            def on_progress(bytes_done, _total, _rate, _eta, files_done, _files_total):
+                with progress_lock:
+                    plan_progress[index] = (bytes_done, files_done)
+                    batch_bytes = sum(done for done, _ in plan_progress.values())
+                    batch_files = sum(done for _, done in plan_progress.values())
+                elapsed = max(time.monotonic() - started_at, 1e-6)
+                rate = batch_bytes / elapsed
+                eta = (total_bytes - batch_bytes) / rate if rate > 0 else None
+                job.update(bytes_done=batch_bytes, rate=rate, eta=eta, files_done=batch_files)
+                job["message"] = self.format_transfer_progress(batch_bytes, total_bytes, rate, eta,
+                                                               batch_files, total_files)
+                self.refresh_transfer_jobs_ui()
+            return on_progress
+
+        results = {}
+        if plans and not cancel_event.is_set():
+            with ThreadPoolExecutor(max_workers=min(parallel_targets, len(plans))) as executor:
+                futures = {
+                    executor.submit(self.execute_s3_sync_plan, plan, s3_client=s3_client,
+                                    progress_callback=progress_for(index), cancel_event=cancel_event,
+                                    concurrency=concurrency): index
+                    for index, plan in plans.items()
+                }
+                for future in as_completed(futures):
+                    index = futures[future]
+                    try:
+                        results[index] = future.result()
+                    except Exception as e:
+                        print(f"❌ Erro ao sincronizar {targets[index]['label']}: {e}")
+                        failures[index] = str(e)
+
+        errors = [(f"{targets[index]['label']}: {key}", message)
+                  for index, result in results.items() for key, message in result["errors"]]
+        errors += [(targets[index]["label"], message) for index, message in failures.items()]
+        job.update(bytes_done=sum(result["bytes"] for result in results.values()),
+                   files_done=sum(result["transferred"] for result in results.values()),
+                   deleted=sum(result["deleted"] for result in results.values()), errors=errors)
+        job["report"] = self.format_s3_batch_report(targets, plans, results, failures,
+                                                    time.monotonic() - started_at)
+
+        if cancel_event.is_set():
+            self._finish_transfer_job(job, "cancelled", f"Cancelado: {job['report']}")
+        elif errors:
+            self._finish_transfer_job(job, "error", f"{len(errors)} erros - {job['report']}")
+        else:
+            self._finish_transfer_job(job, "done", job["report"])
+
+    def format_s3_batch_report(self, targets, plans, results, failures, elapsed):
+        """Relatório consolidado do lote: totais e uma linha por combinação"""
+        lines = []
+        for index, target in enumerate(targets):
+            if index in failures:
+                lines.append(f"❌ {target['label']}: {failures[index]}")
+                continue
+            result = results.get(index)
+            if result is None:
+                lines.append(f"⏹️ {target['label']}: não executado")
+                continue
+            icon = "⚠️" if result["errors"] else "✅"
+            line = (f"{icon} {target['label']}: {result['transferred']} arquivos, "
+                    f"{self.format_transfer_size(result['bytes'])}, {result['deleted']} removidos")
+            if result["errors"]:
+                first_key, first_error = result["errors"][0]
+                line += f", {len(result['errors'])} erros ({first_key}: {first_error})"
+            if plans[index].get("parquet_report"):
+                line += f" • {self.format_parquet_report(plans[index]['parquet_report'])}"
+            lines.append(line)
+
+        succeeded = sum(1 for index, result in results.items() if not result["errors"] and index not in failures)
+        header = (f"{succeeded}/{len(targets)} combinações ok • "
+                  f"{sum(result['transferred'] for result in results.values())} arquivos, "
+                  f"{self.format_transfer_size(sum(result['bytes'] for result in results.values()))}, "
+                  f"{sum(result['deleted'] for result in results.values())} removidos em {elapsed:.1f}s")
+        return "\n".join([header] + lines)
+
+    # ============== FILA DE TRANSFERÊNCIAS S3 ==============
+
+    def setup_transfer_queue(self):
+        """Cria a fila de jobs de transferência e os workers em background.
+
+        Número de jobs simultâneos: config.json -> s3.transfer.max_concurrent_jobs.
+        """
+        self.transfer_jobs = []
+        self.transfer_jobs_lock = threading.Lock()
+        self.transfer_queue = queue.Queue()
+        self.transfer_job_counter = 0
+        # Limite de banda por ambiente, compartilhado pelos jobs/combinações do mesmo ambiente
+        self.transfer_bandwidth_limiters = {}
+        self.transfer_bandwidth_limiters_lock = threading.Lock()
+        self.transfer_claimed_pairs = {}
+        self.transfer_pairs_condition = threading.Condition()
+        self.parquet_staging_locks = {}
+        self.parquet_staging_locks_lock = threading.Lock()
+        self._transfer_ui_last_update = 0.0
+
+        max_jobs = self.config.get("s3", {}).get("transfer", {}).get("max_concurrent_jobs", 2)
+        for _ in range(max(1, max_jobs)):
+            threading.Thread(target=self._transfer_worker, daemon=True).start()
+
+    def get_transfer_bandwidth_limiter(self, s3_uri, settings):
+        """TokenBucket do ambiente do caminho, com a taxa de s3.transfer.per_env.<ambiente>: um ambiente
+        ilimitado não desfaz o limite de um job que roda ao mesmo tempo em outro ambiente"""
+        env = self.get_env_from_s3_uri(s3_uri)
+        with self.transfer_bandwidth_limiters_lock:
+            limiter = self.transfer_bandwidth_limiters.setdefault(env, TokenBucket(0))
+        limiter.set_rate(settings["max_bandwidth_mbps"] * 1024 * 1024)
+        return limiter
+
+    def enqueue_transfer_job(self, direction, local_path, s3_uri, delete=False, label="", plan=None,
+                             convert_parquet=False, targets=None):
+        """Cria um job de sync e coloca na fila. Um job igual (mesmo caminho e mesmas opções) já
+        pendente/em execução é reaproveitado.
+
+        Com plan (vindo da prévia ou do auto-sync) o job executa direto, sem nova listagem, e nunca é
+        reaproveitado: o plano cobre só parte dos arquivos. Com targets (lista de {label, local_path,
+        s3_uri}) o job é um lote que sincroniza todas as combinações. Jobs no mesmo par (pasta local,
+        prefixo S3) rodam um depois do outro (_claim_transfer_pairs).
+        """
+        with self.transfer_jobs_lock:
+            for job in self.transfer_jobs:
+                if plan is not None or job["plan"] is not None:
+                    continue
+                if (job["status"] in TRANSFER_JOB_ACTIVE_STATUSES and job["direction"] == direction
+                        and job["local_path"] == str(local_path) and job["s3_uri"] == s3_uri
+                        and job["targets"] == targets and job["delete"] == delete
+                        and job["convert_parquet"] == convert_parquet):
+                    return job
+
+            self.transfer_job_counter += 1
+            job = {
+                "id": self.transfer_job_counter,
+                "direction": direction,
+                "local_path": str(local_path),
+                "s3_uri": s3_uri,
+                "delete": delete,
+                "label": label or s3_uri,
+                "plan": plan,
+                "convert_parquet": convert_parquet,
+                "targets": targets,
+                "report": None,
+                "status": "queued",
+                "bytes_done": 0,
+                "total_bytes": 0,
+                "rate": 0.0,
+                "eta": None,
+                "files_done": 0,
+                "files_total": 0,
+                "deleted": 0,
+                "errors": [],
+                "message": "Aguardando na fila",
+                "cancel_event": threading.Event(),
+                "created_at": datetime.now(),
+                "finished_at": None,
+            }
+            self.transfer_jobs.append(job)
+
+        print(f"📥 Job #{job['id']} enfileirado: {direction} {job['label']}")
+        self.transfer_queue.put(job)
+        return job
+
+    def _transfer_worker(self):
+        """Worker em background: executa os jobs da fila um de cada vez"""
+        while True:
+            job = self.transfer_queue.get()
+            try:
+                if job["cancel_event"].is_set() or not self._claim_transfer_pairs(job):
+                    self._finish_transfer_job(job, "cancelled", "Cancelado antes de iniciar")
+                else:
+                    try:
+                        if job["targets"]:
+                            self._run_transfer_batch_job(job)
+                        else:
+                            self._run_transfer_job(job)
+                    finally:
+                        self._release_transfer_pairs(job)
+            except Exception as e:
+                print(f"❌ Erro no job #{job['id']}: {e}")
+                self._finish_transfer_job(job, "error", str(e))
+            finally:
+                self.transfer_queue.task_done()
+
+    def get_transfer_job_pairs(self, job):
+        """Pares (pasta local, prefixo S3) do job (de cada combinação, num lote), no mesmo formato que
+        identifica o manifesto"""
+        targets = job["targets"] or [job]
+        return {(str(Path(target["local_path"])), target["s3_uri"]) for target in targets}
+
+    def get_overlapping_transfer_jobs(self, job):
+        """Outros jobs pendentes/em execução que usam algum par do job (o job espera por eles)"""
+        pairs = self.get_transfer_job_pairs(job)
+        with self.transfer_jobs_lock:
+            return [other for other in self.transfer_jobs
+                    if other is not job and other["status"] in TRANSFER_JOB_ACTIVE_STATUSES
+                    and other["id"] < job["id"] and self.get_transfer_job_pairs(other) & pairs]
+
+    def _claim_transfer_pairs(self, job):
+        """Espera até nenhum outro job em execução usar os mesmos pares: dois jobs no mesmo par
+        transfeririam os mesmos arquivos e gravariam o mesmo manifesto. Retorna False se o job for
+        cancelado enquanto espera."""
+        pairs = self.get_transfer_job_pairs(job)
+        with self.transfer_pairs_condition:
+            while True:
+                if job["cancel_event"].is_set():
+                    return False
+                busy = {self.transfer_claimed_pairs[pair] for pair in pairs if pair in self.transfer_claimed_pairs}
+                if not busy:
+                    for pair in pairs:
+                        self.transfer_claimed_pairs[pair] = job["id"]
+                    return True
+                message = f"Aguardando job #{min(busy)} (mesmo caminho)"
+                if job["message"] != message:
+                    job["message"] = message
+                    self.refresh_transfer_jobs_ui(force=True)
+                self.transfer_pairs_condition.wait(timeout=1)
+
+    def _release_transfer_pairs(self, job):
+        with self.transfer_pairs_condition:
+            for pair in self.get_transfer_job_pairs(job):
+                if self.transfer_claimed_pairs.get(pair) == job["id"]:
+                    del self.transfer_claimed_pairs[pair]
+            self.transfer_pairs_condition.notify_all()
+
+    def _run_transfer_job(self, job):
+        """Lista, calcula o diff (ou usa o plano da prévia) e transfere, atualizando o progresso do job.
+
+        Plano da prévia mais antigo que manifest_trust_minutes é recalculado antes de executar; das
+        remoções, ficam só as que a prévia mostrou.
+        """
+        stale = job["plan"] is not None and self.is_s3_preview_plan_stale(job["plan"])
+        if not job["plan"] or stale:
+            job["status"] = "listing"
+            job["message"] = "Prévia desatualizada, listando de novo..." if stale else "Listando arquivos..."
+            self.refresh_transfer_jobs_ui(force=True)
+
+        def on_progress(bytes_done, total_bytes, rate, eta, files_done, files_total):
+            job.update(bytes_done=bytes_done, total_bytes=total_bytes, rate=rate, eta=eta,
+                       files_done=files_done, files_total=files_total)
+            job["message"] = self.format_transfer_progress(bytes_done, total_bytes, rate, eta, files_done, files_total)
+            self.refresh_transfer_jobs_ui()
+
+        s3_client = self.create_s3_transfer_client(self.get_s3_transfer_settings(job["s3_uri"]))
+        plan = job["plan"]
+        if not plan or stale:
+            plan = self.build_s3_sync_plan(job["direction"], job["local_path"], job["s3_uri"],
+                                           delete=job["delete"], s3_client=s3_client,
+                                           cancel_event=job["cancel_event"],
+                                           convert_parquet=job["convert_parquet"])
+            if stale:
+                # Arquivos que voltaram à origem desde a prévia não entram nas remoções
+                previewed_deletes = set(job["plan"]["deletes"])
+                plan["deletes"] = [key for key in plan["deletes"] if key in previewed_deletes]
+                print(f"🔄 Job #{job['id']}: prévia recalculada ({len(plan['transfers'])} transferências, "
+                      f"{len(plan['deletes'])} remoções)")
+        job.update(status="running", total_bytes=plan["total_bytes"], files_total=len(plan["transfers"]))
+        job["message"] = f"{len(plan['transfers'])} arquivos para transferir, {len(plan['deletes'])} para remover"
+        self.refresh_transfer_jobs_ui(force=True)
+
+        result = self.execute_s3_sync_plan(plan, s3_client=s3_client, progress_callback=on_progress,
+                                           cancel_event=job["cancel_event"])
+        job.update(bytes_done=result["bytes"], files_done=result["transferred"],
+                   deleted=result["deleted"], errors=result["errors"])
+
+        summary = (f"{result['transferred']} arquivos, {self.format_transfer_size(result['bytes'])}"
+                   f", {result['deleted']} removidos em {result['elapsed']:.1f}s")
+        if plan.get("parquet_report"):
+            summary += f"\n{self.format_parquet_report(plan['parquet_report'])}"
+        if result["cancelled"]:
+            self._finish_transfer_job(job, "cancelled", f"Cancelado: {summary}")
+        elif result["errors"]:
+            first_key, first_error = result["errors"][0]
+            self._finish_transfer_job(job, "error", f"{len(result['errors'])} erros ({summary}) - {first_key}: {first_error}")
+        else:
+            self._finish_transfer_job(job, "done", summary)
+
+    def is_s3_preview_plan_stale(self, plan):
+        """Plano da prévia criado há mais de s3.transfer.manifest_trust_minutes (planos do auto-sync
+        não têm created_at e nunca ficam velhos)"""
+        created_at = plan.get("created_at")
+        if created_at is None:
+            return False
+        trust_minutes = self.config.get("s3", {}).get("transfer", {}).get("manifest_trust_minutes", 10)
+        return datetime.now() - created_at > timedelta(minutes=trust_minutes)
+
+    def _finish_transfer_job(self, job, status, message):
+        job["status"] = status
+        job["message"] = message
+        job["finished_at"] = datetime.now()
+        print(f"{TRANSFER_JOB_STATUS_ICONS[status]} Job #{job['id']}: {message}")
+        self.refresh_transfer_jobs_ui(force=True)
+
+    def cancel_transfer_job(self, job_id):
+        """Cancela um job pendente ou em execução"""
+        with self.transfer_jobs_lock:
+            job = next((job for job in self.transfer_jobs if job["id"] == job_id), None)
+        if job and job["status"] in TRANSFER_JOB_ACTIVE_STATUSES:
+            job["cancel_event"].set()
+            job["message"] = "Cancelando..."
+            self.refresh_transfer_jobs_ui(force=True)
+
+    def clear_finished_transfer_jobs(self, e=None):
+        """Remove da lista os jobs já encerrados"""
+        with self.transfer_jobs_lock:
+            self.transfer_jobs = [job for job in self.transfer_jobs if job["status"] in TRANSFER_JOB_ACTIVE_STATUSES]
+        self.refresh_transfer_jobs_ui(force=True)
+
+    def has_active_transfer_jobs(self):
+        with self.transfer_jobs_lock:
+            return any(job["status"] in TRANSFER_JOB_ACTIVE_STATUSES for job in self.transfer_jobs)
+
+    def refresh_transfer_jobs_ui(self, force=False):
+        """Redesenha a lista de jobs (no máximo 2x por segundo, exceto mudanças de status)"""
+        now = time.monotonic()
+        if not force and now - self._transfer_ui_last_update < 0.5:
+            return
+        self._transfer_ui_last_update = now
+        if not hasattr(self, 'transfer_jobs_list'):
+            return
+        try:
+            self.render_transfer_jobs()
+            self.page.update()
+        except Exception as e:
+            print(f"⚠️ Erro ao atualizar lista de transferências: {e}")
+
+    def render_transfer_jobs(self):
+        """Monta as linhas da lista de jobs com status, progresso e botão de cancelar"""
+        with self.transfer_jobs_lock:
+            jobs = list(reversed(self.transfer_jobs))
+
+        rows = []
+        for job in jobs:
+            arrow = "Local → S3" if job["direction"] == 'upload' else "S3 → Local"
+            active = job["status"] in TRANSFER_JOB_ACTIVE_STATUSES
+            if job["status"] == "running" and job["total_bytes"]:
+                progress_value = job["bytes_done"] / job["total_bytes"]
+            elif job["status"] in ("done",):
+                progress_value = 1
+            elif job["status"] == "listing":
+                progress_value = None
+            else:
+                progress_value = 0 if active else 1
+
+            rows.append(ft.Container(
+                content=ft.Column([
+                    ft.Row([
+                        ft.Text(f"{TRANSFER_JOB_STATUS_ICONS[job['status']]} #{job['id']} {arrow}",
+                                size=13, weight=ft.FontWeight.BOLD, color=ft.Colors.WHITE),
+                        ft.Text(job["label"], size=12, color=ft.Colors.GREY_400, expand=True),
+                        ft.IconButton(
+                            icon=ft.Icons.CANCEL,
+                            icon_color=ft.Colors.RED_300,
+                            tooltip="Cancelar job",
+                            visible=active,
+                            on_click=lambda e, job_id=job["id"]: self.cancel_transfer_job(job_id)
+                        ),
+                    ], spacing=10),
+                    ft.ProgressBar(value=progress_value, color=TRANSFER_JOB_STATUS_COLORS[job["status"]]),
+                    ft.Text(job["message"], size=12, color=ft.Colors.GREY_300, selectable=True),
+                ], spacing=4),
+                padding=ft.padding.all(10),
+                bgcolor=ft.Colors.GREY_900,
+                border_radius=8,
+            ))
+
+        self.transfer_jobs_list.controls = rows or [
+            ft.Text("Nenhuma transferência na fila", size=12, color=ft.Colors.GREY_500)
+        ]
+        self.s3_progress.visible = self.has_active_transfer_jobs()
 
 def main(page: ft.Page):
     AWSApp(page)
 
 
 if __name__ == "__main__":
+    multiprocessing.freeze_support()  # Necessário para o ProcessPoolExecutor no executável empacotado
     ft.app(target=main)
\ No newline at end of file